@@ -0,0 +1,181 @@
+"""Time each stage of converting synthetic diagrams of increasing size, and save the results as JSON.
+
+Run from the repository root, e.g.:
+    python -m Benchmarks.benchConverter --sizes 10 1000 100000 --output bench.json
+    python -m Benchmarks.benchConverter --compare old.json new.json"""
+
+import json
+import platform
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from os import devnull, path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from Diag2RDFS import Diag2RDFSConverter
+from Benchmarks.lucidGenerator import writeLucidCSV
+
+default_sizes = [10, 100, 1000, 10000, 100000]
+stages = [
+    "loadDiagData",
+    "convertMetadata",
+    "convertNamespaces",
+    "convertClasses",
+    "convertLinkProperties",
+    "writeSchema",
+]
+
+
+def diagramOptions(shapes, properties=5, pages=1, namespaces=3):
+    """Return generateRows options for a diagram of about the given number of shapes, half classes and half links."""
+    classes = max(1, shapes // 2)
+    return {
+        "pages": pages,
+        "classes": classes,
+        "properties": properties,
+        "links": max(0, shapes - classes),
+        "namespaces": namespaces,
+    }
+
+
+def runStages(fname):
+    """Run each conversion stage on a diagram file, returning a dict of stage timings in seconds."""
+    c = Diag2RDFSConverter()
+    timings = dict()
+    for stage in stages:
+        start = perf_counter()
+        if stage == "loadDiagData":
+            c.loadDiagData(fname)
+        elif stage == "writeSchema":
+            c.writeSchema(devnull)
+        else:
+            getattr(c, stage)()
+        timings[stage] = perf_counter() - start
+    timings["triples"] = len(c.schema)
+    return timings
+
+
+def peakMemory(fname):
+    """Return the peak memory in bytes allocated by Python while converting and serializing a diagram file."""
+    tracemalloc.start()
+    try:
+        c = Diag2RDFSConverter()
+        c.convertDiag2RDFS(fname)
+        c.serializeSchema()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(sizes=default_sizes, repeat=3, memory=True, **options):
+    """Benchmark conversion of synthetic diagrams of each size, returning a list of result dicts.
+
+    Timings are the best of repeat runs; peak memory is measured in a separate traced
+    run."""
+    results = list()
+    with TemporaryDirectory() as tmp_dir:
+        for shapes in sizes:
+            fname = path.join(tmp_dir, "diagram%d.csv" % shapes)
+            diagram = diagramOptions(shapes, **options)
+            writeLucidCSV(fname, **diagram)
+            runs = [runStages(fname) for i in range(repeat)]
+            result = {"shapes": shapes, "diagram": diagram}
+            result["triples"] = runs[0]["triples"]
+            result["seconds"] = {
+                stage: min(run[stage] for run in runs) for stage in stages
+            }
+            result["seconds"]["total"] = sum(result["seconds"].values())
+            if memory:
+                result["peak_memory"] = peakMemory(fname)
+            results.append(result)
+            print(formatResult(result), file=sys.stderr)
+    return results
+
+
+def formatResult(result):
+    line = "%7d shapes %8d triples %9.4fs" % (
+        result["shapes"],
+        result["triples"],
+        result["seconds"]["total"],
+    )
+    if "peak_memory" in result:
+        line += " %8.1f MiB" % (result["peak_memory"] / 2**20)
+    return line
+
+
+def environment():
+    """Return a dict describing the versions the benchmark ran with."""
+    import rdflib
+
+    return {
+        "python": platform.python_version(),
+        "rdflib": rdflib.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def compareResults(old, new):
+    """Return a text table of the ratio of new to old timings for each size and stage found in both results."""
+    old_sizes = {result["shapes"]: result for result in old["results"]}
+    lines = ["%7s %-22s %10s %10s %7s" % ("shapes", "stage", "old", "new", "ratio")]
+    for result in new["results"]:
+        before = old_sizes.get(result["shapes"])
+        if before is None:
+            continue
+        for stage, seconds in result["seconds"].items():
+            if stage in before["seconds"] and before["seconds"][stage] > 0:
+                lines.append(
+                    "%7d %-22s %10.4f %10.4f %7.2f"
+                    % (
+                        result["shapes"],
+                        stage,
+                        before["seconds"][stage],
+                        seconds,
+                        seconds / before["seconds"][stage],
+                    )
+                )
+    return "\n".join(lines)
+
+
+def parse_arguments():
+    parser = ArgumentParser(
+        prog="python -m Benchmarks.benchConverter",
+        description="Benchmark conversion of synthetic Lucid class diagrams.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--properties", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--namespaces", type=int, default=3)
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    parser.add_argument("--output", type=str, help="File to save JSON results in.")
+    parser.add_argument(
+        "--compare",
+        type=str,
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Compare two saved JSON results instead of running the benchmark.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    if args.compare:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            print(compareResults(json.load(old), json.load(new)))
+        sys.exit()
+    results = benchmark(
+        args.sizes,
+        args.repeat,
+        args.memory,
+        properties=args.properties,
+        pages=args.pages,
+        namespaces=args.namespaces,
+    )
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(report, out, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
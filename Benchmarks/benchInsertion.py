@@ -0,0 +1,77 @@
+"""Compare adding converted triples to the schema graph one at a time with adding them in batches.
+
+Run from the repository root, e.g.:
+    python -m Benchmarks.benchInsertion --sizes 1000 10000 100000"""
+
+import sys
+from argparse import ArgumentParser
+from os import path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from Diag2RDFS import Diag2RDFSConverter
+from Benchmarks.lucidGenerator import writeLucidCSV
+from Benchmarks.benchConverter import diagramOptions
+
+
+def preparedConverter(fname):
+    """Return a converter with a diagram loaded and its metadata and namespaces converted."""
+    c = Diag2RDFSConverter()
+    c.loadDiagData(fname)
+    c.convertMetadata()
+    c.convertNamespaces()
+    return c
+
+
+def addEach(c):
+    """Add the converted triples to the schema graph one Graph.add call at a time, as the converter used to."""
+    for triple in c.iterTriples():
+        c.schema.add(triple)
+
+
+def addBatched(c):
+    """Add the converted triples through the converter's batched path."""
+    c.convertClasses()
+    c.convertLinkProperties()
+
+
+def timeInsertion(fname, method, repeat=3):
+    """Return the best time in seconds, and the size of the resulting graph, for an insertion method."""
+    best = None
+    for i in range(repeat):
+        c = preparedConverter(fname)
+        list(c.iterTriples())  # warm the CURIE caches so only insertion differs
+        start = perf_counter()
+        method(c)
+        seconds = perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best, len(c.schema)
+
+
+def parse_arguments():
+    parser = ArgumentParser(
+        prog="python -m Benchmarks.benchInsertion",
+        description="Compare per-triple and batched insertion into the schema graph.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--properties", type=int, default=5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    print("%7s %9s %10s %10s %7s" % ("shapes", "triples", "each", "batched", "speedup"))
+    with TemporaryDirectory() as tmp_dir:
+        for shapes in args.sizes:
+            fname = path.join(tmp_dir, "diagram%d.csv" % shapes)
+            writeLucidCSV(fname, **diagramOptions(shapes, args.properties))
+            each, triples = timeInsertion(fname, addEach, args.repeat)
+            batched, batched_triples = timeInsertion(fname, addBatched, args.repeat)
+            if triples != batched_triples:
+                print("Graph sizes differ: %d, %d" % (triples, batched_triples))
+                sys.exit(1)
+            print(
+                "%7d %9d %10.4f %10.4f %7.2f"
+                % (shapes, triples, each, batched, each / batched)
+            )
@@ -0,0 +1,87 @@
+"""Compare the throughput of reading a large diagram export with loadDiagStream and with memory-mapped chunks.
+
+The synthetic exports have long, multi-line comments with quotes in them, as real exports
+with long text areas do. Run from the repository root, e.g.:
+    python -m Benchmarks.benchLoad --shapes 100000 --comment-bytes 2000 --jobs 1 2 4"""
+
+import sys
+from argparse import ArgumentParser
+from csv import writer
+from os import path, stat
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.chunkedLoad import loadDiagChunks
+from Benchmarks.lucidGenerator import header, generateRows
+from Benchmarks.benchConverter import diagramOptions
+
+comment_column = header.index("rdfs:comment")
+words = ["schema", "class", '"quoted"', "line\n", "data,", "model", "property"]
+
+
+def writeLongTextCSV(fname, shapes, comment_bytes, seed=0):
+    """Write a synthetic diagram export whose class and link rows have long multi-line comments."""
+    random = Random(seed)
+    with open(fname, "w", newline="") as csv_file:
+        csv_writer = writer(csv_file)
+        for record in generateRows(**diagramOptions(shapes)):
+            if record[1] in ["Class", "Line"]:
+                text = list()
+                size = 0
+                while size < comment_bytes:
+                    word = random.choice(words)
+                    text.append(word)
+                    size += len(word) + 1
+                record[comment_column] = " ".join(text)
+            csv_writer.writerow(record)
+
+
+def rowValues(c):
+    return [row._values for row in c.diagMetaData + c.diagClassData + c.diagLinkData]
+
+
+def timeLoad(load, repeat):
+    """Return the best time in seconds for a load function, and the converter it loaded."""
+    best = None
+    for i in range(repeat):
+        c = Diag2RDFSConverter()
+        start = perf_counter()
+        load(c)
+        seconds = perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best, c
+
+
+def parse_arguments():
+    parser = ArgumentParser(
+        prog="python -m Benchmarks.benchLoad",
+        description="Compare reading a large export in text mode and in memory-mapped chunks.",
+    )
+    parser.add_argument("--shapes", type=int, default=20000)
+    parser.add_argument("--comment-bytes", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with TemporaryDirectory() as tmp_dir:
+        fname = path.join(tmp_dir, "diagram.csv")
+        writeLongTextCSV(fname, args.shapes, args.comment_bytes)
+        size = stat(fname).st_size / 2**20
+        print("%d shapes, %.1f MB" % (args.shapes, size))
+        seconds, expected = timeLoad(lambda c: c.loadDiagData(fname), args.repeat)
+        print("%-14s %8.3f s %8.1f MB/s" % ("text mode", seconds, size / seconds))
+        for jobs in args.jobs:
+            load = lambda c: loadDiagChunks(c, fname, jobs)
+            seconds, c = timeLoad(load, args.repeat)
+            if rowValues(c) != rowValues(expected):
+                print("Rows differ with %d jobs" % jobs)
+                sys.exit(1)
+            print(
+                "%-14s %8.3f s %8.1f MB/s"
+                % ("mmap, %d jobs" % jobs, seconds, size / seconds)
+            )
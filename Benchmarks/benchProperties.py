@@ -0,0 +1,121 @@
+"""Compare reading class property lists line by line, as the converter used to, with the compiled tokenizer.
+
+The times include the set the converter makes of the triples before adding them to the
+graph. The synthetic diagrams have classes with hundreds of properties each, drawn from a shared
+pool so that properties repeat across classes. Run from the repository root, e.g.:
+    python -m Benchmarks.benchProperties --classes 200 --properties 100 300 1000"""
+
+from argparse import ArgumentParser
+from os import path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.diag2RDFSConverter import propertySpecs
+from Benchmarks.lucidGenerator import writeLucidCSV
+
+
+def preparedConverter(fname):
+    """Return a converter with a diagram loaded and its metadata and namespaces converted."""
+    c = Diag2RDFSConverter()
+    c.loadDiagData(fname)
+    c.convertMetadata()
+    c.convertNamespaces()
+    return c
+
+
+def splitPropertyTriples(c, prop_def, c_uriref):
+    """Generate the triples for one property definition the way the converter used to: split on " (", ignore the datatype."""
+    t = c.terms
+    if type(prop_def) is not str:
+        msg = "Class property definition must be a string"
+        raise TypeError(msg)
+    if "(" in prop_def:
+        [p_uri, dataType] = prop_def.split(" (")
+        dataType = dataType[:-1]
+    else:
+        p_uri = prop_def
+    p_uriref, ns_id, ns_uriref = c.resolver.splitCurie(p_uri)
+    yield (p_uriref, t.rdf_type, t.rdf_property)
+    yield (p_uriref, t.rdfs_is_defined_by, ns_uriref)
+    if ns_id == c.metadata["defines"]:
+        yield (p_uriref, t.rdfs_range, t.rdfs_literal)
+        yield (p_uriref, t.rdfs_domain, c_uriref)
+    else:
+        yield (p_uriref, t.sdo_range_includes, t.rdfs_literal)
+        yield (p_uriref, t.sdo_domain_includes, c_uriref)
+
+
+def splitLines(c):
+    """Return the property triples of every class, reading each definition separately."""
+    triples = list()
+    for line in c.diagClassData:
+        c_uriref = c.resolver.uriref(line["text_1"])
+        for prop_def in line["text_2"].split("\n"):
+            triples.extend(splitPropertyTriples(c, prop_def, c_uriref))
+    return triples
+
+
+def tokenized(c):
+    """Return the property triples of every class, reading each property list with the tokenizer."""
+    triples = list()
+    seen = set()
+    for line in c.diagClassData:
+        c_uriref = c.resolver.uriref(line["text_1"])
+        for p_curie, datatype in c.classPropertySpecs(line["text_2"]):
+            triples.extend(c.propertySpecTriples(p_curie, datatype, c_uriref, seen))
+    return triples
+
+
+def timeProperties(fname, method, repeat=3):
+    """Return the best time in seconds for a method and for the converter's dedupe of its triples before they are added, and the triples.
+
+    Deduplication hashes every triple, so it costs more the more duplicates there
+    are."""
+    best = None
+    for i in range(repeat):
+        c = preparedConverter(fname)
+        method(c)  # warm the CURIE caches so only reading the lists differs
+        propertySpecs.cache_clear()
+        start = perf_counter()
+        triples = method(c)
+        set(triples)
+        seconds = perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best, triples
+
+
+def parse_arguments():
+    parser = ArgumentParser(
+        prog="python -m Benchmarks.benchProperties",
+        description="Compare line-by-line and tokenized reading of class property lists.",
+    )
+    parser.add_argument("--classes", type=int, default=200)
+    parser.add_argument("--properties", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    print(
+        "%10s %9s %9s %9s %9s %7s"
+        % ("properties", "split", "triples", "tokenized", "triples", "speedup")
+    )
+    with TemporaryDirectory() as tmp_dir:
+        for properties in args.properties:
+            fname = path.join(tmp_dir, "diagram%d.csv" % properties)
+            writeLucidCSV(fname, classes=args.classes, properties=properties, links=0)
+            split, split_triples = timeProperties(fname, splitLines, args.repeat)
+            tokens, token_triples = timeProperties(fname, tokenized, args.repeat)
+            print(
+                "%10d %9.4f %9d %9.4f %9d %7.2f"
+                % (
+                    properties,
+                    split,
+                    len(split_triples),
+                    tokens,
+                    len(token_triples),
+                    split / tokens,
+                )
+            )
@@ -0,0 +1,79 @@
+"""Measure the startup cost of importing the package and of running the command line tool.
+
+Each case runs in a fresh interpreter with -X importtime, and the slowest imports are listed
+in the same way as python's own report. Run from the repository root, e.g.:
+    python -m Benchmarks.benchStartup --top 10"""
+
+import subprocess
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+cases = {
+    "import Diag2RDFS": ["-c", "import Diag2RDFS"],
+    "import Diag2RDFS.batch": ["-c", "import Diag2RDFS.batch"],
+    "diag2rdfs.py --stream nt": [
+        "diag2rdfs.py",
+        "--no-cache",
+        "--stream",
+        "nt",
+        test_file,
+    ],
+    "diag2rdfs.py": ["diag2rdfs.py", "--no-cache", test_file],
+}
+
+
+def parseImportTimes(report):
+    """Return a list of (self, cumulative, module) import times, in microseconds, from -X importtime output."""
+    times = list()
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        times.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return times
+
+
+def runCase(args, repeat=5):
+    """Return the best wall-clock seconds for a case, and the import times of its last run."""
+    best = None
+    for i in range(repeat):
+        start = perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime"] + args,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        seconds = perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best, parseImportTimes(result.stderr)
+
+
+def parse_arguments():
+    parser = ArgumentParser(
+        prog="python -m Benchmarks.benchStartup",
+        description="Measure import and command line startup times.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=5, help="Number of slowest imports to list."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    for name, case in cases.items():
+        seconds, times = runCase(case, args.repeat)
+        rdflib_loaded = any(module.strip() == "rdflib" for s, c, module in times)
+        print(
+            "%-28s %8.1f ms  %3d modules imported%s"
+            % (name, seconds * 1000, len(times), ", rdflib" if rdflib_loaded else "")
+        )
+        for self_us, cumulative_us, module in sorted(times, key=lambda t: -t[0])[
+            : args.top
+        ]:
+            print("    %8d | %10d | %s" % (self_us, cumulative_us, module))
@@ -0,0 +1,88 @@
+"""Compare the memory and speed of the default rdflib store and the compact store for the schema graph.
+
+Run from the repository root, e.g.:
+    python -m Benchmarks.benchStore --sizes 1000 10000 100000"""
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from os import devnull, path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from Diag2RDFS import Diag2RDFSConverter
+from Benchmarks.lucidGenerator import writeLucidCSV
+from Benchmarks.benchConverter import diagramOptions
+
+stores = ["default", "Compact"]
+
+
+def measureStore(fname, store):
+    """Return the seconds taken to build and to serialize the schema graph in a store, the memory the graph holds and the peak memory used while building it."""
+    c = Diag2RDFSConverter(store=store)
+    c.loadDiagData(fname)
+    c.convertMetadata()
+    c.convertNamespaces()
+    list(c.iterTriples())  # warm the CURIE caches so only the store differs
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        start = perf_counter()
+        c.convertClasses()
+        c.convertLinkProperties()
+        triples = len(c.schema)
+        build = perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+        retained -= before
+        peak -= before
+    finally:
+        tracemalloc.stop()
+    start = perf_counter()
+    c.writeSchema(devnull)
+    serialize = perf_counter() - start
+    return {
+        "triples": triples,
+        "build": build,
+        "serialize": serialize,
+        "bytes": retained,
+        "peak_bytes": peak,
+        "triple_set": set(c.schema),
+    }
+
+
+def parse_arguments():
+    parser = ArgumentParser(
+        prog="python -m Benchmarks.benchStore",
+        description="Compare the default and compact stores for the schema graph.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--properties", type=int, default=5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    print(
+        "%7s %9s %8s %9s %10s %10s %10s"
+        % ("shapes", "triples", "store", "build", "serialize", "graph MB", "peak MB")
+    )
+    with TemporaryDirectory() as tmp_dir:
+        for shapes in args.sizes:
+            fname = path.join(tmp_dir, "diagram%d.csv" % shapes)
+            writeLucidCSV(fname, **diagramOptions(shapes, args.properties))
+            results = {store: measureStore(fname, store) for store in stores}
+            if results["default"]["triple_set"] != results["Compact"]["triple_set"]:
+                print("Schemas differ for %d shapes" % shapes)
+                sys.exit(1)
+            for store, result in results.items():
+                print(
+                    "%7d %9d %8s %9.4f %10.4f %10.2f %10.2f"
+                    % (
+                        shapes,
+                        result["triples"],
+                        store,
+                        result["build"],
+                        result["serialize"],
+                        result["bytes"] / 1e6,
+                        result["peak_bytes"] / 1e6,
+                    )
+                )
@@ -0,0 +1,118 @@
+from csv import writer
+from random import Random
+
+# the column headings of a Lucid class diagram export, as in Tests/TestData
+header = [
+    "Id",
+    "Name",
+    "Shape Library",
+    "Page ID",
+    "Contained By",
+    "Group",
+    "Line Source",
+    "Line Destination",
+    "Source Arrow",
+    "Destination Arrow",
+    "Status",
+    "Text Area 1",
+    "Text Area 2",
+    "Text Area 3",
+    "dct:date",
+    "dct:description",
+    "dct:issued",
+    "dct:title",
+    "defines",
+    "owl:equivalentclass",
+    "prefixes",
+    "rdfs:comment",
+    "rdfs:label",
+    "rdfs:subclassof",
+    "skos:scopenote",
+]
+datatypes = ["xsd:string", "xsd:date", "xsd:integer", "xsd:boolean"]
+
+
+def shapeRow(**values):
+    """Return a csv record with the given values, keyed by column heading with spaces as underscores."""
+    return [values.get(heading.replace(" ", "_"), "") for heading in header]
+
+
+def generateRows(pages=1, classes=10, properties=5, links=10, namespaces=2, seed=0):
+    """Generate the csv records of a synthetic Lucid class diagram export.
+
+    The first namespace is the one the diagram defines; classes and properties are spread
+    over all the namespaces. Class properties are drawn from a shared pool so that CURIEs
+    repeat across classes as they do in real diagrams."""
+    if pages < 1 or namespaces < 1:
+        msg = "A diagram needs at least one page and one namespace."
+        raise ValueError(msg)
+    random = Random(seed)
+    prefixes = ["ns%d" % i for i in range(namespaces)]
+    prefix_defs = ["%s: http://example.org/%s/" % (pre, pre) for pre in prefixes]
+    prefix_defs.append("xsd: http://www.w3.org/2001/XMLSchema#")
+    prop_pool = [
+        "%s:property%d" % (random.choice(prefixes), i)
+        for i in range(max(1, properties * 4))
+    ]
+    next_id = 1
+    yield header
+    yield shapeRow(
+        Id=str(next_id), Name="Document", Status="DRAFT", Text_Area_1="Synthetic Model"
+    )
+    page_ids = list()
+    for page in range(pages):
+        next_id += 1
+        page_ids.append(str(next_id))
+        yield shapeRow(
+            Id=str(next_id),
+            Name="Page",
+            Text_Area_1="Page %d" % page,
+            **{"dct:date": "2021-12-17", "dct:title": "Synthetic page %d" % page},
+            defines=prefixes[0],
+            prefixes="\n".join(prefix_defs),
+        )
+    class_ids = list()
+    for n in range(classes):
+        next_id += 1
+        class_ids.append(str(next_id))
+        props = random.sample(prop_pool, min(properties, len(prop_pool)))
+        prop_defs = [
+            p + " (" + random.choice(datatypes) + ")" if random.random() < 0.5 else p
+            for p in props
+        ]
+        yield shapeRow(
+            Id=str(next_id),
+            Name="Class",
+            Shape_Library="UML",
+            Page_ID=page_ids[n % pages],
+            Text_Area_1="%s:Class%d" % (random.choice(prefixes), n),
+            Text_Area_2="\n".join(prop_defs),
+            **{
+                "rdfs:label": "Class %d" % n,
+                "rdfs:comment": "A synthetic class, number %d, with a longer description."
+                % n,
+            },
+        )
+    if class_ids:
+        for n in range(links):
+            next_id += 1
+            source_arrow, destination_arrow = random.choice(
+                [("None", "Arrow"), ("Arrow", "None")]
+            )
+            yield shapeRow(
+                Id=str(next_id),
+                Name="Line",
+                Page_ID=page_ids[n % pages],
+                Line_Source=random.choice(class_ids),
+                Line_Destination=random.choice(class_ids),
+                Source_Arrow=source_arrow,
+                Destination_Arrow=destination_arrow,
+                Text_Area_1="%s:link%d" % (random.choice(prefixes), n),
+                **{"rdfs:label": "link %d" % n},
+            )
+
+
+def writeLucidCSV(fname, **options):
+    """Write a synthetic Lucid class diagram export to a csv file; see generateRows for the options."""
+    with open(fname, "w", newline="") as csv_file:
+        writer(csv_file).writerows(generateRows(**options))
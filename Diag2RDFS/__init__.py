@@ -1 +1,21 @@
+__version__ = "0.0.2a"
+
+from .diagData import ColumnMap, DiagRow, DEFAULT_COLUMNS
 from .diag2RDFSConverter import Diag2RDFSConverter
+
+# imported when first used, so that importing the package does not import rdflib
+lazy_names = {
+    "CompactStore": ".compactStore",
+    "SQLiteStore": ".sqliteStore",
+    "convert": ".api",
+    "ConversionOptions": ".api",
+    "ConversionResult": ".api",
+}
+
+
+def __getattr__(name):
+    if name in lazy_names:
+        from importlib import import_module
+
+        return getattr(import_module(lazy_names[name], __name__), name)
+    raise AttributeError("module " + __name__ + " has no attribute " + name)
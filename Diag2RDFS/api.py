@@ -0,0 +1,82 @@
+from dataclasses import dataclass, field
+from io import StringIO, TextIOWrapper, BytesIO
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+from .diag2RDFSConverter import Diag2RDFSConverter
+from .tripleSink import sinks
+
+
+@dataclass(frozen=True)
+class ConversionOptions:
+    """Settings for one call of convert().
+
+    columns overrides headings in the default column map. output_format is None to return only
+    the graph, "ttl" or "nt" for the streamed serializations, or the name of an rdflib
+    serializer."""
+
+    columns: Mapping[str, str] = field(default_factory=dict)
+    output_format: Optional[str] = None
+
+    def __post_init__(self):
+        # keep a read-only copy so that options can be shared between threads
+        object.__setattr__(self, "columns", MappingProxyType(dict(self.columns)))
+
+
+@dataclass(frozen=True)
+class ConversionResult:
+    """The outcome of one call of convert(); the schema graph belongs to the caller."""
+
+    schema: Any
+    metadata: Mapping[str, str]
+    namespaces: Mapping[str, str]
+    text: Optional[str] = None
+
+
+def openSource(source):
+    """Return an open text file for a diagram source: a file name, an open file, or csv bytes."""
+    if type(source) is bytes:
+        return TextIOWrapper(BytesIO(source), encoding="utf-8")
+    if type(source) is str:
+        return open(source, "r")
+    if hasattr(source, "read"):
+        return source
+    msg = "Source must be a file name, an open file or csv bytes."
+    print(source)
+    raise TypeError(msg)
+
+
+def convert(source, options=None):
+    """Convert a diagram to RDF Schema without sharing any state with other calls.
+
+    Each call uses its own converter, so calls may run at the same time in different
+    threads."""
+    if options is None:
+        options = ConversionOptions()
+    if type(options) is not ConversionOptions:
+        msg = "Options must be ConversionOptions."
+        print(options)
+        raise TypeError(msg)
+    c = Diag2RDFSConverter(dict(options.columns))
+    diag_file = openSource(source)
+    try:
+        c.convertDiag2RDFS(diag_file)
+    finally:
+        if diag_file is not source:
+            diag_file.close()
+    text = None
+    if options.output_format in sinks:
+        out = StringIO()
+        sink = sinks[options.output_format](out)
+        sink.start(c.metadata, c.namespaces)
+        for triple in c.schema:
+            sink.add(triple)
+        sink.close()
+        text = out.getvalue()
+    elif options.output_format is not None:
+        text = c.schema.serialize(format=options.output_format)
+    return ConversionResult(
+        schema=c.schema,
+        metadata=MappingProxyType(dict(c.metadata)),
+        namespaces=MappingProxyType({pre: str(ns) for pre, ns in c.namespaces.items()}),
+        text=text,
+    )
@@ -0,0 +1,188 @@
+from glob import glob, has_magic
+from io import StringIO
+from os import path, makedirs, remove, replace
+from time import perf_counter
+from .diag2RDFSConverter import Diag2RDFSConverter
+from .tripleSink import sinks
+from RDFUtils import plain_terms
+from .pages import convertByPage
+
+schema_extension = ".ttl"
+
+
+def expandInputs(inputs):
+    """Expand a list of file names, glob patterns and directories into a list of csv file names.
+
+    Directories contribute the csv files directly inside them. Each file is listed once, in
+    the order first found."""
+    if type(inputs) is not list:
+        msg = "Inputs must be a list of strings."
+        print(inputs)
+        raise TypeError(msg)
+    fnames = list()
+    for item in inputs:
+        if path.isdir(item):
+            found = sorted(glob(path.join(item, "*.csv")))
+        elif has_magic(item):
+            found = sorted(glob(item))
+        else:
+            found = [item]
+        for fname in found:
+            if fname not in fnames:
+                fnames.append(fname)
+    return fnames
+
+
+def outputName(fname, output_dir=None, extension=schema_extension):
+    """Return the name of the schema file for a diagram file, in output_dir or next to the diagram file."""
+    base = path.splitext(path.basename(fname))[0] + extension
+    if output_dir is None:
+        return path.join(path.dirname(fname), base)
+    return path.join(output_dir, base)
+
+
+def checkOutputNames(fnames, output_dir=None):
+    """Raise a ValueError if two diagram files would be written to the same schema file, as a/x.csv and b/x.csv are in one output_dir."""
+    written = dict()
+    for fname in fnames:
+        output = path.abspath(outputName(fname, output_dir))
+        if output in written:
+            print(output)
+            msg = "%s and %s would both be written to %s." % (
+                written[output],
+                fname,
+                outputName(fname, output_dir),
+            )
+            raise ValueError(msg)
+        written[output] = fname
+
+
+def convertDiagram(fname, out, stream=None, cache=None, converter=None, page_jobs=None):
+    """Convert one diagram file and write the schema to the open text file out.
+
+    If stream is "nt" or "ttl" the triples are streamed in that format instead of being built
+    into a graph. If page_jobs is given the pages of the diagram are converted separately, in
+    up to that many processes, and the merged graph is written in the stream format if one is
+    given. If a ConversionCache is given, a cached schema for the same csv content is written
+    instead of converting again. Returns True if the schema came from the cache.
+
+    Streamed triples are built from plain terms, so rdflib is not imported for them."""
+    if converter is None:
+        if stream is not None and page_jobs is None:
+            converter = Diag2RDFSConverter(terms=plain_terms)
+        else:
+            converter = Diag2RDFSConverter()
+    if cache is not None and fname != "-":
+        with open(fname, "rb") as diag_file:
+            output_format = (stream or "ttl") + ("-pages" if page_jobs else "")
+            key = cache.key(diag_file.read(), converter.columns, output_format)
+        text = cache.get(key)
+        if text is not None:
+            out.write(text)
+            return True
+        target = StringIO()
+    else:
+        target = out
+    if page_jobs is not None:
+        convertByPage(fname, page_jobs, converter)
+        if stream is None:
+            serialize = converter.serializeSchema
+            target.write(converter.runStage("serializeSchema", serialize))
+        else:
+            writeGraph(converter, sinks[stream](target))
+    elif stream is None:
+        converter.convertDiag2RDFS(fname)
+        target.write(converter.runStage("serializeSchema", converter.serializeSchema))
+    else:
+        converter.streamDiag2RDFS(fname, sinks[stream](target))
+    if target is not out:
+        out.write(target.getvalue())
+        cache.put(key, target.getvalue())
+    return False
+
+
+def writeGraph(converter, sink):
+    """Write the triples of a converter's schema graph to a triple sink, sorted so each subject's triples are together."""
+    sink.start(converter.metadata, converter.namespaces)
+    for triple in sorted(converter.schema):
+        sink.add(triple)
+    sink.close()
+
+
+def convertFile(fname, output_dir=None, stream=None, cache=None):
+    """Convert one diagram file to a schema file, returning a dict describing the result.
+
+    See convertDiagram for stream and cache. Errors are caught and recorded in the result so
+    that one bad file does not stop a batch. The schema is written to a temporary file beside
+    the output and renamed over it, as by canonical.replaceFile, so a failed conversion
+    leaves any earlier schema file as it was."""
+    if stream is None:
+        output = outputName(fname, output_dir)
+    else:
+        output = outputName(fname, output_dir, "." + stream)
+    result = {"input": fname, "output": output, "error": None, "cached": False}
+    start = perf_counter()
+    tmp_name = output + ".tmp"
+    try:
+        with open(tmp_name, "w") as schema_file:
+            result["cached"] = convertDiagram(fname, schema_file, stream, cache)
+        replace(tmp_name, output)
+    except Exception as e:
+        if path.exists(tmp_name):  # don't leave a partial schema behind
+            remove(tmp_name)
+        result["output"] = None
+        result["error"] = type(e).__name__ + ": " + str(e)
+    result["seconds"] = perf_counter() - start
+    return result
+
+
+def convertBatch(fnames, output_dir=None, jobs=1, stream=None, cache=None):
+    """Convert each diagram file to its own schema file using a pool of jobs processes.
+
+    Returns the list of results from convertFile, in the same order as fnames. Raises a
+    ValueError before converting if two files would have the same schema file."""
+    if type(jobs) is not int or jobs < 1:
+        msg = "Number of jobs must be a positive integer."
+        print(jobs)
+        raise ValueError(msg)
+    checkOutputNames(fnames, output_dir)
+    if output_dir is not None:
+        makedirs(output_dir, exist_ok=True)
+    if jobs == 1 or len(fnames) < 2:
+        return [convertFile(fname, output_dir, stream, cache) for fname in fnames]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        n = len(fnames)
+        return list(
+            pool.map(convertFile, fnames, [output_dir] * n, [stream] * n, [cache] * n)
+        )
+
+
+def summariseBatch(results, elapsed=None):
+    """Return a text summary of the results of a batch conversion, with per-file timings."""
+    lines = list()
+    failures = 0
+    for result in results:
+        if result["error"] is None and result.get("unchanged"):
+            status = "same   " + result["output"]
+        elif result["error"] is None and result.get("cached"):
+            status = "cached " + result["output"]
+        elif result["error"] is None:
+            status = "ok    " + result["output"]
+        else:
+            status = "FAILED " + result["error"]
+            failures += 1
+        lines.append("%8.3fs  %s  %s" % (result["seconds"], result["input"], status))
+    total = sum(result["seconds"] for result in results)
+    cached = len([result for result in results if result.get("cached")])
+    summary = "%d converted (%d from cache), %d failed, %.3fs conversion time" % (
+        len(results) - failures,
+        cached,
+        failures,
+        total,
+    )
+    if elapsed is not None:
+        summary += ", %.3fs elapsed" % elapsed
+    lines.append(summary)
+    return "\n".join(lines)
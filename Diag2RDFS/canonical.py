@@ -0,0 +1,203 @@
+import json
+from hashlib import sha256
+from io import StringIO
+from os import path, makedirs, replace
+from time import perf_counter
+from .diag2RDFSConverter import Diag2RDFSConverter
+from .tripleSink import ntTerm, sinks
+from .batch import outputName, checkOutputNames
+from RDFUtils import plain_terms
+
+manifest_name = "diag2rdfs-manifest.json"
+
+
+def sortedTriples(triples):
+    """Return a list of the distinct triples sorted by their N-Triples terms, so the order is the same whatever order they came in.
+
+    Each term is written out once however many triples it is in, and the triples are sorted
+    as tuples of those strings, which also keeps the triples about one subject
+    together."""
+    written = dict()
+
+    def termKey(term):
+        try:
+            return written[term]
+        except KeyError:
+            text = written[term] = ntTerm(term)
+            return text
+
+    keyed = {(termKey(s), termKey(p), termKey(o)): (s, p, o) for s, p, o in triples}
+    return [keyed[key] for key in sorted(keyed)]
+
+
+def canonicalText(triples, metadata, namespaces, fmt="ttl"):
+    """Return triples serialized as N-Triples or Turtle in a canonical form, which is the same for the same triples and metadata.
+
+    The triples are sorted, and the prefixes are declared in order of prefix."""
+    out = StringIO()
+    sink = sinks[fmt](out)
+    sink.start(metadata, dict(sorted(namespaces.items())))
+    for triple in sortedTriples(triples):
+        sink.write(triple)
+    sink.close()
+    return out.getvalue()
+
+
+def canonicalSchema(c, fmt="ttl"):
+    """Return the schema graph of a converter in canonical form."""
+    return canonicalText(c.schema, c.metadata, c.namespaces, fmt)
+
+
+def convertCanonical(fname, fmt="ttl", columns=None):
+    """Convert a diagram file to a schema in canonical form, from plain terms without building a graph."""
+    c = Diag2RDFSConverter(columns, terms=plain_terms)
+    c.loadDiagData(fname)
+    c.convertMetadata()
+    c.convertNamespaces()
+    return canonicalText(c.iterTriples(), c.metadata, c.namespaces, fmt)
+
+
+def replaceFile(fname, data):
+    """Write bytes to a file by writing a temporary file beside it and renaming that over it.
+
+    Renaming is atomic, so readers never see half a file and a failed write leaves the
+    old one."""
+    tmp_name = fname + ".tmp"
+    with open(tmp_name, "wb") as tmp:
+        tmp.write(data)
+    replace(tmp_name, fname)
+
+
+def contentHash(data):
+    """Return the sha256 hash of some bytes, as hex."""
+    return sha256(data).hexdigest()
+
+
+def contentETag(digest):
+    """Return the HTTP entity tag for content with the given hash."""
+    return '"' + digest + '"'
+
+
+class Manifest:
+    """A json file recording the hash and size of each output file, by its path relative to the manifest.
+
+    Changes are only written when save() is called, and only if there are any."""
+
+    def __init__(self, fname):
+        if type(fname) is not str:
+            msg = "Manifest file name must be a string."
+            print(fname)
+            raise TypeError(msg)
+        self.fname = fname
+        self.base = path.dirname(path.abspath(fname))
+        self.outputs = self.load()
+        self.changed = False
+
+    def load(self):
+        """Return the entries in the manifest file, or an empty dict if there is no file yet."""
+        try:
+            with open(self.fname) as manifest_file:
+                return json.load(manifest_file)["outputs"]
+        except FileNotFoundError:
+            return dict()
+
+    def entryName(self, output):
+        return path.relpath(path.abspath(output), self.base)
+
+    def get(self, output):
+        """Return the dict of sha256 hash and size in bytes recorded for an output file, or None."""
+        return self.outputs.get(self.entryName(output))
+
+    def put(self, output, digest, size):
+        """Record the hash and size of an output file."""
+        entry = {"sha256": digest, "bytes": size}
+        name = self.entryName(output)
+        if self.outputs.get(name) != entry:
+            self.outputs[name] = entry
+            self.changed = True
+
+    def save(self):
+        """Write the manifest file if any entry has changed."""
+        if not self.changed:
+            return
+        makedirs(self.base, exist_ok=True)
+        text = json.dumps({"outputs": self.outputs}, indent=1, sort_keys=True)
+        replaceFile(self.fname, (text + "\n").encode("utf-8"))
+        self.changed = False
+
+
+def isUnchanged(fname, digest, known):
+    """Return True if the manifest entry known for a file has this hash and the file is still there with the recorded size."""
+    if known is None or known["sha256"] != digest:
+        return False
+    try:
+        return path.getsize(fname) == known["bytes"]
+    except OSError:
+        return False
+
+
+def writeCanonical(text, fname, known=None):
+    """Write canonical text to a file unless the manifest entry known for the file shows it already holds it.
+
+    Returns the ETag of the content, the hash, the size in bytes and whether the file
+    was written."""
+    data = text.encode("utf-8")
+    digest = contentHash(data)
+    written = not isUnchanged(fname, digest, known)
+    if written:
+        replaceFile(fname, data)
+    return contentETag(digest), digest, len(data), written
+
+
+def convertCanonicalFile(fname, output_dir=None, fmt="ttl", known=None):
+    """Convert one diagram file to a canonical schema file, returning a dict describing the result.
+
+    The file is only written if its content differs from the manifest entry known for it.
+    Errors are caught and recorded in the result so that one bad file does not stop a
+    batch."""
+    output = outputName(fname, output_dir, "." + fmt)
+    result = {"input": fname, "output": output, "error": None, "cached": False}
+    start = perf_counter()
+    try:
+        text = convertCanonical(fname, fmt)
+        etag, digest, size, written = writeCanonical(text, output, known)
+        result.update(etag=etag, sha256=digest, bytes=size, unchanged=not written)
+    except Exception as e:
+        result["output"] = None
+        result["error"] = type(e).__name__ + ": " + str(e)
+    result["seconds"] = perf_counter() - start
+    return result
+
+
+def convertCanonicalBatch(fnames, output_dir=None, jobs=1, fmt="ttl", manifest=None):
+    """Convert each diagram file to a canonical schema file using a pool of jobs processes, skipping unchanged outputs.
+
+    The manifest is read before and updated after the conversions, in this process
+    only."""
+    if type(jobs) is not int or jobs < 1:
+        msg = "Number of jobs must be a positive integer."
+        print(jobs)
+        raise ValueError(msg)
+    checkOutputNames(fnames, output_dir)
+    if output_dir is not None:
+        makedirs(output_dir, exist_ok=True)
+    n = len(fnames)
+    outputs = [outputName(fname, output_dir, "." + fmt) for fname in fnames]
+    if manifest is None:
+        known = [None] * n
+    else:
+        known = [manifest.get(output) for output in outputs]
+    args = (fnames, [output_dir] * n, [fmt] * n, known)
+    if jobs == 1 or n < 2:
+        results = list(map(convertCanonicalFile, *args))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(convertCanonicalFile, *args))
+    if manifest is not None:
+        for result in results:
+            if result["error"] is None:
+                manifest.put(result["output"], result["sha256"], result["bytes"])
+        manifest.save()
+    return results
@@ -0,0 +1,128 @@
+import mmap
+from codecs import lookup
+from csv import reader
+from io import BytesIO, TextIOWrapper
+from os import stat
+from .diagData import ColumnMap
+from .diag2RDFSConverter import meta_shapes, class_shapes, link_shapes
+
+# encodings in which newline and quote bytes only ever stand for those characters
+chunk_encodings = ["utf-8", "ascii", "iso8859-1", "cp1252"]
+min_chunk_size = 2**20
+quote = b'"'
+newline = b"\n"
+
+
+def recordEnd(data, start, quotes=0):
+    """Return the offset just after the first newline at or after start that ends a record, or None.
+
+    A newline ends a record when an even number of quotes comes before it, counting quotes
+    from the start of a record; quotes is the number already counted before start. This
+    assumes quotes only appear in quoted fields, doubled inside them, as Lucid and the csv
+    module write them."""
+    counted = start
+    while True:
+        end = data.find(newline, counted)
+        if end < 0:
+            return None
+        quotes += data[counted:end].count(quote)
+        if quotes % 2 == 0:
+            return end + 1
+        counted = end + 1
+
+
+def chunkBoundaries(data, start, chunk_size):
+    """Return a list of offsets, from start to the end of data, splitting it into chunks of whole records about chunk_size bytes long."""
+    boundaries = [start]
+    while boundaries[-1] + chunk_size < len(data):
+        chunk_start = boundaries[-1]
+        skipped = data[chunk_start : chunk_start + chunk_size].count(quote)
+        end = recordEnd(data, chunk_start + chunk_size, skipped)
+        if end is None or end >= len(data):
+            break
+        boundaries.append(end)
+    boundaries.append(len(data))
+    return boundaries
+
+
+def chunkText(chunk, encoding):
+    """Return bytes of csv data as a text file, decoded and with newlines translated as when the file is read in text mode."""
+    return TextIOWrapper(BytesIO(chunk), encoding=encoding)
+
+
+def parseChunk(fname, start, end, encoding, header, columns):
+    """Return the number of records in one chunk of a csv file, and the position in the chunk and projected values of each row the converter keeps."""
+    with open(fname, "rb") as diag_file:
+        with mmap.mmap(diag_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            chunk = data[start:end]
+    column_map = ColumnMap(columns)
+    project = column_map.compile(header)
+    name = column_map.fields["name"]
+    kept = set(meta_shapes + class_shapes + link_shapes)
+    rows = list()
+    count = 0
+    for count, record in enumerate(reader(chunkText(chunk, encoding)), 1):
+        if not record:  # skip blank lines, as loadDiagStream does
+            continue
+        values = project(record)
+        if values[name] in kept:
+            rows.append((count, values))
+    return count, rows
+
+
+def fileEncoding(fname):
+    """Return the encoding open() reads a file with."""
+    with open(fname, "r") as diag_file:
+        return diag_file.encoding
+
+
+def loadDiagChunks(c, fname, jobs=1, chunk_size=None):
+    """Load a csv file into a converter's row lists by memory-mapping it and parsing chunks of records in up to jobs processes.
+
+    The rows are the same, in the same order, as loadDiagStream reads from the file opened in
+    text mode. Files that are empty, or in an encoding where a newline or quote byte could be
+    part of another character, are read by loadDiagStream instead."""
+    if type(jobs) is not int or jobs < 1:
+        msg = "Number of jobs must be a positive integer."
+        print(jobs)
+        raise ValueError(msg)
+    encoding = fileEncoding(fname)
+    if stat(fname).st_size == 0 or lookup(encoding).name not in chunk_encodings:
+        with open(fname, "r") as diag_file:
+            c.loadDiagStream(diag_file)
+        return c
+    with open(fname, "rb") as diag_file:
+        with mmap.mmap(diag_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_end = recordEnd(data, 0)
+            if header_end is None:
+                header_end = len(data)
+            header_chunk = data[:header_end]
+            if chunk_size is None:
+                chunk_size = max(min_chunk_size, len(data) // (jobs * 4))
+            boundaries = chunkBoundaries(data, header_end, chunk_size)
+    header = next(reader(chunkText(header_chunk, encoding)), [])
+    columns = c.columns.columns
+    chunks = [
+        (fname, start, end, encoding, header, columns)
+        for start, end in zip(boundaries, boundaries[1:])
+        if end > start
+    ]
+    c.clearDiagData()
+    if jobs == 1 or len(chunks) < 2:
+        addRows(c, (parseChunk(*chunk) for chunk in chunks))
+        return c
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        addRows(c, pool.map(parseChunk, *zip(*chunks)))
+    return c
+
+
+def addRows(c, results):
+    """Add the rows parsed from each chunk, in order, to a converter's row lists, numbering them from the record after the header."""
+    makeRow = c.columns.makeRow
+    row_number = 1
+    for count, rows in results:
+        for position, values in rows:
+            c.addDiagRow(makeRow(values, row_number + position))
+        row_number += count
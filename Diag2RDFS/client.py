@@ -0,0 +1,48 @@
+from http.client import HTTPConnection
+from time import perf_counter
+from .server import default_host, default_port
+
+
+class ConversionClient:
+    """Send diagram csv to a running ConversionServer and return the converted schemas.
+
+    One connection is kept open and reused for every request."""
+
+    def __init__(self, host=default_host, port=default_port, timeout=60):
+        self.connection = HTTPConnection(host, port, timeout=timeout)
+        self.latencies = list()
+
+    def convert(self, csv_data, output_format="ttl"):
+        """Return the schema converted from csv data (bytes or text) in the given format.
+
+        Raises ValueError with the server's message if the conversion fails."""
+        if type(csv_data) is str:
+            csv_data = csv_data.encode("utf-8")
+        start = perf_counter()
+        self.connection.request(
+            "POST",
+            "/convert?format=" + output_format,
+            body=csv_data,
+            headers={"Content-Type": "text/csv"},
+        )
+        response = self.connection.getresponse()
+        text = response.read().decode("utf-8")
+        self.latencies.append(perf_counter() - start)
+        if response.status != 200:
+            raise ValueError(text)
+        return text
+
+    def convertFile(self, fname, output_format="ttl"):
+        """Return the schema converted from a diagram csv file."""
+        with open(fname, "rb") as diag_file:
+            return self.convert(diag_file.read(), output_format)
+
+    def serverStats(self):
+        """Return the server's count of conversions and latency percentiles."""
+        import json
+
+        self.connection.request("GET", "/stats")
+        return json.loads(self.connection.getresponse().read().decode("utf-8"))
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,199 @@
+from array import array
+from bisect import bisect_left
+from rdflib import plugin
+from rdflib.store import Store
+
+
+def sortRows(rows, column, n):
+    """Return an array of row numbers stably sorted by their term ids, less than n, in a column.
+
+    This is a counting sort, so sorting by several columns in turn, least significant first,
+    sorts by all of them; it keeps only arrays, without a Python object for each row."""
+    starts = array("I", [0]) * (n + 1)
+    for r in rows:
+        starts[column[r] + 1] += 1
+    for i in range(n):
+        starts[i + 1] += starts[i]
+    result = array("I", [0]) * len(rows)
+    for r in rows:
+        term = column[r]
+        result[starts[term]] = r
+        starts[term] += 1
+    return result
+
+
+class CompactStore(Store):
+    """An in-memory rdflib store holding each term once and each triple as three integer term ids.
+
+    Terms are numbered in the order they are first added. The subject, predicate and object
+    ids of the triples are kept in three arrays sorted by subject, predicate and object, with
+    arrays of row numbers giving the predicate, object, subject and the object, subject,
+    predicate orders. New triples are appended and removed ones are marked; the arrays are
+    sorted again, dropping duplicates, the next time the store is read. That suits loading a
+    schema in bulk and then serializing it. The store is not context or formula aware.
+
+    Select it with Graph(store="Compact") or Diag2RDFSConverter(store="Compact")."""
+
+    def __init__(self, configuration=None, identifier=None):
+        super().__init__(configuration)
+        self.identifier = identifier
+        self.terms = list()
+        self.termIDs = dict()
+        self.subjects = array("I")
+        self.predicates = array("I")
+        self.objects = array("I")
+        self.pos = array("I")
+        self.osp = array("I")
+        self.removed = set()
+        self.indexed = True
+        self.width = 1  # the number of terms when the arrays were last sorted
+        self.prefixes = dict()
+        self.uris = dict()
+
+    def termID(self, term):
+        """Return the id of a term, numbering it if it is new."""
+        term_id = self.termIDs.get(term)
+        if term_id is None:
+            term_id = self.termIDs[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def add(self, triple, context, quoted=False):
+        s, p, o = triple
+        self.subjects.append(self.termID(s))
+        self.predicates.append(self.termID(p))
+        self.objects.append(self.termID(o))
+        self.indexed = False
+
+    def addN(self, quads):
+        termID = self.termID
+        subjects = self.subjects
+        predicates = self.predicates
+        objects = self.objects
+        for s, p, o, context in quads:
+            subjects.append(termID(s))
+            predicates.append(termID(p))
+            objects.append(termID(o))
+        self.indexed = False
+
+    def buildIndexes(self):
+        """Sort the triples by subject, predicate and object, dropping duplicates and removed triples, and rebuild the other orders."""
+        if self.indexed:
+            return
+        n = max(len(self.terms), 1)
+        S, P, O = self.subjects, self.predicates, self.objects
+        removed = self.removed
+        rows = array("I", (r for r in range(len(S)) if r not in removed))
+        for column in (O, P, S):  # least significant term first
+            rows = sortRows(rows, column, n)
+        subjects, predicates, objects = array("I"), array("I"), array("I")
+        last = None
+        for r in rows:
+            triple = (S[r], P[r], O[r])
+            if triple != last:  # duplicates are next to each other once sorted
+                subjects.append(triple[0])
+                predicates.append(triple[1])
+                objects.append(triple[2])
+                last = triple
+        del rows
+        self.subjects = S = subjects
+        self.predicates = P = predicates
+        self.objects = O = objects
+        # the rows are in subject, predicate, object order, which the sorts below keep
+        # within each object and predicate
+        self.osp = sortRows(array("I", range(len(S))), O, n)
+        self.pos = sortRows(self.osp, P, n)
+        self.removed = set()
+        self.width = n
+        self.indexed = True
+
+    def matchingRows(self, triple_pattern):
+        """Generate the row numbers of the triples matching a pattern, where None matches any term."""
+        self.buildIndexes()
+        ids = list()
+        for term in triple_pattern:
+            if term is None:
+                ids.append(None)
+            elif term in self.termIDs:
+                ids.append(self.termIDs[term])
+            else:
+                return
+        s, p, o = ids
+        S, P, O = self.subjects, self.predicates, self.objects
+        n = self.width
+        if s is not None:
+            order = range(len(S))
+            key = lambda r: (S[r] * n + P[r]) * n + O[r]
+            prefix = [s] if p is None else [s, p] if o is None else [s, p, o]
+        elif p is not None:
+            order = self.pos
+            key = lambda r: (P[r] * n + O[r]) * n + S[r]
+            prefix = [p] if o is None else [p, o]
+        elif o is not None:
+            order = self.osp
+            key = lambda r: (O[r] * n + S[r]) * n + P[r]
+            prefix = [o]
+        else:
+            yield from range(len(S))
+            return
+        low = 0
+        for term_id in prefix:
+            low = low * n + term_id
+        span = n ** (3 - len(prefix))
+        low = low * span
+        start = bisect_left(order, low, key=key)
+        end = bisect_left(order, low + span, key=key, lo=start)
+        for r in order[start:end]:
+            # only a bound subject and object with any predicate is not a prefix of the order
+            if o is None or O[r] == o:
+                yield r
+
+    def triples(self, triple_pattern, context=None):
+        self.buildIndexes()
+        terms = self.terms
+        S, P, O = self.subjects, self.predicates, self.objects
+        for r in self.matchingRows(triple_pattern):
+            yield (terms[S[r]], terms[P[r]], terms[O[r]]), iter(())
+
+    def remove(self, triple_pattern, context=None):
+        rows = set(self.matchingRows(triple_pattern))
+        if rows:
+            self.removed |= rows
+            self.indexed = False
+
+    def __len__(self, context=None):
+        self.buildIndexes()
+        return len(self.subjects)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix, namespace, override=True):
+        bound_namespace = self.uris.get(prefix)
+        bound_prefix = self.prefixes.get(namespace)
+        if bound_prefix is None and bound_namespace is not None:
+            bound_prefix = self.prefixes.get(bound_namespace)
+        if override:
+            if bound_prefix is not None:
+                del self.uris[bound_prefix]
+            if bound_namespace is not None:
+                del self.prefixes[bound_namespace]
+            self.prefixes[namespace] = prefix
+            self.uris[prefix] = namespace
+        else:
+            namespace = namespace if bound_namespace is None else bound_namespace
+            prefix = prefix if bound_prefix is None else bound_prefix
+            self.prefixes[namespace] = prefix
+            self.uris[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self.uris.get(prefix)
+
+    def prefix(self, namespace):
+        return self.prefixes.get(namespace)
+
+    def namespaces(self):
+        yield from self.uris.items()
+
+
+plugin.register("Compact", Store, "Diag2RDFS.compactStore", "CompactStore")
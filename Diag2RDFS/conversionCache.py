@@ -0,0 +1,152 @@
+import gzip
+import json
+import sys
+from functools import lru_cache
+from hashlib import sha256
+from os import environ, listdir, makedirs, path, remove, replace, stat, utime
+from tempfile import NamedTemporaryFile
+
+default_max_bytes = 256 * 2**20
+entry_extension = ".gz"
+# the packages whose code decides what a conversion outputs
+source_packages = ["Diag2RDFS", "RDFUtils"]
+
+
+@lru_cache(maxsize=None)
+def sourceHash():
+    """Return a hash of the source files of the converter packages, so cached schemas are not used after the code changes."""
+    digest = sha256()
+    root = path.dirname(path.dirname(path.abspath(__file__)))
+    for package in source_packages:
+        package_dir = path.join(root, package)
+        for name in sorted(listdir(package_dir)):
+            if name.endswith(".py"):
+                digest.update(name.encode("utf-8") + b"\0")
+                with open(path.join(package_dir, name), "rb") as source:
+                    digest.update(source.read())
+    return digest.hexdigest()
+
+
+def defaultCacheDir():
+    """Return the directory used for the cache when none is given: diag2rdfs under the user's cache directory."""
+    cache_home = environ.get(
+        "XDG_CACHE_HOME", path.join(path.expanduser("~"), ".cache")
+    )
+    return path.join(cache_home, "diag2rdfs")
+
+
+class ConversionCache:
+    """An on-disk cache of serialized schemas, keyed by a hash of the diagram csv and the conversion settings.
+
+    Entries are stored gzipped. When the cache grows beyond max_bytes the least recently
+    used entries are removed. If the cache directory cannot be read or written, a warning is
+    printed to stderr and the cache is not used for the rest of the run."""
+
+    def __init__(self, cache_dir=None, max_bytes=default_max_bytes):
+        if cache_dir is None:
+            cache_dir = defaultCacheDir()
+        if type(cache_dir) is not str:
+            msg = "Cache directory must be a string."
+            print(cache_dir)
+            raise TypeError(msg)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.usable = True
+
+    def key(self, data, columns, output_format):
+        """Return the cache key for csv data (as bytes) converted with a ColumnMap to an output format.
+
+        The key includes the version and a hash of the converter's source files."""
+        from . import __version__
+
+        digest = sha256()
+        settings = [__version__, sourceHash(), columns.columns, output_format]
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def entryName(self, key):
+        return path.join(self.cache_dir, key + entry_extension)
+
+    def disable(self, error):
+        """Print a warning to stderr that the cache cannot be used, and stop using it."""
+        print(
+            "Warning: not using the cache in " + self.cache_dir + ".",
+            error,
+            file=sys.stderr,
+        )
+        self.usable = False
+
+    def get(self, key):
+        """Return the cached text for a key, or None if there is none."""
+        if not self.usable:
+            return None
+        fname = self.entryName(key)
+        try:
+            with gzip.open(fname, "rt", encoding="utf-8") as entry:
+                text = entry.read()
+        except (FileNotFoundError, EOFError, gzip.BadGzipFile):  # missing or bad entry
+            return None
+        except OSError as e:
+            self.disable(e)
+            return None
+        try:
+            utime(fname)  # mark as recently used
+        except OSError as e:
+            self.disable(e)
+        return text
+
+    def put(self, key, text):
+        """Store the text for a key, then evict old entries if the cache is too big."""
+        if not self.usable:
+            return
+        tmp_name = None
+        try:
+            makedirs(self.cache_dir, exist_ok=True)
+            with NamedTemporaryFile(
+                dir=self.cache_dir, delete=False, suffix=".tmp"
+            ) as tmp:
+                tmp_name = tmp.name
+                with gzip.open(tmp, "wt", encoding="utf-8") as entry:
+                    entry.write(text)
+            # replace is atomic, so readers never see half an entry
+            replace(tmp_name, self.entryName(key))
+            self.evict()
+        except OSError as e:
+            if tmp_name is not None and path.exists(tmp_name):
+                remove(tmp_name)
+            self.disable(e)
+
+    def entries(self):
+        """Return a list of (last used time, size, file name) for each entry, oldest first."""
+        found = list()
+        if not path.isdir(self.cache_dir):
+            return found
+        for name in listdir(self.cache_dir):
+            if not name.endswith(entry_extension):
+                continue
+            fname = path.join(self.cache_dir, name)
+            try:
+                info = stat(fname)
+            except FileNotFoundError:  # removed by another process
+                continue
+            found.append((info.st_mtime, info.st_size, fname))
+        return sorted(found)
+
+    def size(self):
+        """Return the total size in bytes of the cache entries."""
+        return sum(size for mtime, size, fname in self.entries())
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is no bigger than max_bytes."""
+        entries = self.entries()
+        total = sum(size for mtime, size, fname in entries)
+        for mtime, size, fname in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                remove(fname)
+            except FileNotFoundError:
+                pass
+            total -= size
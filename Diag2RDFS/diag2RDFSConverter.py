@@ -1,230 +1,522 @@
-from csv import DictReader
-from copy import copy, deepcopy
-from pprint import PrettyPrinter
-from rdflib import Graph, Literal, URIRef, RDF, RDFS, SKOS, SDO
-from rdflib.namespace import Namespace, NamespaceManager
-from RDFUtils import str2uriref, curie2uriref, splitCurie, NamespaceDict, uri2Namespace
-
-# default column headings in csv
-# these could usefully be in a config file
-id = "Id"
-name = "Name"
-shape_library = "Shape Library"
-page_id = "Page_ID"
-contained_by = "Contained By"
-group = "Group"
-line_source = "Line Source"
-line_destination = "Line Destination"
-source_arrow = "Source Arrow"
-destination_arrow = "Destination Arrow"
-satus = "Status"
-text_1 = "Text Area 1"
-text_2 = "Text Area 2"
-text_3 = "Text Area 3"
-date = "dct:date"
-description = "dct:description"
-issued = "dct:issued"
-title = "dct:title"
-defines = "defines"
-equivalent_class = "owl:equivalentclass"
-prefixes = "prefixes"
-comment = "rdfs:comment"
-label = "rdfs:label"
-subclass_of = "rdfs:subclassof"
-scope_note = "skos:scopenote"
-
-SDO.rangeIncludes = URIRef("http://schema.org/rangeIncludes")
-SDO.domainIncludes = URIRef("http://schema.org/domainIncludes")
+import re
+import sys
+from csv import reader
+from functools import lru_cache
+from time import perf_counter
+from RDFUtils import NamespaceDict, CurieResolver, uri2Namespace, rdflibTerms
+from RDFUtils import prefixDefinitionProblem, curieProblem
+from RDFUtils.terms import rdf_ns, rdfs_ns, xsd_ns
+from .diagData import ColumnMap, DiagRow
+
+# the shape names of the rows kept in the metadata, classes and links lists
+meta_shapes = ["Document", "Page", "Text"]
+class_shapes = ["Class", "RDF Class"]
+link_shapes = ["Line"]
+# one line of a class's property list: a property CURIE, optionally followed by a datatype
+# CURIE in parentheses; any other line that is not blank is matched by the last group, and
+# unmatched groups are found as empty strings
+property_spec = re.compile(
+    r"^[ \t]*([^\s()]+)(?:[ \t]*\([ \t]*([^\s()]+)[ \t]*\))?[ \t]*\r?$|^([^\S\n]*\S.*)$",
+    re.MULTILINE,
+)
+# namespaces for datatype prefixes that diagrams often use without declaring them
+datatype_namespaces = {"xsd": xsd_ns, "rdf": rdf_ns, "rdfs": rdfs_ns}
+# the modules registering this package's rdflib store plugins, by plugin name
+store_modules = {"Compact": ".compactStore", "SQLite": ".sqliteStore"}
+
+
+@lru_cache(maxsize=4096)
+def propertySpecs(text):
+    """Read the property list of a class in one pass, returning a tuple of (property, datatype) pairs and a tuple of the lines that could not be read.
+
+    datatype is an empty string for properties listed without one. Classes often share a
+    property list, so the results are cached by the text."""
+    specs = list()
+    unread = list()
+    for p_curie, datatype, other in property_spec.findall(text):
+        if p_curie:
+            specs.append((p_curie, datatype))
+        else:
+            unread.append(other)
+    return tuple(specs), tuple(unread)
 
 
 class Diag2RDFSConverter:
-    """Methods to convert csv data from a Lucid class diagram to RDF Schema."""
+    """Methods to convert csv data from a Lucid class diagram to RDF Schema.
+
+    store names the rdflib store plugin, or gives the store, for the schema graph; "Compact" uses the
+    dictionary-encoded CompactStore, which takes much less memory for large schemas, and a
+    SQLiteStore keeps the schema in a database file. terms is the RDFUtils TermSet that
+    triples are made from; plain_terms builds triples without importing rdflib, for streamed
+    output. rdflib is only imported when the schema graph is first used.
+    load_jobs greater than 1 reads csv files by memory-mapping them and parsing chunks in that
+    many processes."""
+
+    def __init__(self, columns=None, store="default", terms=None, load_jobs=1):
+        self.columns = ColumnMap(columns)
+        self.store = store
+        self.terms = terms if terms is not None else rdflibTerms()
+        self._schema = None
+        self.hooks = list()
+        self.loadJobs = load_jobs
+        self.reset()
+
+    def reset(self):
+        """Forget the diagram data, metadata, namespaces and schema of any earlier conversion, so the converter can be used again.
 
-    def __init__(self):
+        The schema graph of an earlier conversion is left as it was, and a new one is made
+        when the schema is next used; a store object given to it is emptied instead."""
         self.metadata = dict()
         self.metadata["title"] = str()
         self.metadata["date"] = str()
         self.metadata["defines"] = str()
-        self.schema = Graph()
+        if self._schema is not None and type(self.store) is not str:
+            self._schema.remove((None, None, None))
+        self._schema = None
         self.namespaces = NamespaceDict()
-        self.diagMetaData = list()
-        self.diagClassData = list()
-        self.diagLinkData = list()
-        self.schema.bind("sdo", SDO)
-        self.schema.bind("skos", SKOS)
+        self.resolver = CurieResolver(self.namespaces, uriref=self.terms.URIRef)
+        self.clearDiagData()
+        self.datatypeURIIndex = dict()
+
+    @property
+    def schema(self):
+        """The rdflib Graph holding the converted schema, made the first time it is used."""
+        if self._schema is None:
+            from rdflib import Graph, SDO, SKOS
+
+            if type(self.store) is str and self.store in store_modules:
+                from importlib import import_module
+
+                import_module(store_modules[self.store], __package__)  # register it
+            self._schema = Graph(store=self.store)
+            self._schema.bind("sdo", SDO)
+            self._schema.bind("skos", SKOS)
+            for pre, ns in self.namespaces.items():
+                self._schema.bind(pre, ns)
+        return self._schema
+
+    @schema.setter
+    def schema(self, graph):
+        self._schema = graph
 
     def convertDiag2RDFS(self, fname):
-        """Load and convert diagram data into a RDF Graph."""
-        self.loadDiagData(fname)
-        self.convertMetadata()
-        self.convertNamespaces()
-        self.convertClasses()
-        self.convertLinkProperties()
+        """Load and convert diagram data into a RDF Graph, replacing any converted before."""
+        self.reset()
+        self.runStage("loadDiagData", self.loadDiagData, fname)
+        self.runStage("convertMetadata", self.convertMetadata)
+        self.runStage("convertNamespaces", self.convertNamespaces)
+        counter = lambda: len(self.schema)
+        self.runStage("convertClasses", self.convertClasses, triples=counter)
+        self.runStage(
+            "convertLinkProperties", self.convertLinkProperties, triples=counter
+        )
+
+    def addHook(self, hook):
+        """Register an object to be told when each stage of a conversion starts and finishes.
+
+        Hooks provide stageStarted(converter, stage) and stageFinished(converter, stage, stats), where
+        stats is a dict of the seconds taken, rows processed and triples added by the
+        stage."""
+        self.hooks.append(hook)
+
+    def stageRows(self, stage):
+        """Return the number of rows of diagram data processed by a conversion stage."""
+        if stage in ["convertMetadata", "convertNamespaces"]:
+            return len(self.diagMetaData)
+        if stage == "convertClasses":
+            return len(self.diagClassData)
+        if stage == "convertLinkProperties":
+            return len(self.diagLinkData)
+        if stage == "convertPages":
+            return len(self.diagClassData) + len(self.diagLinkData)
+        if stage in ["loadDiagData", "streamTriples"]:
+            rows = [self.diagMetaData, self.diagClassData, self.diagLinkData]
+            return sum(len(stage_rows) for stage_rows in rows)
+        return 0
+
+    def runStage(self, stage, method, *args, triples=None):
+        """Call method for a conversion stage, telling any hooks when it starts and finishes.
+
+        triples is a function counting the triples output so far, such as the size of the
+        schema graph or the count of a triple sink. Stages without one are reported as adding
+        no triples, so the schema graph is not made just to count them."""
+        if not self.hooks:
+            return method(*args)
+        if triples is None:
+            triples = lambda: 0
+        for hook in self.hooks:
+            hook.stageStarted(self, stage)
+        triples_before = triples()
+        start = perf_counter()
+        result = method(*args)
+        stats = dict()
+        stats["seconds"] = perf_counter() - start
+        stats["rows"] = self.stageRows(stage)
+        stats["triples"] = triples() - triples_before
+        for hook in self.hooks:
+            hook.stageFinished(self, stage, stats)
+        return result
 
     def loadDiagData(self, fname):
-        """Read diagram data in CSV format and store as lists of dicts."""
+        """Read diagram data in CSV format and store the projected columns as lists of DiagRows.
+
+        A file name of "-" reads the data from stdin; an open text file may be given
+        instead of a name."""
+        if hasattr(fname, "read"):
+            self.loadDiagStream(fname)
+            return
         if type(fname) is not str:
             msg = "Filename must be a string."
             print(fname)
             raise TypeError(msg)
-        with open(fname, "r") as diag_file:
-            csvReader = DictReader(diag_file)
-            for row in csvReader:
-                if row["Name"] in ["Document", "Page", "Text"]:
-                    self.diagMetaData.append(row)
-                if row["Name"] in ["Class", "RDF Class"]:
-                    self.diagClassData.append(row)
-                if row["Name"] == "Line":
-                    self.diagLinkData.append(row)
+        if fname == "-":
+            self.loadDiagStream(sys.stdin)
+        elif self.loadJobs > 1:
+            from .chunkedLoad import loadDiagChunks
+
+            loadDiagChunks(self, fname, self.loadJobs)
+        else:
+            with open(fname, "r") as diag_file:
+                self.loadDiagStream(diag_file)
+
+    def loadDiagStream(self, diag_file):
+        """Read diagram data in CSV format from an open text file, replacing any loaded before."""
+        self.clearDiagData()
+        csvReader = reader(diag_file)
+        header = next(csvReader, [])
+        project = self.columns.compile(header)
+        makeRow = self.columns.makeRow
+        for row_number, record in enumerate(csvReader, 2):
+            if not record:  # skip blank lines, as DictReader does
+                continue
+            self.addDiagRow(makeRow(project(record), row_number))
+
+    def clearDiagData(self):
+        """Forget any diagram data loaded before."""
+        self.diagMetaData = list()
+        self.diagClassData = list()
+        self.diagLinkData = list()
+        self.classIndex = dict()
+        self.classURIIndex = dict()
+
+    def addDiagRow(self, row):
+        """Add a DiagRow to the metadata, classes or links list, according to its shape name."""
+        if row["name"] in meta_shapes:
+            self.diagMetaData.append(row)
+        if row["name"] in class_shapes:
+            self.diagClassData.append(row)
+            self.classIndex[row["id"]] = row
+        if row["name"] in link_shapes:
+            self.diagLinkData.append(row)
 
     def convertMetadata(self):
         """Convert the metadata list into metadata properties."""
         for line in self.diagMetaData:
-            if line[name] == "Document":
-                self.metadata["title"] = line[text_1]
-            if line[name] == "Page":
-                self.metadata["date"] = line[date]
-                self.metadata["defines"] = line[defines]
-
-    def convertNamespaces(self):
-        """Convert any prefix defintions in the metadata list into rdflib namespaces, and add them to the namespace dict and schema graph."""
+            if line["name"] == "Document":
+                self.metadata["title"] = line["text_1"]
+            if line["name"] == "Page":
+                self.metadata["date"] = line["date"]
+                self.metadata["defines"] = line["defines"]
+
+    def convertNamespaces(self, skip_invalid=False):
+        """Convert any prefix defintions in the metadata list into rdflib namespaces, and add them to the namespace dict and schema graph.
+
+        If skip_invalid is True, definitions that cannot be used are left out instead of
+        raising an error."""
+        # class and datatype URIs depend on the namespaces
+        self.classURIIndex.clear()
+        self.datatypeURIIndex.clear()
         for line in self.diagMetaData:
-            if line[name] == "Page":
-                for ns_def in line[prefixes].split("\n"):
+            if line["name"] == "Page":
+                for ns_def in line["prefixes"].split("\n"):
+                    if skip_invalid and prefixDefinitionProblem(ns_def) is not None:
+                        continue
                     [pre, uri] = ns_def.split(": ")
-                    ns = uri2Namespace(uri)
+                    ns = uri2Namespace(uri, self.terms.Namespace)
                     self.namespaces.addNamespace(pre, ns)
-                    self.schema.bind(pre, ns)
+                    if self._schema is not None:
+                        self._schema.bind(pre, ns)
 
     def convertClasses(self):
         """Convert class cURIes from the classes list to rdflib URIRefs and add them with defintion data to the schema graph.
 
-        Locally defined classes are fully defined, those from other namespaces defer to the external definition."""
-        for line in self.diagClassData:
-            c_uris = line[text_1].split("\n")
-            for c_uri in c_uris:
-                c_uriref, ns_id, ns_uriref = splitCurie(c_uri, self.namespaces)
-                self.schema.add((c_uriref, RDF.type, RDFS.Class))
-                self.schema.add(((c_uriref, RDFS.isDefinedBy, ns_uriref)))
-                if ns_id == self.metadata["defines"]:
-                    if line[label] != "":
-                        value = Literal(line[label])
-                        self.schema.add((c_uriref, RDFS.label, value))
-                    if line[comment] != "":
-                        value = Literal(line[comment])
-                        self.schema.add((c_uriref, RDFS.comment, value))
-                    if line[subclass_of] != "":
-                        value = Literal(line[subclass_of])
-                        self.schema.add((c_uriref, RDFS.label, value))
-                    if line[scope_note] != "":
-                        value = Literal(line[scope_note])
-                        self.schema.add((c_uriref, RDFS.label, value))
-                if line[text_2] != "":
-                    prop_defs = line[text_2].split("\n")
-                    for prop_def in prop_defs:
-                        self.convertClassProperty(prop_def, c_uriref)
+        Locally defined classes are fully defined, those from other namespaces defer to
+        the external definition."""
+        seen = set()
+        self.addTriples(
+            triple
+            for line in self.diagClassData
+            for triple in self.classTriples(line, seen)
+        )
+
+    def classTriples(self, line, seen=None):
+        """Generate the triples defining the classes in one row of the classes list, and the properties listed with them.
+
+        If a set is given as seen, the triples defining a property with a datatype are only
+        generated the first time the pair of CURIEs is met, and the pair is added to the set;
+        later classes listing it only add their domain."""
+        t = self.terms
+        c_uris = line["text_1"].split("\n")
+        specs = self.classPropertySpecs(line["text_2"])
+        for c_uri in c_uris:
+            c_uriref, ns_id, ns_uriref = self.resolver.splitCurie(c_uri)
+            yield (c_uriref, t.rdf_type, t.rdfs_class)
+            yield (c_uriref, t.rdfs_is_defined_by, ns_uriref)
+            if ns_id == self.metadata["defines"]:
+                if line["label"] != "":
+                    value = t.Literal(line["label"])
+                    yield (c_uriref, t.rdfs_label, value)
+                if line["comment"] != "":
+                    value = t.Literal(line["comment"])
+                    yield (c_uriref, t.rdfs_comment, value)
+                if line["subclass_of"] != "":
+                    value = t.Literal(line["subclass_of"])
+                    yield (c_uriref, t.rdfs_label, value)
+                if line["scope_note"] != "":
+                    value = t.Literal(line["scope_note"])
+                    yield (c_uriref, t.rdfs_label, value)
+            for p_curie, datatype in specs:
+                yield from self.propertySpecTriples(p_curie, datatype, c_uriref, seen)
+
+    def classPropertySpecs(self, text):
+        """Return the (property, datatype) pairs listed in a class's Text Area 2, raising a ValueError if any line cannot be read."""
+        if type(text) is not str:
+            print(text)
+            msg = "Class property definition must be a string"
+            raise TypeError(msg)
+        if text == "":
+            return ()
+        specs, unread = propertySpecs(text)
+        if unread:
+            print(text)
+            msg = "Could not read property definition: " + repr(unread[0])
+            raise ValueError(msg)
+        return specs
 
     def convertClassProperty(self, prop_def, c_uriref):
         """Convert property cURIe from the list of properties associated with a class to rdflib URIRefs and add them with defintion data to the schema graph.
 
-        The properties are assumed to have Literal values. Optionally a datatype may be include in parentheses after the property CURIe/URI in the definition.
+        The properties have Literal values. Optionally a datatype may be include in parentheses after the property CURIE in the definition, which is used as the range.
 
-        Locally defined properties are fully defined, those from other namespaces defer to the external definition."""
-        if type(prop_def) is not str:
+        Locally defined properties are fully defined, those from other namespaces defer
+        to the external definition."""
+        triples = list(self.classPropertyTriples(prop_def, c_uriref))
+        if not triples:
             print(prop_def)
-            msg = "Class property definition must be a string"
-            raise TypeError(msg)
-        if "(" in prop_def:
-            [p_uri, dataType] = prop_def.split(" (")
-            dataType = dataType[:-1]  # strip trailling ')'
+            msg = "Could not read property definition: " + repr(prop_def)
+            raise ValueError(msg)
+        self.addTriples(triples)
+        return triples[0][0]
+
+    def classPropertyTriples(self, prop_def, c_uriref):
+        """Generate the triples defining one property from the list of properties associated with a class."""
+        for p_curie, datatype in self.classPropertySpecs(prop_def):
+            yield from self.propertySpecTriples(p_curie, datatype, c_uriref)
+
+    def propertySpecTriples(self, p_curie, datatype, c_uriref, seen=None):
+        """Generate the triples defining a property with a datatype, and giving a class as its domain; see classTriples for seen."""
+        t = self.terms
+        p_uriref, ns_id, ns_uriref = self.resolver.splitCurie(p_curie)
+        range_uriref = self.findDatatypeURI(datatype)
+        local = ns_id == self.metadata["defines"]
+        # the CURIEs are cheaper to hash than the URIRefs they resolve to
+        if seen is None or (p_curie, datatype) not in seen:
+            if seen is not None:
+                seen.add((p_curie, datatype))
+            yield (p_uriref, t.rdf_type, t.rdf_property)
+            yield (p_uriref, t.rdfs_is_defined_by, ns_uriref)
+            if local:
+                yield (p_uriref, t.rdfs_range, range_uriref)
+            else:  # tread softly...
+                yield (p_uriref, t.sdo_range_includes, range_uriref)
+        if local:
+            yield (p_uriref, t.rdfs_domain, c_uriref)
         else:
-            p_uri = prop_def
-            dataType = str()
-        p_uriref, ns_id, ns_uriref = splitCurie(p_uri, self.namespaces)
-        self.schema.add((p_uriref, RDF.type, RDF.Property))
-        self.schema.add(((p_uriref, RDFS.isDefinedBy, ns_uriref)))
-        if ns_id == self.metadata["defines"]:
-            self.schema.add(((p_uriref, RDFS.range, RDFS.Literal)))
-            self.schema.add(((p_uriref, RDFS.domain, c_uriref)))
-        else:  # tread softly...
-            self.schema.add(((p_uriref, SDO.rangeIncludes, RDFS.Literal)))
-            self.schema.add(((p_uriref, SDO.domainIncludes, c_uriref)))
-        return p_uriref
+            yield (p_uriref, t.sdo_domain_includes, c_uriref)
+
+    def findDatatypeURI(self, datatype):
+        """Return the URIRef of a property's datatype CURIE, or rdfs:Literal if there is none, resolving each CURIE only once.
+
+        The xsd, rdf and rdfs prefixes may be used for datatypes without being declared. A
+        datatype that is not a CURIE with a known prefix, such as (Text), is written as
+        rdfs:Literal with a warning to stderr."""
+        if datatype == "":
+            return self.terms.rdfs_literal
+        if datatype not in self.datatypeURIIndex:
+            prefix = datatype.split(":")[0]
+            prefixes = self.namespaces.keys() | datatype_namespaces.keys()
+            message = curieProblem(datatype, prefixes)
+            if message is not None and not datatype.startswith("http"):
+                print(
+                    "Warning: rdfs:Literal used for datatype " + datatype + ".",
+                    message,
+                    file=sys.stderr,
+                )
+                uriref = self.terms.rdfs_literal
+            elif prefix in datatype_namespaces and prefix not in self.namespaces:
+                uri = datatype_namespaces[prefix] + datatype[len(prefix) + 1 :]
+                uriref = self.resolver.intern(self.terms.URIRef(uri))
+            else:
+                uriref = self.resolver.uriref(datatype)
+            self.datatypeURIIndex[datatype] = uriref
+        return self.datatypeURIIndex[datatype]
 
     def convertLinkProperties(self):
         """Convert property cURIes from the properties list to rdflib URIRefs and add them with defintion data to the schema graph.
 
-        Locally defined properties are fully defined, those from other namespaces defer to the external definition."""
+        Locally defined properties are fully defined, those from other namespaces defer
+        to the external definition."""
+        self.checkLinkIDs()
+        self.addTriples(
+            triple for line in self.diagLinkData for triple in self.linkTriples(line)
+        )
+
+    def addTriples(self, triples):
+        """Add triples to the schema graph in one batch, dropping duplicates before they reach the store."""
+        batch = set(triples)
+        schema = self.schema
+        schema.addN((s, p, o, schema) for s, p, o in batch)
+
+    def linkTriples(self, line):
+        """Generate the triples defining the properties in one row of the links list."""
+        t = self.terms
+        p_uris = line["text_1"].split()
+        source = self.getLinkSource(line)
+        destination = self.getLinkDestination(line)
+        for p_uri in p_uris:
+            p_uriref, ns_id, ns_uriref = self.resolver.splitCurie(p_uri)
+            yield (p_uriref, t.rdf_type, t.rdf_property)
+            yield (p_uriref, t.rdfs_is_defined_by, ns_uriref)
+            if ns_id == self.metadata["defines"]:
+                yield (p_uriref, t.rdfs_domain, source)
+                yield (p_uriref, t.rdfs_range, destination)
+                if line["label"] != "":
+                    value = t.Literal(line["label"])
+                    yield (p_uriref, t.rdfs_label, value)
+                if line["comment"] != "":
+                    value = t.Literal(line["comment"])
+                    yield (p_uriref, t.rdfs_comment, value)
+                if line["scope_note"] != "":
+                    value = t.Literal(line["scope_note"])
+                    yield (p_uriref, t.rdfs_label, value)
+            else:  # tread softly...
+                yield (p_uriref, t.sdo_domain_includes, source)
+                yield (p_uriref, t.sdo_range_includes, destination)
+
+    def iterTriples(self):
+        """Generate the triples for all the classes and links, without adding them to the schema graph.
+
+        The metadata and namespaces must already have been converted."""
+        seen = set()
+        for line in self.diagClassData:
+            yield from self.classTriples(line, seen)
+        self.checkLinkIDs()
         for line in self.diagLinkData:
-            p_uris = line[text_1].split()
-            source = self.getLinkSource(line)
-            destination = self.getLinkDestination(line)
-            for p_uri in p_uris:
-                p_uriref, ns_id, ns_uriref = splitCurie(p_uri, self.namespaces)
-                self.schema.add((p_uriref, RDF.type, RDF.Property))
-                self.schema.add(((p_uriref, RDFS.isDefinedBy, ns_uriref)))
-                if ns_id == self.metadata["defines"]:
-                    self.schema.add((p_uriref, RDFS.domain, source))
-                    self.schema.add((p_uriref, RDFS.range, destination))
-                    if line[label] != "":
-                        value = Literal(line[label])
-                        self.schema.add((p_uriref, RDFS.label, value))
-                    if line[comment] != "":
-                        value = Literal(line[comment])
-                        self.schema.add((p_uriref, RDFS.comment, value))
-                    if line[scope_note] != "":
-                        value = Literal(line[scope_note])
-                        self.schema.add((p_uriref, RDFS.label, value))
-                else:  # tread softly...
-                    self.schema.add((p_uriref, SDO.domainIncludes, source))
-                    self.schema.add((p_uriref, SDO.rangeIncludes, destination))
+            yield from self.linkTriples(line)
+
+    def streamDiag2RDFS(self, fname, sink):
+        """Load diagram data and write its triples to a triple sink as they are converted, bypassing the schema graph."""
+        self.reset()
+        self.runStage("loadDiagData", self.loadDiagData, fname)
+        self.runStage("convertMetadata", self.convertMetadata)
+        self.runStage("convertNamespaces", self.convertNamespaces)
+        sink.start(self.metadata, self.namespaces)
+        counter = lambda: sink.count
+        self.runStage("streamTriples", self.streamTriples, sink, triples=counter)
+        sink.close()
+
+    def streamTriples(self, sink):
+        """Add the triples for all the classes and links to a triple sink."""
+        for triple in self.iterTriples():
+            sink.add(triple)
 
     def getLinkSource(self, link_data):
         """Return the URIRef of the class at the start of a link."""
-        if type(link_data) is not dict:
+        if type(link_data) is not DiagRow:
             print(link_data)
-            msg = "Link data must be a dict."
+            msg = "Link data must be a DiagRow."
             raise TypeError(msg)
-        if link_data[source_arrow] == "None":
-            source_id = link_data[line_source]
-        elif link_data[source_arrow] == "Arrow":
-            source_id = link_data[line_destination]
+        if link_data["source_arrow"] == "None":
+            source_id = link_data["line_source"]
+        elif link_data["source_arrow"] == "Arrow":
+            source_id = link_data["line_destination"]
         else:
-            msg = "Unknown value for source_arrow: " + link_data[source_arrow]
+            msg = "Unknown value for source_arrow: " + link_data["source_arrow"]
             raise ValueError(msg)
-        source = self.findClassByID(source_id)
-        return str2uriref(source, self.namespaces)
+        return self.findClassURIByID(source_id)
 
     def getLinkDestination(self, link_data):
         """Return the URIRef of the class at the end of a link."""
-        if type(link_data) is not dict:
+        if type(link_data) is not DiagRow:
             print(link_data)
-            msg = "Link data must be a dict."
+            msg = "Link data must be a DiagRow."
             raise TypeError(msg)
-        if link_data[destination_arrow] == "Arrow":
-            destination_id = link_data[line_destination]
-        elif link_data[destination_arrow] == "None":
-            destination_id = link_data[line_source]
+        if link_data["destination_arrow"] == "Arrow":
+            destination_id = link_data["line_destination"]
+        elif link_data["destination_arrow"] == "None":
+            destination_id = link_data["line_source"]
         else:
-            msg = "Unknown value for destination_arrow: " + link_data[destination_arrow]
+            msg = (
+                "Unknown value for destination_arrow: " + link_data["destination_arrow"]
+            )
             raise ValueError(msg)
-        destination = self.findClassByID(destination_id)
-        return str2uriref(destination, self.namespaces)
+        return self.findClassURIByID(destination_id)
 
     def findClassByID(self, class_id):
         if type(class_id) is not str:
             print(class_id)
             msg = "Class ID should be a string."
             raise TypeError(msg)
-        for line in self.diagClassData:
-            if line[id] == class_id:
-                return line[text_1]
+        if class_id in self.classIndex:
+            return self.classIndex[class_id]["text_1"]
         # if you get here you didn't find a class matching the id
         print(class_id)
         msg = "Could not find class with id " + class_id + "."
         raise ValueError(msg)
 
-    def writeSchema(self):
-        print("# Title: ", self.metadata["title"])
-        print("# Date: ", self.metadata["date"])
-        print(self.schema.serialize())
+    def findClassURIByID(self, class_id):
+        """Return the URIRef of the class with the given id, resolving it only the first time it is asked for."""
+        if class_id not in self.classURIIndex:
+            class_curie = self.findClassByID(class_id)
+            self.classURIIndex[class_id] = self.resolver.uriref(class_curie)
+        return self.classURIIndex[class_id]
+
+    def findDanglingLinkIDs(self):
+        """Return a dict of link ids and the class ids at their ends that do not match any class."""
+        dangling = dict()
+        for line in self.diagLinkData:
+            missing = [
+                class_id
+                for class_id in (line["line_source"], line["line_destination"])
+                if class_id not in self.classIndex
+            ]
+            if missing:
+                dangling[line["id"]] = missing
+        return dangling
+
+    def checkLinkIDs(self):
+        """Raise a ValueError listing every link whose ends do not match a class."""
+        dangling = self.findDanglingLinkIDs()
+        if dangling:
+            print(dangling)
+            problems = [
+                link_id + " -> " + ", ".join(class_ids)
+                for link_id, class_ids in dangling.items()
+            ]
+            msg = "Could not find classes for links: " + "; ".join(problems) + "."
+            raise ValueError(msg)
+
+    def serializeSchema(self):
+        """Return the schema as a string of Turtle, headed by comments giving the diagram title and date."""
+        header = "# Title:  " + self.metadata["title"] + "\n"
+        header += "# Date:  " + self.metadata["date"] + "\n"
+        return header + self.schema.serialize() + "\n"
+
+    def writeSchema(self, fname=None):
+        """Write the serialized schema to the named file, or print it if no file name is given."""
+        text = self.runStage("serializeSchema", self.serializeSchema)
+        if fname is None:
+            print(text, end="")
+        else:
+            with open(fname, "w") as schema_file:
+                schema_file.write(text)
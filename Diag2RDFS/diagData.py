@@ -0,0 +1,116 @@
+from operator import itemgetter
+
+# default column headings in csv exported from Lucid, keyed by the field names
+# the converter and validator read; other columns are not kept. Override any of them,
+# or add more, by passing a dict to ColumnMap.
+DEFAULT_COLUMNS = {
+    "id": "Id",
+    "name": "Name",
+    "page_id": "Page ID",
+    "line_source": "Line Source",
+    "line_destination": "Line Destination",
+    "source_arrow": "Source Arrow",
+    "destination_arrow": "Destination Arrow",
+    "text_1": "Text Area 1",
+    "text_2": "Text Area 2",
+    "date": "dct:date",
+    "defines": "defines",
+    "prefixes": "prefixes",
+    "comment": "rdfs:comment",
+    "label": "rdfs:label",
+    "subclass_of": "rdfs:subclassof",
+    "scope_note": "skos:scopenote",
+}
+
+
+class DiagRow:
+    """A compact, read-only record holding the projected columns of one row of diagram data.
+
+    rowNumber is the number of the csv record the row was read from, counting the header as
+    1, or None for a row made without one."""
+
+    __slots__ = ("_fields", "_values", "rowNumber")
+
+    def __init__(self, fields, values, row_number=None):
+        self._fields = fields
+        self._values = values
+        self.rowNumber = row_number
+
+    def __getitem__(self, field):
+        return self._values[self._fields[field]]
+
+    def __contains__(self, field):
+        return field in self._fields
+
+    def __eq__(self, other):
+        if type(other) is not DiagRow:
+            return NotImplemented
+        return self.asDict() == other.asDict()
+
+    def __repr__(self):
+        return "DiagRow(" + repr(self.asDict()) + ")"
+
+    def __getstate__(self):
+        return (self._fields, self._values, self.rowNumber)
+
+    def __setstate__(self, state):
+        self._fields, self._values, self.rowNumber = state
+
+    def get(self, field, default=None):
+        """Return the value of a field, or default if the field is not projected."""
+        if field in self._fields:
+            return self._values[self._fields[field]]
+        return default
+
+    def keys(self):
+        return self._fields.keys()
+
+    def asDict(self):
+        """Return the row as a dict of field names and values."""
+        return {field: self._values[i] for field, i in self._fields.items()}
+
+
+class ColumnMap:
+    """The csv columns read from a diagram export, and the field names they are read into."""
+
+    def __init__(self, columns=None):
+        if columns is None:
+            columns = dict()
+        if type(columns) is not dict:
+            msg = "Columns must be a dict of field names and column headings."
+            print(columns)
+            raise TypeError(msg)
+        self.columns = dict(DEFAULT_COLUMNS)
+        self.columns.update(columns)
+        self.fields = {field: i for i, field in enumerate(self.columns)}
+
+    def __eq__(self, other):
+        return type(other) is ColumnMap and self.columns == other.columns
+
+    def compile(self, header):
+        """Return a function that projects a csv record with the given header onto a tuple of field values.
+
+        Columns missing from the header are read as empty strings."""
+        positions = {heading: i for i, heading in enumerate(header)}
+        indices = [positions.get(heading) for heading in self.columns.values()]
+        width = len(header)
+        if None not in indices:
+            if len(indices) == 1:
+                getter = lambda record: (record[indices[0]],)
+            else:
+                getter = itemgetter(*indices)
+        else:
+
+            def getter(record):
+                return tuple("" if i is None else record[i] for i in indices)
+
+        def project(record):
+            if len(record) < width:  # pad short records with empty values
+                record = record + [""] * (width - len(record))
+            return getter(record)
+
+        return project
+
+    def makeRow(self, values, row_number=None):
+        """Return a DiagRow of field values already projected by compile()."""
+        return DiagRow(self.fields, values, row_number)
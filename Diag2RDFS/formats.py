@@ -0,0 +1,208 @@
+import json
+from os import makedirs, path, remove
+from time import perf_counter
+from .diag2RDFSConverter import Diag2RDFSConverter
+from .batch import checkOutputNames
+
+# output formats, with the rdflib serializer and file extension used for each
+output_formats = {
+    "ttl": ("turtle", ".ttl"),
+    "nt": ("nt", ".nt"),
+    "xml": ("xml", ".rdf"),
+    "json-ld": ("json-ld", ".jsonld"),
+}
+
+
+def commentHeader(metadata):
+    """Return the diagram title and date as # comments, for Turtle and N-Triples."""
+    header = "# Title:  " + metadata["title"] + "\n"
+    header += "# Date:  " + metadata["date"] + "\n"
+    return header
+
+
+def xmlComment(text):
+    """Return text as an XML comment, breaking up any -- that would end it early."""
+    while "--" in text:
+        text = text.replace("--", "- -")
+    return "<!-- " + text + " -->\n"
+
+
+def serializeFormat(schema, metadata, output_format):
+    """Return a schema graph serialized in one output format, headed by the diagram title and date.
+
+    Turtle and N-Triples start with # comments, as serializeSchema writes them, and RDF/XML
+    with XML comments after the XML declaration. JSON-LD has no comments, so the graph is
+    wrapped in an object whose title and date keys are not mapped to IRIs, which JSON-LD
+    processors ignore."""
+    if output_format not in output_formats:
+        msg = "Unknown output format: " + str(output_format)
+        print(output_format)
+        raise ValueError(msg)
+    text = schema.serialize(format=output_formats[output_format][0])
+    if output_format == "ttl":
+        return commentHeader(metadata) + text + "\n"
+    if output_format == "nt":
+        return commentHeader(metadata) + text
+    if output_format == "xml":
+        declaration, rest = text.split("\n", 1)
+        header = xmlComment("Title:  " + metadata["title"])
+        header += xmlComment("Date:  " + metadata["date"])
+        return declaration + "\n" + header + rest
+    document = json.loads(text)
+    wrapped = {"title": metadata["title"], "date": metadata["date"]}
+    if type(document) is dict and "@graph" in document:
+        wrapped.update(document)
+    else:
+        wrapped["@graph"] = document
+    return json.dumps(wrapped, indent=2) + "\n"
+
+
+def formatFileName(fname, output_dir, output_format):
+    """Return the name of the file for a diagram's schema in one output format."""
+    base = path.splitext(path.basename(fname))[0]
+    if output_dir is None:
+        output_dir = path.dirname(fname)
+    return path.join(output_dir, base + output_formats[output_format][1])
+
+
+# the schema being serialized, set in each worker process
+worker_schema = None
+
+
+def setWorkerSchema(schema, metadata):
+    global worker_schema
+    worker_schema = (schema, metadata)
+
+
+def writeFormat(output_format, fname, schema=None, metadata=None):
+    """Serialize a schema, by default the worker's, in one output format to a file, returning the file name."""
+    if schema is None:
+        schema, metadata = worker_schema
+    text = serializeFormat(schema, metadata, output_format)
+    with open(fname, "w", encoding="utf-8") as out:
+        out.write(text)
+    return fname
+
+
+def writeFormats(c, formats, fname, output_dir=None, jobs=None):
+    """Write the schema of a converted diagram in each of several output formats, returning a dict of the files written.
+
+    The files are named after the diagram file fname and go in output_dir, or beside fname.
+    Each format is serialized in its own process, up to jobs at once, by default one per
+    format; on platforms that fork, the processes share the converted graph without copying
+    it."""
+    for output_format in formats:
+        if output_format not in output_formats:
+            msg = "Unknown output format: " + str(output_format)
+            print(output_format)
+            raise ValueError(msg)
+    if jobs is None:
+        jobs = len(formats)
+    if output_dir is not None:
+        makedirs(output_dir, exist_ok=True)
+    fnames = [formatFileName(fname, output_dir, f) for f in formats]
+    if jobs == 1 or len(formats) < 2:
+        return {
+            f: writeFormat(f, name, c.schema, c.metadata)
+            for f, name in zip(formats, fnames)
+        }
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=setWorkerSchema,
+        initargs=(c.schema, c.metadata),
+    ) as pool:
+        return dict(zip(formats, pool.map(writeFormat, formats, fnames)))
+
+
+def cachedFormats(fname, formats, columns, cache):
+    """Return a dict of the cache key and cached text, or None, for a diagram file in each output format."""
+    with open(fname, "rb") as diag_file:
+        data = diag_file.read()
+    keys = {f: cache.key(data, columns, "formats-" + f) for f in formats}
+    return {f: (key, cache.get(key)) for f, key in keys.items()}
+
+
+def convertFormatsFile(
+    fname, formats, output_dir=None, cache=None, jobs=1, load_jobs=1
+):
+    """Convert one diagram file and write its schema in each of several output formats, returning a dict describing the result.
+
+    The formats are serialized in up to jobs processes. If a ConversionCache is given, the
+    formats cached for the same csv content are written from it, and the diagram is only
+    converted for the others. Errors are recorded in the result, as by convertFile."""
+    result = {"input": fname, "output": None, "error": None, "cached": False}
+    start = perf_counter()
+    written = list()
+    try:
+        c = Diag2RDFSConverter(load_jobs=load_jobs)
+        cached = dict()
+        if cache is not None:
+            cached = cachedFormats(fname, formats, c.columns, cache)
+        missing = [f for f in formats if f not in cached or cached[f][1] is None]
+        for f in formats:
+            if f not in missing:
+                written.append(formatFileName(fname, output_dir, f))
+                with open(written[-1], "w", encoding="utf-8") as out:
+                    out.write(cached[f][1])
+        if missing:
+            c.convertDiag2RDFS(fname)
+            names = writeFormats(c, missing, fname, output_dir, jobs)
+            written.extend(names.values())
+            for f in missing:
+                if cache is not None:
+                    with open(names[f], encoding="utf-8") as schema_file:
+                        cache.put(cached[f][0], schema_file.read())
+        result["output"] = ", ".join(written)
+        result["cached"] = not missing
+    except Exception as e:
+        for name in written:  # don't leave some of the formats behind
+            if path.exists(name):
+                remove(name)
+        result["error"] = type(e).__name__ + ": " + str(e)
+    result["seconds"] = perf_counter() - start
+    return result
+
+
+def convertFormatsBatch(
+    fnames, formats, output_dir=None, jobs=1, cache=None, load_jobs=1
+):
+    """Convert each diagram file and write its schema in each of several output formats, using up to jobs processes.
+
+    Several files are converted in a pool of jobs processes, each serializing its formats in
+    turn; a single file has its formats serialized in up to jobs processes. Returns the list
+    of results from convertFormatsFile, in the same order as fnames. Raises a ValueError, as
+    convertBatch does, if two files would be written to the same schema files."""
+    if type(jobs) is not int or jobs < 1:
+        msg = "Number of jobs must be a positive integer."
+        print(jobs)
+        raise ValueError(msg)
+    for output_format in formats:
+        if output_format not in output_formats:
+            msg = "Unknown output format: " + str(output_format)
+            print(output_format)
+            raise ValueError(msg)
+    checkOutputNames(fnames, output_dir)
+    if output_dir is not None:
+        makedirs(output_dir, exist_ok=True)
+    n = len(fnames)
+    if jobs == 1 or n < 2:
+        return [
+            convertFormatsFile(fname, formats, output_dir, cache, jobs, load_jobs)
+            for fname in fnames
+        ]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(
+            pool.map(
+                convertFormatsFile,
+                fnames,
+                [formats] * n,
+                [output_dir] * n,
+                [cache] * n,
+                [1] * n,
+                [load_jobs] * n,
+            )
+        )
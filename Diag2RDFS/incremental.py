@@ -0,0 +1,170 @@
+import sys
+from collections import Counter
+from hashlib import sha1
+from os import stat
+from time import perf_counter, sleep
+from .diag2RDFSConverter import Diag2RDFSConverter
+
+
+def rowHash(row):
+    """Return a hash of the content of a DiagRow."""
+    return sha1("\x1f".join(row._values).encode("utf-8")).digest()
+
+
+class IncrementalConverter:
+    """Keep a schema graph up to date with a diagram file, reconverting only the rows that change.
+
+    The triples produced by each class and link row are remembered, with a count of how many
+    rows produce each triple, so a changed row can retract its old triples without removing
+    any that other rows still produce. A change to the document or page rows changes the
+    context every row is converted in, so the whole diagram is converted again."""
+
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.converter = None
+        self.metaHash = None
+        self.rowHashes = dict()
+        self.rowTriples = dict()
+        self.refCounts = Counter()
+
+    @property
+    def schema(self):
+        return self.converter.schema
+
+    def loadConverter(self, fname):
+        """Return a new converter with the diagram data loaded and its metadata and namespaces converted."""
+        c = Diag2RDFSConverter(self.columns)
+        c.loadDiagData(fname)
+        c.convertMetadata()
+        c.convertNamespaces()
+        c.checkLinkIDs()
+        return c
+
+    def rowKeys(self, c):
+        """Return a dict of the class and link rows of a converter, keyed by kind and row id."""
+        rows = {("class", row["id"]): row for row in c.diagClassData}
+        rows.update({("link", row["id"]): row for row in c.diagLinkData})
+        return rows
+
+    def convertRow(self, c, key, row):
+        if key[0] == "class":
+            return set(c.classTriples(row))
+        return set(c.linkTriples(row))
+
+    def update(self, fname):
+        """Bring the schema up to date with the diagram file, returning a dict of what changed.
+
+        If the new data cannot be converted the exception is raised and the schema and its
+        namespace bindings are left as they were."""
+        start = perf_counter()
+        c = self.loadConverter(fname)
+        meta_hash = sha1(b"".join(rowHash(row) for row in c.diagMetaData)).digest()
+        rows = self.rowKeys(c)
+        hashes = {key: rowHash(row) for key, row in rows.items()}
+        full = self.converter is None or meta_hash != self.metaHash
+        if full:
+            changed = set(hashes) | set(self.rowHashes)
+        else:
+            changed = {
+                key
+                for key in set(hashes) | set(self.rowHashes)
+                if hashes.get(key) != self.rowHashes.get(key)
+            }
+            # links take the URIs of the classes at their ends
+            changed_classes = {key[1] for key in changed if key[0] == "class"}
+            for key, row in rows.items():
+                if key[0] == "link" and (
+                    row["line_source"] in changed_classes
+                    or row["line_destination"] in changed_classes
+                ):
+                    changed.add(key)
+        # convert every changed row before touching the schema, so errors leave it intact
+        new_triples = {
+            key: self.convertRow(c, key, rows[key]) for key in changed if key in rows
+        }
+        if self.converter is not None:  # move the live schema to the new converter
+            schema = self.converter.schema
+            for pre, ns in c.namespaces.items():
+                schema.bind(pre, ns)
+            c.schema = schema
+        removed = 0
+        added = 0
+        for key in changed:
+            for triple in self.rowTriples.pop(key, ()):
+                self.refCounts[triple] -= 1
+                if self.refCounts[triple] == 0:
+                    del self.refCounts[triple]
+                    c.schema.remove(triple)
+                    removed += 1
+        batch = list()
+        for key, triples in new_triples.items():
+            self.rowTriples[key] = triples
+            for triple in triples:
+                if self.refCounts[triple] == 0:
+                    batch.append(triple)
+                self.refCounts[triple] += 1
+        c.addTriples(batch)
+        added = len(batch)
+        self.converter = c
+        self.metaHash = meta_hash
+        self.rowHashes = hashes
+        return {
+            "full": full,
+            "rows": len(changed),
+            "added": added,
+            "removed": removed,
+            "seconds": perf_counter() - start,
+        }
+
+    def writeSchema(self, fname=None):
+        """Write the schema as the converter's writeSchema does."""
+        self.converter.writeSchema(fname)
+
+
+def fileSignature(fname):
+    """Return the modification time and size of a file, or None if it cannot be read."""
+    try:
+        info = stat(fname)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
+
+
+def watch(fname, output, interval=0.5, columns=None, updates=None):
+    """Convert a diagram file to a schema file, then update the schema each time the diagram file changes.
+
+    Runs until interrupted, or for the given number of updates. Each update is reported
+    on stderr."""
+    incremental = IncrementalConverter(columns)
+    signature = None
+    count = 0
+    while updates is None or count < updates:
+        current = fileSignature(fname)
+        if current is not None and current != signature:
+            signature = current
+            count += 1
+            try:
+                stats = incremental.update(fname)
+            except Exception as e:
+                print("Not updated:", type(e).__name__ + ":", e, file=sys.stderr)
+                continue
+            try:
+                incremental.writeSchema(output)
+            except OSError as e:
+                print("Not written:", type(e).__name__ + ":", e, file=sys.stderr)
+                continue
+            print(
+                "%s: %d rows changed, %d triples added, %d removed in %.3fs%s"
+                % (
+                    fname,
+                    stats["rows"],
+                    stats["added"],
+                    stats["removed"],
+                    stats["seconds"],
+                    " (full conversion)" if stats["full"] else "",
+                ),
+                file=sys.stderr,
+            )
+        else:
+            sleep(interval)
+    return incremental
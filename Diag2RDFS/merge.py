@@ -0,0 +1,204 @@
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from os import path, remove
+from tempfile import TemporaryDirectory
+from .diag2RDFSConverter import Diag2RDFSConverter
+from .tripleSink import ntTriple
+
+# predicates for which one term should have a single value across all the diagrams
+conflict_predicates = {
+    "<http://www.w3.org/2000/01/rdf-schema#label>": "label",
+    "<http://www.w3.org/2000/01/rdf-schema#domain>": "domain",
+    "<http://www.w3.org/2000/01/rdf-schema#range>": "range",
+}
+
+
+def mapDiagram(fname, part_name):
+    """Convert one diagram and write its triples to part_name as sorted, unique N-Triples lines.
+
+    Returns a dict with the input, the part file, the diagram's namespaces and any error, so
+    that only this small summary goes back to the reducer."""
+    result = {"input": fname, "part": None, "namespaces": dict(), "error": None}
+    try:
+        c = Diag2RDFSConverter()
+        c.convertDiag2RDFS(fname)
+        lines = sorted({ntTriple(triple) for triple in c.schema})
+        with open(part_name, "w", encoding="utf-8") as part:
+            part.writelines(lines)
+        result["part"] = part_name
+        result["namespaces"] = {pre: str(ns) for pre, ns in c.namespaces.items()}
+    except Exception as e:
+        result["error"] = type(e).__name__ + ": " + str(e)
+    return result
+
+
+def unifyNamespaces(results):
+    """Return a dict of prefixes and namespace uris for all the diagrams, and a list of clashes.
+
+    The first diagram to use a prefix keeps it; a different namespace using the same prefix
+    later is renamed with a number, and a namespace already bound keeps its first
+    prefix."""
+    prefixes = dict()
+    bound = dict()
+    clashes = list()
+    for result in results:
+        for pre, uri in result["namespaces"].items():
+            if uri in bound:
+                continue
+            if pre in prefixes:
+                clashes.append(
+                    {
+                        "prefix": pre,
+                        "namespaces": [prefixes[pre], uri],
+                        "input": result["input"],
+                    }
+                )
+                n = 2
+                while pre + str(n) in prefixes:
+                    n += 1
+                pre = pre + str(n)
+            prefixes[pre] = uri
+            bound[uri] = pre
+    return prefixes, clashes
+
+
+def readPart(part_name, source):
+    """Generate the lines of a part file, each with the number of the diagram it came from."""
+    with open(part_name, encoding="utf-8") as part:
+        for line in part:
+            yield line, source
+
+
+def subjectPredicate(line):
+    """Return the subject and predicate of an N-Triples line as one string."""
+    return line[: line.index(" ", line.index(" ") + 1)]
+
+
+def mergeParts(results, out):
+    """Merge the sorted part files of the mapped diagrams into out, writing each triple once.
+
+    Returns a list of conflicts: terms given different labels, domains or ranges by different
+    diagrams, with the values and the files that gave them."""
+    sources = [result["input"] for result in results]
+    parts = [
+        readPart(result["part"], n)
+        for n, result in enumerate(results)
+        if result["part"] is not None
+    ]
+    conflicts = list()
+    group_key = None
+    # object -> numbers of the diagrams giving it, for the current subject and predicate
+    group = dict()
+
+    def checkGroup():
+        if len(group) > 1:
+            by_source = dict()
+            for value, ns in group.items():
+                for n in ns:
+                    by_source.setdefault(n, set()).add(value)
+            # diagrams that all give the same values agree, however many values there are
+            if len(set(frozenset(values) for values in by_source.values())) > 1:
+                subject, predicate = group_key.split(" ", 1)
+                conflicts.append(
+                    {
+                        "subject": subject[1:-1],
+                        "property": conflict_predicates[predicate],
+                        "values": {
+                            value: sorted(sources[n] for n in ns)
+                            for value, ns in sorted(group.items())
+                        },
+                    }
+                )
+
+    previous = None
+    for line, source in heapq.merge(*parts):
+        key = subjectPredicate(line)
+        if key != group_key:
+            checkGroup()
+            group_key = key
+            group = dict()
+        if key.split(" ", 1)[1] in conflict_predicates:
+            value = line[len(key) + 1 : -3]
+            group.setdefault(value, set()).add(source)
+        if line != previous:
+            out.write(line)
+            previous = line
+    checkGroup()
+    return conflicts
+
+
+def mergeDiagrams(fnames, output, jobs=1, output_format="nt"):
+    """Convert many diagrams in parallel and merge them into one schema file.
+
+    Each diagram is converted and written out as a sorted part file, so the reducer only ever
+    reads one line from each part at a time. output_format "nt" streams the merged triples
+    to the output; any other rdflib format loads the merged triples into one graph with the
+    unified namespace bindings and serializes that. Returns a dict with the per-file results,
+    the namespace clashes and the conflicting definitions."""
+    if type(jobs) is not int or jobs < 1:
+        msg = "Number of jobs must be a positive integer."
+        print(jobs)
+        raise ValueError(msg)
+    with TemporaryDirectory() as work_dir:
+        part_names = [path.join(work_dir, "%d.nt" % n) for n in range(len(fnames))]
+        if jobs == 1 or len(fnames) < 2:
+            results = list(map(mapDiagram, fnames, part_names))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(mapDiagram, fnames, part_names))
+        prefixes, clashes = unifyNamespaces(results)
+        if output_format == "nt":
+            with open(output, "w", encoding="utf-8") as out:
+                conflicts = mergeParts(results, out)
+        else:
+            merged_name = path.join(work_dir, "merged.nt")
+            with open(merged_name, "w", encoding="utf-8") as out:
+                conflicts = mergeParts(results, out)
+            for result in results:  # the parts are no longer needed
+                if result["part"] is not None:
+                    remove(result["part"])
+            writeMerged(merged_name, output, prefixes, output_format)
+    for result in results:
+        del result["part"]
+    return {"results": results, "namespace_clashes": clashes, "conflicts": conflicts}
+
+
+def writeMerged(merged_name, output, prefixes, output_format):
+    """Serialize merged N-Triples to output in an rdflib format, with the unified prefixes."""
+    from rdflib import Graph, Namespace
+
+    schema = Graph()
+    for pre, uri in prefixes.items():
+        schema.bind(pre, Namespace(uri))
+    schema.parse(merged_name, format="nt")
+    schema.serialize(destination=output, format=output_format)
+
+
+def summariseMerge(report):
+    """Return a text report of failed inputs, namespace clashes and conflicting definitions."""
+    lines = list()
+    for result in report["results"]:
+        if result["error"] is not None:
+            lines.append("FAILED %s: %s" % (result["input"], result["error"]))
+    for clash in report["namespace_clashes"]:
+        lines.append(
+            "Prefix %s: is %s, but %s in %s; renamed there"
+            % (
+                clash["prefix"],
+                clash["namespaces"][0],
+                clash["namespaces"][1],
+                clash["input"],
+            )
+        )
+    for conflict in report["conflicts"]:
+        lines.append(
+            "Conflicting %s for %s:" % (conflict["property"], conflict["subject"])
+        )
+        for value, files in conflict["values"].items():
+            lines.append("    %s from %s" % (value, ", ".join(files)))
+    converted = len([r for r in report["results"] if r["error"] is None])
+    lines.append(
+        "%d diagrams merged, %d failed, %d conflicts"
+        % (converted, len(report["results"]) - converted, len(report["conflicts"]))
+    )
+    return "\n".join(lines)
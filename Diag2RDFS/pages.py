@@ -0,0 +1,132 @@
+from .diag2RDFSConverter import Diag2RDFSConverter
+from RDFUtils import uri2Namespace
+
+
+def pagePrefixes(page_row):
+    """Return a list of (prefix, namespace uri) pairs defined on a Page row."""
+    pairs = list()
+    if page_row["prefixes"] == "":
+        return pairs
+    for ns_def in page_row["prefixes"].split("\n"):
+        [pre, uri] = ns_def.split(": ")
+        pairs.append((pre, uri))
+    return pairs
+
+
+def partitionPages(c):
+    """Split the class and link rows of a loaded converter by the page they are on.
+
+    Returns a list of dicts, one per Page row, holding the page row, its rows, the prefixes in
+    force on it and the namespace it defines. Every page sees the prefixes of all pages, with
+    its own taking precedence; a page that defines nothing uses the diagram's defines. Rows
+    with no known page go with the last page, as in a whole-diagram conversion."""
+    page_rows = [line for line in c.diagMetaData if line["name"] == "Page"]
+    all_prefixes = [pair for line in page_rows for pair in pagePrefixes(line)]
+    pages = dict()
+    for line in page_rows:
+        pages[line["id"]] = {
+            "page": line,
+            "prefixes": all_prefixes + pagePrefixes(line),
+            "defines": line["defines"] or c.metadata["defines"],
+            "classes": list(),
+            "links": list(),
+        }
+    if not pages:  # no Page rows, so one page in the diagram's context
+        pages[""] = {
+            "page": None,
+            "prefixes": all_prefixes,
+            "defines": c.metadata["defines"],
+            "classes": list(),
+            "links": list(),
+        }
+    last_page = list(pages.values())[-1]
+    for line in c.diagClassData:
+        pages.get(line["page_id"], last_page)["classes"].append(line)
+    for line in c.diagLinkData:
+        pages.get(line["page_id"], last_page)["links"].append(line)
+    return list(pages.values())
+
+
+def pageConverter(columns, page, class_uris=None):
+    """Return a converter set up with the rows, prefixes and defines of one page."""
+    c = Diag2RDFSConverter(columns)
+    c.metadata["defines"] = page["defines"]
+    for pre, uri in page["prefixes"]:
+        c.namespaces.addNamespace(pre, uri2Namespace(uri, c.terms.Namespace))
+    c.diagClassData = page["classes"]
+    c.diagLinkData = page["links"]
+    c.classIndex = {line["id"]: line for line in page["classes"]}
+    if class_uris is not None:
+        c.classURIIndex.update(class_uris)
+    return c
+
+
+def resolveLinkEnds(c, pages):
+    """Return a dict of the URIRef of every class at the end of a link, resolved on the class's own page.
+
+    Raises a ValueError listing every link end that does not match a class."""
+    c.checkLinkIDs()
+    wanted = set()
+    for page in pages:
+        for line in page["links"]:
+            wanted.add(line["line_source"])
+            wanted.add(line["line_destination"])
+    class_uris = dict()
+    for page in pages:
+        page_classes = [line for line in page["classes"] if line["id"] in wanted]
+        if page_classes:
+            page_c = pageConverter(c.columns.columns, page)
+            for line in page_classes:
+                class_uris[line["id"]] = page_c.findClassURIByID(line["id"])
+    return class_uris
+
+
+def convertPage(columns, page, class_uris):
+    """Return the list of triples converted from the classes and links of one page."""
+    c = pageConverter(columns, page, class_uris)
+    triples = list()
+    for line in c.diagClassData:
+        triples.extend(c.classTriples(line))
+    for line in c.diagLinkData:
+        triples.extend(c.linkTriples(line))
+    return triples
+
+
+def convertPages(c, jobs=1):
+    """Convert the classes and links of a loaded converter page by page, in up to jobs processes.
+
+    The metadata and namespaces must already have been converted. Each page's triples are
+    merged into the converter's schema graph, dropping duplicates."""
+    if type(jobs) is not int or jobs < 1:
+        msg = "Number of jobs must be a positive integer."
+        print(jobs)
+        raise ValueError(msg)
+    pages = partitionPages(c)
+    class_uris = resolveLinkEnds(c, pages)
+    columns = c.columns.columns
+    if jobs == 1 or len(pages) < 2:
+        for page in pages:
+            c.addTriples(convertPage(columns, page, class_uris))
+        return c
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pages))) as pool:
+        futures = [
+            pool.submit(convertPage, columns, page, class_uris) for page in pages
+        ]
+        for future in futures:
+            c.addTriples(future.result())
+    return c
+
+
+def convertByPage(fname, jobs=1, converter=None):
+    """Load a diagram and convert it page by page, returning the converter holding the schema."""
+    c = converter
+    if c is None:
+        c = Diag2RDFSConverter()
+    c.reset()
+    c.runStage("loadDiagData", c.loadDiagData, fname)
+    c.runStage("convertMetadata", c.convertMetadata)
+    c.runStage("convertNamespaces", c.convertNamespaces)
+    c.runStage("convertPages", convertPages, c, jobs, triples=lambda: len(c.schema))
+    return c
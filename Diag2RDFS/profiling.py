@@ -0,0 +1,97 @@
+import json
+import tracemalloc
+
+
+class StageHook:
+    """Base class for hooks passed to Diag2RDFSConverter.addHook; override the methods needed."""
+
+    def stageStarted(self, converter, stage):
+        pass
+
+    def stageFinished(self, converter, stage, stats):
+        pass
+
+
+class StageProfiler(StageHook):
+    """Record the time, rows, triples, CURIE cache use and peak memory of each conversion stage.
+
+    Peak memory is measured with tracemalloc, which slows conversion down; pass memory=False
+    to leave it out."""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = list()
+        self._cache = None
+        self._started_tracing = False
+
+    def stageStarted(self, converter, stage):
+        self._cache = converter.resolver.cacheInfo()
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+
+    def stageFinished(self, converter, stage, stats):
+        record = {"stage": stage}
+        record.update(stats)
+        cache = converter.resolver.cacheInfo()
+        if (
+            cache["hits"] + cache["misses"]
+            < self._cache["hits"] + self._cache["misses"]
+        ):
+            # the cache was emptied during the stage, so count from zero
+            self._cache = {"hits": 0, "misses": 0}
+        record["cache_hits"] = cache["hits"] - self._cache["hits"]
+        record["cache_misses"] = cache["misses"] - self._cache["misses"]
+        if self.memory:
+            record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        self.stages.append(record)
+
+    def stop(self):
+        """Stop tracing memory allocations, if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def totals(self):
+        """Return a dict of the totals over all stages."""
+        totals = {"stage": "total"}
+        for key in ["seconds", "triples", "cache_hits", "cache_misses"]:
+            totals[key] = sum(record[key] for record in self.stages)
+        if self.memory:
+            totals["peak_memory"] = max(
+                [record["peak_memory"] for record in self.stages], default=0
+            )
+        return totals
+
+    def report(self, format="text"):
+        """Return the profile as a text table, or as JSON if format is "json"."""
+        if format == "json":
+            return json.dumps({"stages": self.stages, "total": self.totals()}, indent=2)
+        lines = [
+            "%-22s %10s %8s %9s %8s %10s"
+            % ("stage", "seconds", "rows", "triples", "hit rate", "peak MiB")
+        ]
+        for record in self.stages + [self.totals()]:
+            lookups = record["cache_hits"] + record["cache_misses"]
+            if lookups:
+                hit_rate = "%7.1f%%" % (100.0 * record["cache_hits"] / lookups)
+            else:
+                hit_rate = "-"
+            if "peak_memory" in record:
+                peak = "%10.2f" % (record["peak_memory"] / 2**20)
+            else:
+                peak = "-"
+            lines.append(
+                "%-22s %10.4f %8s %9d %8s %10s"
+                % (
+                    record["stage"],
+                    record["seconds"],
+                    record.get("rows", ""),
+                    record["triples"],
+                    hit_rate,
+                    peak,
+                )
+            )
+        return "\n".join(lines)
@@ -0,0 +1,99 @@
+from hashlib import sha256
+from uuid import uuid4
+from .diag2RDFSConverter import Diag2RDFSConverter
+from .tripleSink import ntTriple
+from RDFUtils import plain_terms
+
+csv_extension = ".csv"
+
+
+def isCSV(source):
+    """Return True if a source names a diagram csv export rather than a schema file."""
+    return source == "-" or source.lower().endswith(csv_extension)
+
+
+def canonicalLines(source, columns=None):
+    """Generate the triples of a diagram csv export or of a schema file as N-Triples lines.
+
+    A csv export is converted without building a graph; a schema file is parsed with rdflib,
+    in the format its extension suggests."""
+    if isCSV(source):
+        c = Diag2RDFSConverter(columns, terms=plain_terms)
+        c.loadDiagData(source)
+        c.convertMetadata()
+        c.convertNamespaces()
+        for triple in c.iterTriples():
+            yield ntTriple(triple)
+        return
+    from rdflib import BNode, Graph
+    from rdflib.util import guess_format
+
+    schema = Graph()
+    schema.parse(source, format=guess_format(source) or "turtle")
+    for triple in schema:
+        if any(type(term) is BNode for term in triple):
+            msg = "Cannot compare schemas with blank nodes: " + source
+            print(triple)
+            raise ValueError(msg)
+        yield ntTriple(triple)
+
+
+def schemaHash(lines):
+    """Return a hash of a whole schema from its distinct N-Triples lines, whatever order they came in."""
+    return sha256("".join(sorted(lines)).encode("utf-8")).hexdigest()
+
+
+def diffSchemas(old, new, columns=None):
+    """Return the triples added and removed going from the old source to the new one.
+
+    Each source is a diagram csv export or a schema file. The result is a dict of sorted
+    lists of the added and removed N-Triples lines, and hashes of the old and new
+    schemas."""
+    old_lines = set(canonicalLines(old, columns))
+    new_lines = set(canonicalLines(new, columns))
+    return {
+        "added": sorted(new_lines - old_lines),
+        "removed": sorted(old_lines - new_lines),
+        "old_hash": schemaHash(old_lines),
+        "new_hash": schemaHash(new_lines),
+    }
+
+
+def sparqlUpdate(diff):
+    """Return a diff as a SPARQL Update request deleting the removed triples and inserting the added ones."""
+    text = "# Changes from schema %s\n# to schema %s\n" % (
+        diff["old_hash"],
+        diff["new_hash"],
+    )
+    operations = list()
+    if diff["removed"]:
+        operations.append("DELETE DATA {\n" + indented(diff["removed"]) + "}")
+    if diff["added"]:
+        operations.append("INSERT DATA {\n" + indented(diff["added"]) + "}")
+    if operations:
+        text += " ;\n".join(operations) + "\n"
+    return text
+
+
+def indented(lines):
+    return "".join("  " + line for line in lines)
+
+
+def rdfPatch(diff):
+    """Return a diff as an RDF Patch: one transaction of deletions then additions.
+
+    The patch gets a fresh id; the hashes of the old and new schemas are given in
+    comments, as they name schemas rather than earlier patches."""
+    text = "# Changes from schema %s\n# to schema %s\n" % (
+        diff["old_hash"],
+        diff["new_hash"],
+    )
+    text += "H id <urn:uuid:%s> .\n" % uuid4()
+    text += "TX .\n"
+    text += "".join("D " + line for line in diff["removed"])
+    text += "".join("A " + line for line in diff["added"])
+    text += "TC .\n"
+    return text
+
+
+patch_formats = {"sparql": sparqlUpdate, "rdfpatch": rdfPatch}
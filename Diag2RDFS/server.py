@@ -0,0 +1,229 @@
+import asyncio
+import json
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from time import perf_counter
+from urllib.parse import urlsplit, parse_qs
+from .diag2RDFSConverter import Diag2RDFSConverter
+from .tripleSink import sinks
+
+default_host = "127.0.0.1"
+default_port = 8642
+default_max_body = 64 * 2**20
+# output formats and the rdflib serializer used for those that are not streamed
+formats = {
+    "ttl": "turtle",
+    "nt": "nt",
+    "turtle": "turtle",
+    "xml": "xml",
+    "json-ld": "json-ld",
+}
+content_types = {
+    "turtle": "text/turtle",
+    "nt": "application/n-triples",
+    "xml": "application/rdf+xml",
+    "json-ld": "application/ld+json",
+}
+reasons = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Content Too Large",
+}
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """Return a dict of the given percentiles of a list of numbers, plus the count and maximum."""
+    ordered = sorted(values)
+    result = {"count": len(ordered)}
+    for point in points:
+        if ordered:
+            rank = min(len(ordered) - 1, int(round(point / 100 * (len(ordered) - 1))))
+            result["p%d" % point] = ordered[rank]
+        else:
+            result["p%d" % point] = None
+    result["max"] = ordered[-1] if ordered else None
+    return result
+
+
+def convertText(csv_text, output_format="ttl"):
+    """Convert the text of a diagram csv export to a schema serialized in the given format."""
+    if output_format not in formats:
+        msg = "Unknown output format: " + output_format
+        raise ValueError(msg)
+    c = Diag2RDFSConverter()
+    if output_format in sinks:
+        out = StringIO()
+        c.streamDiag2RDFS(StringIO(csv_text), sinks[output_format](out))
+        return out.getvalue()
+    c.convertDiag2RDFS(StringIO(csv_text))
+    if formats[output_format] == "turtle":
+        return c.serializeSchema()
+    return c.schema.serialize(format=formats[output_format])
+
+
+class ConversionServer:
+    """A long-running local HTTP server that converts diagram csv posted to it, keeping rdflib loaded.
+
+    POST /convert?format=ttl with the csv as the request body returns the schema; the formats
+    are ttl and nt, which are streamed, and turtle, xml and json-ld, which use rdflib's
+    serializers. GET /stats returns the number of conversions and percentiles of their
+    latency in seconds. Conversions run concurrently in a thread pool. A request body larger
+    than max_body bytes is refused with 413 without being read, a body sent without a
+    Content-Length with 411, and a request that cannot be read with 400."""
+
+    def __init__(
+        self, host=default_host, port=default_port, workers=4, max_body=default_max_body
+    ):
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.latencies = deque(maxlen=10000)
+        self.errors = 0
+        self.server = None
+
+    async def start(self):
+        """Start listening; returns once the server is accepting connections.
+
+        rdflib is imported first, so the first conversion does not wait for it."""
+        from rdflib import Graph
+
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serveForever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    def stats(self):
+        """Return a dict of the number of conversions, errors and latency percentiles."""
+        stats = percentiles(list(self.latencies))
+        stats["errors"] = self.errors
+        return stats
+
+    async def readHead(self, reader):
+        """Read the request line and headers of a request, returning the method, target, headers and body length, or None if the client has closed the connection.
+
+        Raises a ValueError if the request line, a header or the Content-Length cannot be
+        read."""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ValueError("Malformed request line.")
+        method, target, version = parts
+        headers = dict()
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if b":" not in line:
+                raise ValueError("Malformed header.")
+            name, value = line.decode("latin-1").split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ValueError("Malformed Content-Length.")
+        if length < 0:
+            raise ValueError("Negative Content-Length.")
+        return method, target, headers, length
+
+    async def handle(self, reader, writer):
+        """Answer the HTTP/1.1 requests on one connection until the client closes it.
+
+        A request that cannot be read is answered with 400, and one with a
+        Transfer-Encoding with 411, before the connection is closed."""
+        try:
+            while True:
+                try:
+                    head = await self.readHead(reader)
+                except ValueError as e:
+                    self.writeResponse(writer, 400, "text/plain", str(e))
+                    await writer.drain()
+                    break
+                if head is None:
+                    break
+                method, target, headers, length = head
+                if "transfer-encoding" in headers:
+                    message = "A Content-Length is needed; chunked bodies are not read."
+                    self.writeResponse(writer, 411, "text/plain", message)
+                    await writer.drain()
+                    break
+                if length > self.max_body:
+                    message = "Body larger than %d bytes." % self.max_body
+                    self.writeResponse(writer, 413, "text/plain", message)
+                    await writer.drain()
+                    break  # the body was not read, so the connection cannot be used again
+                body = await reader.readexactly(length) if length else b""
+                status, content_type, content = await self.respond(method, target, body)
+                self.writeResponse(writer, status, content_type, content)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, target, body):
+        """Return the status, content type and content answering a request."""
+        url = urlsplit(target)
+        if url.path == "/stats" and method == "GET":
+            return 200, "application/json", json.dumps(self.stats())
+        if url.path != "/convert":
+            return 404, "text/plain", "Not found: " + url.path
+        if method != "POST":
+            return 405, "text/plain", "Use POST to convert."
+        output_format = parse_qs(url.query).get("format", ["ttl"])[0]
+        start = perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            csv_text = body.decode("utf-8")
+            text = await loop.run_in_executor(
+                self.executor, convertText, csv_text, output_format
+            )
+        except Exception as e:
+            self.errors += 1
+            return 400, "text/plain", type(e).__name__ + ": " + str(e)
+        self.latencies.append(perf_counter() - start)
+        return 200, content_types[formats[output_format]], text
+
+    def writeResponse(self, writer, status, content_type, content):
+        data = content.encode("utf-8")
+        head = "HTTP/1.1 %d %s\r\n" % (status, reasons[status])
+        head += "Content-Type: %s; charset=utf-8\r\n" % content_type
+        head += "Content-Length: %d\r\n\r\n" % len(data)
+        writer.write(head.encode("latin-1") + data)
+
+
+def serve(host=default_host, port=default_port, workers=4, max_body=default_max_body):
+    """Run a ConversionServer until interrupted."""
+    server = ConversionServer(host, port, workers, max_body)
+
+    async def run():
+        await server.start()
+        print(
+            "Converting diagrams at http://%s:%d/convert" % (server.host, server.port),
+            file=sys.stderr,
+        )
+        await server.serveForever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print(json.dumps(server.stats()), file=sys.stderr)
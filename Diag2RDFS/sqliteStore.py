@@ -0,0 +1,358 @@
+import sqlite3
+from os import path
+from rdflib import plugin, BNode, Literal, URIRef
+from rdflib.store import Store, VALID_STORE, NO_STORE
+
+default_batch_size = 10000
+default_cache_size = 2**16
+
+schema_sql = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT,
+    language TEXT
+);
+CREATE TABLE IF NOT EXISTS triples (
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS triples_pos ON triples (p, o, s);
+CREATE INDEX IF NOT EXISTS triples_osp ON triples (o, s, p);
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    uri TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);"""
+
+select_triples = """
+SELECT s.kind, s.value, s.datatype, s.language,
+    p.kind, p.value, p.datatype, p.language,
+    o.kind, o.value, o.datatype, o.language
+FROM triples
+JOIN terms AS s ON s.id = triples.s
+JOIN terms AS p ON p.id = triples.p
+JOIN terms AS o ON o.id = triples.o"""
+
+
+def termRow(term):
+    """Return the key, kind, value, datatype and language stored for an rdflib term."""
+    if type(term) is URIRef:
+        return (term.n3(), "U", str(term), None, None)
+    if type(term) is Literal:
+        datatype = None if term.datatype is None else str(term.datatype)
+        return (term.n3(), "L", str(term), datatype, term.language)
+    if type(term) is BNode:
+        return (term.n3(), "B", str(term), None, None)
+    print(term)
+    msg = "SQLiteStore can only hold URIRefs, Literals and BNodes."
+    raise TypeError(msg)
+
+
+def rowTerm(kind, value, datatype, language):
+    """Return the rdflib term for a row of the terms table."""
+    if kind == "U":
+        return URIRef(value)
+    if kind == "L":
+        return Literal(value, lang=language, datatype=datatype)
+    return BNode(value)
+
+
+class SQLiteStore(Store):
+    """An rdflib store keeping the triples in a SQLite database file, so a schema can be larger than memory and used again without its csv.
+
+    Each term is stored once in a terms table and each triple as three term ids, with indexes
+    for the subject, predicate and object, the predicate, object and subject, and the object,
+    subject and predicate orders. Triples added with addN are written in transactions of
+    batch_size triples; those added one at a time, and namespace bindings, are committed every
+    batch_size triples or by commit(). The diagram metadata can be stored with the schema.
+    The store is not context or formula aware.
+
+    SQLiteStore(fname) opens the database, creating it if needed; pass it as the store of a
+    Graph or of a Diag2RDFSConverter. A read_only store opens an existing database without
+    writing to it, and keeps the namespaces bound to it in memory."""
+
+    def __init__(
+        self,
+        configuration=None,
+        identifier=None,
+        batch_size=default_batch_size,
+        cache_size=default_cache_size,
+        read_only=False,
+    ):
+        super().__init__()
+        self.identifier = identifier
+        self.batchSize = batch_size
+        self.cacheSize = cache_size
+        self.readOnly = read_only
+        self.connection = None
+        self.termIDs = dict()
+        self.pending = 0
+        self.bindings = None  # the namespaces of a read-only store, by prefix
+        if configuration:
+            self.open(configuration, create=not read_only)
+
+    def open(self, configuration, create=False):
+        """Open the database file named by configuration; returns NO_STORE if it does not exist and create is False."""
+        if type(configuration) is not str:
+            print(configuration)
+            msg = "SQLiteStore configuration must be a file name."
+            raise TypeError(msg)
+        if not create and not path.exists(configuration):
+            return NO_STORE
+        if self.readOnly:
+            uri = "file:" + path.abspath(configuration) + "?mode=ro"
+            self.connection = sqlite3.connect(uri, uri=True)
+            rows = self.connection.execute("SELECT prefix, uri FROM namespaces")
+            self.bindings = dict(rows)
+        else:
+            self.connection = sqlite3.connect(configuration)
+            self.connection.executescript(schema_sql)
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction=True):
+        if self.connection is None:
+            return
+        if commit_pending_transaction:
+            self.connection.commit()
+        self.connection.close()
+        self.connection = None
+
+    def commit(self):
+        self.connection.commit()
+        self.pending = 0
+
+    def rollback(self):
+        self.connection.rollback()
+        self.termIDs.clear()  # ids of terms added since the last commit are gone
+        self.pending = 0
+
+    def lookupID(self, term):
+        """Return the id of a stored term, or None if it is not in the store."""
+        term_id = self.termIDs.get(term)
+        if term_id is None:
+            row = self.connection.execute(
+                "SELECT id FROM terms WHERE key = ?", (termRow(term)[0],)
+            ).fetchone()
+            if row is None:
+                return None
+            term_id = self.cacheID(term, row[0])
+        return term_id
+
+    def cacheID(self, term, term_id):
+        if len(self.termIDs) >= self.cacheSize:
+            self.termIDs.clear()
+        self.termIDs[term] = term_id
+        return term_id
+
+    def addTerms(self, terms):
+        """Store any of the terms that are new, and return a dict of the terms and their ids."""
+        ids = dict()
+        new = list()
+        for term in terms:
+            if term in ids:
+                continue
+            term_id = self.lookupID(term)
+            if term_id is None:
+                new.append(term)
+            ids[term] = term_id
+        if new:
+            rows = [termRow(term) for term in new]
+            self.connection.executemany(
+                "INSERT INTO terms (key, kind, value, datatype, language) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            for term in new:
+                ids[term] = self.lookupID(term)
+        return ids
+
+    def add(self, triple, context, quoted=False):
+        ids = self.addTerms(triple)
+        self.connection.execute(
+            "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)",
+            tuple(ids[term] for term in triple),
+        )
+        self.pending += 1
+        if self.pending >= self.batchSize:
+            self.commit()
+
+    def addN(self, quads):
+        batch = list()
+        for s, p, o, context in quads:
+            batch.append((s, p, o))
+            if len(batch) >= self.batchSize:
+                self.addBatch(batch)
+                batch = list()
+        if batch:
+            self.addBatch(batch)
+
+    def addBatch(self, triples):
+        """Add a list of triples in one transaction."""
+        ids = self.addTerms(term for triple in triples for term in triple)
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)",
+            ((ids[s], ids[p], ids[o]) for s, p, o in triples),
+        )
+        self.commit()
+
+    def patternWhere(self, triple_pattern):
+        """Return the WHERE clause and parameters selecting the triples that match a pattern, or None if no stored triple can match."""
+        conditions = list()
+        params = list()
+        for column, term in zip(["s", "p", "o"], triple_pattern):
+            if term is None:
+                continue
+            term_id = self.lookupID(term)
+            if term_id is None:
+                return None
+            conditions.append("triples." + column + " = ?")
+            params.append(term_id)
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
+
+    def triples(self, triple_pattern, context=None):
+        where = self.patternWhere(triple_pattern)
+        if where is None:
+            return
+        sql, params = where
+        for row in self.connection.execute(select_triples + sql, params):
+            triple = (rowTerm(*row[0:4]), rowTerm(*row[4:8]), rowTerm(*row[8:12]))
+            yield triple, iter(())
+
+    def remove(self, triple_pattern, context=None):
+        if tuple(triple_pattern) == (None, None, None):
+            self.connection.execute("DELETE FROM triples")
+            self.connection.execute("DELETE FROM terms")
+            self.termIDs.clear()
+            return
+        where = self.patternWhere(triple_pattern)
+        if where is not None:
+            sql, params = where
+            self.connection.execute("DELETE FROM triples" + sql, params)
+
+    def __len__(self, context=None):
+        return self.connection.execute("SELECT COUNT(*) FROM triples").fetchone()[0]
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def clear(self):
+        """Remove every triple, namespace binding and metadata entry, to store a new schema."""
+        self.remove((None, None, None))
+        self.connection.execute("DELETE FROM namespaces")
+        self.connection.execute("DELETE FROM metadata")
+        self.commit()
+
+    def bind(self, prefix, namespace, override=True):
+        namespace = str(namespace)
+        if self.bindings is not None:
+            self.bindMemory(prefix, namespace, override)
+            return
+        if override:
+            self.connection.execute(
+                "DELETE FROM namespaces WHERE prefix = ? OR uri = ?",
+                (prefix, namespace),
+            )
+        elif self.namespace(prefix) is not None or self.prefix(namespace) is not None:
+            return
+        self.connection.execute(
+            "INSERT INTO namespaces (prefix, uri) VALUES (?, ?)", (prefix, namespace)
+        )
+
+    def bindMemory(self, prefix, namespace, override):
+        """Bind a prefix in the namespaces kept in memory by a read-only store."""
+        bound = self.prefix(namespace)
+        if not override and (prefix in self.bindings or bound is not None):
+            return
+        if bound is not None:
+            del self.bindings[bound]
+        self.bindings[prefix] = namespace
+
+    def namespace(self, prefix):
+        if self.bindings is not None:
+            uri = self.bindings.get(prefix)
+            return None if uri is None else URIRef(uri)
+        row = self.connection.execute(
+            "SELECT uri FROM namespaces WHERE prefix = ?", (prefix,)
+        ).fetchone()
+        return None if row is None else URIRef(row[0])
+
+    def prefix(self, namespace):
+        if self.bindings is not None:
+            for prefix, uri in self.bindings.items():
+                if uri == str(namespace):
+                    return prefix
+            return None
+        row = self.connection.execute(
+            "SELECT prefix FROM namespaces WHERE uri = ?", (str(namespace),)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def namespaces(self):
+        if self.bindings is not None:
+            rows = list(self.bindings.items())
+        else:
+            rows = self.connection.execute(
+                "SELECT prefix, uri FROM namespaces"
+            ).fetchall()
+        for prefix, uri in rows:
+            yield prefix, URIRef(uri)
+
+    def setMetadata(self, metadata):
+        """Store a dict of diagram metadata, such as the title and date, replacing what was stored."""
+        self.connection.execute("DELETE FROM metadata")
+        self.connection.executemany(
+            "INSERT INTO metadata (name, value) VALUES (?, ?)", metadata.items()
+        )
+        self.commit()
+
+    def getMetadata(self):
+        """Return the stored diagram metadata as a dict."""
+        return dict(self.connection.execute("SELECT name, value FROM metadata"))
+
+
+def storeDiagram(fname, store_fname, columns=None, load_jobs=1):
+    """Convert a diagram file into a SQLite database, replacing any schema stored there before, and return the converter."""
+    from .diag2RDFSConverter import Diag2RDFSConverter
+
+    store = SQLiteStore(store_fname)
+    store.clear()
+    c = Diag2RDFSConverter(columns, store=store, load_jobs=load_jobs)
+    c.convertDiag2RDFS(fname)
+    store.setMetadata(c.metadata)
+    return c
+
+
+def openSchema(store_fname):
+    """Return a converter holding the schema and metadata stored in a SQLite database, ready to query or serialize.
+
+    The database is opened read-only, so the namespaces rdflib binds to a new graph are not
+    written to it."""
+    from .diag2RDFSConverter import Diag2RDFSConverter
+
+    store = SQLiteStore(read_only=True)
+    if store.open(store_fname) != VALID_STORE:
+        print(store_fname)
+        msg = "No stored schema: " + store_fname
+        raise FileNotFoundError(msg)
+    bindings = list(store.namespaces())
+    c = Diag2RDFSConverter(store=store)
+    c.metadata.update(store.getMetadata())
+    # bind the stored prefixes again over the defaults rdflib binds to a new graph
+    for prefix, ns in bindings:
+        c.schema.bind(prefix, ns)
+    return c
+
+
+plugin.register("SQLite", Store, "Diag2RDFS.sqliteStore", "SQLiteStore")
@@ -0,0 +1,120 @@
+import re
+from RDFUtils.terms import isLiteral, rdf_ns, rdfs_ns, rdf_type, sdo_ns
+
+# characters that must be escaped in N-Triples and Turtle strings
+escapes = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+escape_pattern = re.compile(r'[\\"\n\r\t]')
+# local names that can safely be written after a prefix in Turtle
+local_name = re.compile(r"^[A-Za-z_][A-Za-z0-9_\-]*$")
+# namespaces always available to Turtle output, in addition to those in the diagram
+default_prefixes = {
+    "rdf": rdf_ns,
+    "rdfs": rdfs_ns,
+    "sdo": sdo_ns,
+}
+
+
+def ntTerm(term):
+    """Return a URIRef or Literal, from rdflib or RDFUtils.terms, written as an N-Triples term."""
+    if isLiteral(term):
+        value = escape_pattern.sub(lambda m: escapes[m.group()], str(term))
+        if term.language is not None:
+            return '"' + value + '"@' + term.language
+        if term.datatype is not None:
+            return '"' + value + '"^^<' + str(term.datatype) + ">"
+        return '"' + value + '"'
+    # str() first, as adding to a URIRef makes another URIRef
+    return "<" + str(term) + ">"
+
+
+def ntTriple(triple):
+    """Return a triple written as a line of N-Triples."""
+    s, p, o = triple
+    return ntTerm(s) + " " + ntTerm(p) + " " + ntTerm(o) + " .\n"
+
+
+class NTriplesSink:
+    """Write triples to an open text file as N-Triples as soon as they are added, skipping duplicates."""
+
+    def __init__(self, out):
+        self.out = out
+        self.seen = set()
+        self.count = 0
+
+    def start(self, metadata, namespaces):
+        """Write a header giving the diagram title and date."""
+        self.out.write("# Title:  " + metadata["title"] + "\n")
+        self.out.write("# Date:  " + metadata["date"] + "\n")
+
+    def add(self, triple):
+        """Write a triple unless it has already been written; return True if it was written."""
+        if triple in self.seen:
+            return False
+        self.seen.add(triple)
+        self.count += 1
+        self.write(triple)
+        return True
+
+    def write(self, triple):
+        self.out.write(ntTriple(triple))
+
+    def close(self):
+        self.out.flush()
+
+
+class TurtleSink(NTriplesSink):
+    """Write triples to an open text file as Turtle as soon as they are added, skipping duplicates.
+
+    URIs are abbreviated with the diagram's prefixes, and consecutive triples about the same
+    subject are grouped into one statement."""
+
+    def __init__(self, out):
+        super().__init__(out)
+        self.prefixes = dict()
+        self.namespaces = list()
+        self.subject = None
+
+    def start(self, metadata, namespaces):
+        """Write the header and a prefix declaration for each namespace."""
+        super().start(metadata, namespaces)
+        self.prefixes = dict(default_prefixes)
+        for prefix, ns in namespaces.items():
+            self.prefixes[prefix] = str(ns)
+        # try the longest namespace first so nested namespaces abbreviate correctly
+        self.namespaces = sorted(
+            self.prefixes.items(), key=lambda item: len(item[1]), reverse=True
+        )
+        for prefix, ns in self.prefixes.items():
+            self.out.write("@prefix " + prefix + ": <" + ns + "> .\n")
+        self.out.write("\n")
+
+    def term(self, term):
+        """Return a term written in Turtle, as a prefixed name where possible."""
+        if not isLiteral(term):
+            uri = str(term)
+            for prefix, ns in self.namespaces:
+                if uri.startswith(ns) and local_name.match(uri[len(ns) :]):
+                    return prefix + ":" + uri[len(ns) :]
+        return ntTerm(term)
+
+    def write(self, triple):
+        s, p, o = triple
+        if str(p) == rdf_type:
+            predicate = "a"
+        else:
+            predicate = self.term(p)
+        if s == self.subject:
+            self.out.write(" ;\n    " + predicate + " " + self.term(o))
+        else:
+            if self.subject is not None:
+                self.out.write(" .\n\n")
+            self.subject = s
+            self.out.write(self.term(s) + " " + predicate + " " + self.term(o))
+
+    def close(self):
+        if self.subject is not None:
+            self.out.write(" .\n")
+        super().close()
+
+
+sinks = {"nt": NTriplesSink, "ttl": TurtleSink}
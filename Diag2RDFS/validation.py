@@ -0,0 +1,158 @@
+from RDFUtils import curieProblem, prefixDefinitionProblem
+from .diag2RDFSConverter import propertySpecs, datatype_namespaces
+
+arrows = ["None", "Arrow"]
+
+
+def problem(c, row, field, message, warning=False):
+    """Return a dict describing a problem with one field of a row, giving the csv column heading.
+
+    A warning is a problem that does not stop the conversion."""
+    return {
+        "row": row.rowNumber,
+        "id": row["id"],
+        "column": c.columns.columns[field],
+        "message": message,
+        "warning": warning,
+    }
+
+
+def validPrefixes(c, problems):
+    """Return the set of prefixes defined on Page rows that can be used, adding a problem for each definition that cannot."""
+    prefixes = set()
+    for row in c.diagMetaData:
+        if row["name"] != "Page":
+            continue
+        for ns_def in row["prefixes"].split("\n"):
+            message = prefixDefinitionProblem(ns_def)
+            if message is None:
+                prefixes.add(ns_def.split(": ")[0])
+            else:
+                message = message + " " + ns_def
+                problems.append(problem(c, row, "prefixes", message))
+    return prefixes
+
+
+def classProblems(c, row, prefixes):
+    """Return a list of the problems with the class CURIEs and property definitions of a class row."""
+    problems = list()
+    for curie in row["text_1"].split("\n"):
+        message = curieProblem(curie, prefixes)
+        if message is not None:
+            problems.append(problem(c, row, "text_1", message + " " + curie))
+    if row["text_2"] != "":
+        specs, unread = propertySpecs(row["text_2"])
+        for prop_def in unread:
+            message = "Could not read property definition: " + repr(prop_def)
+            problems.append(problem(c, row, "text_2", message))
+        for p_curie, datatype in specs:
+            message = curieProblem(p_curie, prefixes)
+            if message is not None:
+                problems.append(problem(c, row, "text_2", message + " " + p_curie))
+            if datatype == "" or datatype.startswith("http"):
+                continue
+            message = curieProblem(datatype, prefixes | datatype_namespaces.keys())
+            if message is not None:
+                message += " " + datatype + " (rdfs:Literal is used)"
+                problems.append(problem(c, row, "text_2", message, warning=True))
+    return problems
+
+
+def linkProblems(c, row, prefixes, bad_classes):
+    """Return a list of the problems with the property CURIEs, arrows and ends of a link row."""
+    problems = list()
+    for curie in row["text_1"].split():
+        message = curieProblem(curie, prefixes)
+        if message is not None:
+            problems.append(problem(c, row, "text_1", message + " " + curie))
+    for field in ["source_arrow", "destination_arrow"]:
+        if row[field] not in arrows:
+            message = "Unknown value for " + field + ": " + row[field]
+            problems.append(problem(c, row, field, message))
+    for field in ["line_source", "line_destination"]:
+        class_id = row[field]
+        if class_id not in c.classIndex:
+            message = "Could not find class with id " + class_id + "."
+            problems.append(problem(c, row, field, message))
+        elif class_id in bad_classes:
+            message = "Class with id %s, in row %d, has problems." % (
+                class_id,
+                c.classIndex[class_id].rowNumber,
+            )
+            problems.append(problem(c, row, field, message))
+        elif "\n" in c.classIndex[class_id]["text_1"]:
+            message = "Class with id " + class_id + " has more than one CURIE."
+            problems.append(problem(c, row, field, message))
+    return problems
+
+
+def checkDiagram(c):
+    """Check the loaded rows of a converter in one pass, returning the list of problems and the list of class and link rows that cannot be converted.
+
+    The prefixes and class ids are collected first, so each row is checked once."""
+    problems = list()
+    bad_rows = list()
+    prefixes = validPrefixes(c, problems)
+    bad_classes = set()
+    for row in c.diagClassData:
+        row_problems = classProblems(c, row, prefixes)
+        if any(not p["warning"] for p in row_problems):
+            bad_classes.add(row["id"])
+            bad_rows.append(row)
+        problems.extend(row_problems)
+    for row in c.diagLinkData:
+        row_problems = linkProblems(c, row, prefixes, bad_classes)
+        if row_problems:
+            bad_rows.append(row)
+        problems.extend(row_problems)
+    problems.sort(key=lambda p: p["row"] or 0)
+    return problems, bad_rows
+
+
+def validateDiagram(c):
+    """Check the loaded rows of a converter in one pass, returning a list of every problem that would stop the conversion.
+
+    Each problem is a dict of the csv row number, the row's id, the column heading, a
+    message and whether it is only a warning, such as for a datatype that will be written as
+    rdfs:Literal."""
+    return checkDiagram(c)[0]
+
+
+def dropInvalidRows(c, bad_rows):
+    """Remove the given class and link rows from a converter's row lists.
+
+    Rows are matched by identity, as rows made without a row number all have None, and ids
+    may be missing or repeated."""
+    bad = {id(row) for row in bad_rows}
+    c.diagClassData = [row for row in c.diagClassData if id(row) not in bad]
+    c.diagLinkData = [row for row in c.diagLinkData if id(row) not in bad]
+    c.classIndex = {row["id"]: row for row in c.diagClassData}
+    c.classURIIndex.clear()
+
+
+def convertValidRows(c, fname):
+    """Load and convert a diagram, leaving out the rows with problems, and return the list of problems."""
+    c.loadDiagData(fname)
+    problems, bad_rows = checkDiagram(c)
+    dropInvalidRows(c, bad_rows)
+    c.convertMetadata()
+    c.convertNamespaces(skip_invalid=True)
+    c.convertClasses()
+    c.convertLinkProperties()
+    return problems
+
+
+def formatProblems(fname, problems):
+    """Return problems as lines of text, one per problem, headed by the file name and row number."""
+    return "\n".join(
+        "%s:%s: %s (id %s): %s%s"
+        % (
+            fname,
+            p["row"],
+            p["column"],
+            p["id"],
+            "warning: " if p["warning"] else "",
+            p["message"],
+        )
+        for p in problems
+    )
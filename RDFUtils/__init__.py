@@ -1,2 +1,5 @@
 from .namespaceUtils import NamespaceDict, uri2Namespace
-from .curieUtils import str2uriref, curie2uriref, splitCurie
+from .namespaceUtils import namespaceProblem, prefixDefinitionProblem
+from .curieUtils import str2uriref, curie2uriref, splitCurie, CurieResolver
+from .curieUtils import curieProblem
+from .terms import IRI, PlainLiteral, PlainNamespace, TermSet, plain_terms, rdflibTerms
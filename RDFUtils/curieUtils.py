@@ -1,27 +1,29 @@
 from .namespaceUtils import NamespaceDict, uri2Namespace
-from rdflib import URIRef
+from functools import lru_cache
 
 
-def str2uriref(uri_str, namespaces=None):
-    """Convert a string URI or cURI to an rdflib URIRef"""
+def str2uriref(uri_str, namespaces=None, uriref=None):
+    """Convert a string URI or cURI to an rdflib URIRef, or to the given URI class, e.g. IRI"""
     if type(uri_str) is not str:
         msg = "URI must be a string."
         raise TypeError(msg)
     if uri_str[:4] == "http":
         if uri_str.split(":")[1][:2] == "//":
-            return URIRef(uri_str)
+            if uriref is None:
+                from rdflib import URIRef as uriref
+            return uriref(uri_str)
         else:
             print(uri_str)
             msg = "URI string looks like invalid http URI."
             raise ValueError(msg)
     elif namespaces != None:
-        return curie2uriref(uri_str, namespaces)
+        return curie2uriref(uri_str, namespaces, uriref)
     else:
         msg = "String must be either CURIE or http[s] URI."
         raise ValueError(msg)
 
 
-def curie2uriref(curie_str, namespaces):
+def curie2uriref(curie_str, namespaces, uriref=None):
     """Turn a compact URI into a rdflib URIRef"""
     if type(curie_str) is not str:
         print(curie_str)
@@ -34,17 +36,17 @@ def curie2uriref(curie_str, namespaces):
     if ":" in curie_str:  # To do : check for >1 :
         [pre, name] = curie_str.split(":")
         uri_str = namespaces[pre] + name
-        return str2uriref(uri_str)
+        return str2uriref(uri_str, uriref=uriref)
     elif "base" in namespaces.keys():
         uri_str = namespaces[base] + curie_str
-        return str2uriref(uri_str)
+        return str2uriref(uri_str, uriref=uriref)
     else:
         msg = "Need to provide prefixed curie or base namespace."
         raise ValueError(msg)
     pass
 
 
-def splitCurie(curie, namespaces):
+def splitCurie(curie, namespaces, uriref=None):
     """Split a compact URI into URIRef of CURIe, id and URIRef of namespace"""
     if type(curie) is not str:
         print(curie)
@@ -61,15 +63,29 @@ def splitCurie(curie, namespaces):
         msg = "CURIe should have one colon ':' in it."
         raise ValueError(msg)
     if ns_id in namespaces.keys():
-        uriref = str2uriref(curie, namespaces)
-        ns_uri = URIRef(namespaces[ns_id])
-        return uriref, ns_id, ns_uri
+        if uriref is None:
+            from rdflib import URIRef as uriref
+        curie_uriref = str2uriref(curie, namespaces, uriref)
+        ns_uri = uriref(namespaces[ns_id])
+        return curie_uriref, ns_id, ns_uri
     else:
         print(curie)
         msg = "No namespace for CURIe prefix."
         raise TypeError(msg)
 
 
+def curieProblem(curie, prefixes):
+    """Return the reason splitCurie would reject a CURIe given a collection of known prefixes, or None if it would accept it."""
+    if type(curie) is not str:
+        return "CURIe should be a string."
+    parts = curie.split(":")
+    if len(parts) != 2:
+        return "CURIe should have one colon ':' in it."
+    if parts[0] not in prefixes:
+        return "No namespace for CURIe prefix."
+    return None
+
+
 def splitCuri(curi):
     """Split a compact uri into prefix and name."""
     parts = curi.split(":")
@@ -90,6 +106,8 @@ def expandCuri(curi, namespaces):
 
 
 def curi2URIRef(curi, namespaces):
+    from rdflib import URIRef
+
     uri = expandCuri(curi, namespaces)
     return URIRef(uri)
 
@@ -98,3 +116,71 @@ def unpackProperties(self, string):
     """Turn a string with properties separted by linebreaks into a list of properties."""
     plist = string.split("\n")
     return plist
+
+
+class CurieResolver:
+    """Resolve CURIEs and URI strings against a NamespaceDict, caching the results.
+
+    The same URIRef object is returned every time a string is resolved, while it is held. The
+    caches are emptied whenever a prefix in the NamespaceDict is added or changed. Each cache
+    holds up to maxsize results, and the interned URIRefs are forgotten when there are twice
+    that many. uriref is the class of the URIs made, rdflib's URIRef by default."""
+
+    def __init__(self, namespaces, maxsize=4096, uriref=None):
+        if type(namespaces) is not NamespaceDict:
+            print(namespaces)
+            msg = "Namespaces must be a RDFUtils NamespaceDict."
+            raise TypeError(msg)
+        self.namespaces = namespaces
+        self.maxsize = maxsize
+        self.makeURIRef = uriref
+        self._interned = dict()
+        self._generation = namespaces.generation
+        self._splitCurie = lru_cache(maxsize)(self._resolveCurie)
+        self._uriref = lru_cache(maxsize)(self._resolveUri)
+
+    def _resolveCurie(self, curie):
+        uriref, ns_id, ns_uri = splitCurie(curie, self.namespaces, self.makeURIRef)
+        return self.intern(uriref), ns_id, self.intern(ns_uri)
+
+    def _resolveUri(self, uri_str):
+        return self.intern(str2uriref(uri_str, self.namespaces, self.makeURIRef))
+
+    def _checkGeneration(self):
+        if self._generation != self.namespaces.generation:
+            self.clear()
+
+    def intern(self, uriref):
+        """Return the one URIRef object held for this URI."""
+        interned = self._interned
+        if self.maxsize is not None and len(interned) >= 2 * self.maxsize:
+            if uriref not in interned:
+                interned.clear()
+        return interned.setdefault(uriref, uriref)
+
+    def clear(self):
+        """Empty the caches, e.g. after the namespaces have changed."""
+        self._splitCurie.cache_clear()
+        self._uriref.cache_clear()
+        self._interned.clear()
+        self._generation = self.namespaces.generation
+
+    def splitCurie(self, curie):
+        """Return the URIRef of a CURIe, its prefix and the URIRef of its namespace, as splitCurie does."""
+        self._checkGeneration()
+        return self._splitCurie(curie)
+
+    def uriref(self, uri_str):
+        """Return the URIRef of a CURIe or http[s] URI, as str2uriref does."""
+        self._checkGeneration()
+        return self._uriref(uri_str)
+
+    def cacheInfo(self):
+        """Return a dict of the numbers of cache hits and misses since the caches were last emptied."""
+        curies = self._splitCurie.cache_info()
+        uris = self._uriref.cache_info()
+        return {
+            "hits": curies.hits + uris.hits,
+            "misses": curies.misses + uris.misses,
+            "size": curies.currsize + uris.currsize,
+        }
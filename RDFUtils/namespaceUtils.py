@@ -1,9 +1,8 @@
-from rdflib import URIRef
-from rdflib.namespace import Namespace
+from .terms import isNamespace
 
 
-def uri2Namespace(uri):
-    """Turn a string into a rdflib Namespace."""
+def uri2Namespace(uri, namespace=None):
+    """Turn a string into a rdflib Namespace, or into the given namespace class, e.g. PlainNamespace."""
     if type(uri) is not str:
         msg = "Namespace uri must be a string."
         print(uri)
@@ -16,25 +15,86 @@ def uri2Namespace(uri):
         msg = "Namespace uri should end with / or #."
         print(uri)
         raise ValueError(msg)
+    elif namespace is None:
+        from rdflib.namespace import Namespace
+
+        return Namespace(uri)
     else:
-        return Namespace(URIRef(uri))
+        return namespace(uri)
+
+
+def namespaceProblem(uri):
+    """Return the reason uri2Namespace would reject a namespace uri, or None if it would accept it."""
+    if type(uri) is not str:
+        return "Namespace uri must be a string."
+    if uri[:4] != "http":
+        return "Namespace uri should start with http."
+    if uri[-1:] not in ["/", "#"]:
+        return "Namespace uri should end with / or #."
+    return None
+
+
+def prefixDefinitionProblem(ns_def):
+    """Return the reason a "prefix: uri" definition from a diagram cannot be used, or None if it can."""
+    parts = ns_def.split(": ")
+    if len(parts) != 2:
+        return "Prefix definition should be 'prefix: uri'."
+    return namespaceProblem(parts[1])
 
 
 class NamespaceDict(dict):
-    """A dict of string prefixes and the rdflib Namespaces they identify."""
+    """A dict of string prefixes and the rdflib Namespaces, or PlainNamespaces, they identify."""
 
     def __init__(self):
         super().__init__()
+        self.generation = 0  # changes whenever a prefix is (re)defined
+
+    def __setitem__(self, prefix, ns):
+        super().__setitem__(prefix, ns)
+        self.generation += 1
+
+    def __delitem__(self, prefix):
+        super().__delitem__(prefix)
+        self.generation += 1
+
+    # the other dict methods that change prefixes also change the generation
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.generation += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, prefix, ns=None):
+        if prefix not in self:
+            self.generation += 1
+        return super().setdefault(prefix, ns)
+
+    def pop(self, prefix, *default):
+        if prefix in self:
+            self.generation += 1
+        return super().pop(prefix, *default)
+
+    def popitem(self):
+        item = super().popitem()
+        self.generation += 1
+        return item
+
+    def clear(self):
+        super().clear()
+        self.generation += 1
 
     def addNamespace(self, prefix, ns):
-        """Add rdflib Namespace uri to dict with prefix as key."""
+        """Add rdflib Namespace or PlainNamespace uri to dict with prefix as key."""
         if type(prefix) is not str:
             msg = "Namespace prefix must be a string."
             print(prefix)
             raise TypeError(msg)
         elif prefix[-1] == ":":  # strip trailing colon if there is one
             prefix = prefix[:-1]
-        if type(ns) is not Namespace:
+        if not isNamespace(ns):
             msg = "Namespace must be rdflib namespace."
             print(ns)
             raise TypeError(msg)
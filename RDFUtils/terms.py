@@ -0,0 +1,93 @@
+import sys
+from functools import lru_cache
+
+rdf_ns = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+rdfs_ns = "http://www.w3.org/2000/01/rdf-schema#"
+# the http schema.org namespace, not rdflib's https SDO
+sdo_ns = "http://schema.org/"
+xsd_ns = "http://www.w3.org/2001/XMLSchema#"
+rdf_type = rdf_ns + "type"
+
+
+class IRI(str):
+    """A URI written out without rdflib; equal only to an IRI with the same text, as rdflib URIRefs are."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is IRI and str.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((IRI, str.__hash__(self)))
+
+
+class PlainLiteral(str):
+    """A string literal, with no language or datatype, written out without rdflib; equal only to a PlainLiteral with the same text."""
+
+    __slots__ = ()
+    language = None
+    datatype = None
+
+    def __eq__(self, other):
+        return type(other) is PlainLiteral and str.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((PlainLiteral, str.__hash__(self)))
+
+
+class PlainNamespace(str):
+    """A namespace URI used without rdflib."""
+
+    __slots__ = ()
+
+
+def isLiteral(term):
+    """Return True if a term is a literal, from rdflib or not."""
+    return hasattr(term, "datatype")
+
+
+def isNamespace(ns):
+    """Return True if ns is an rdflib Namespace or a PlainNamespace, without importing rdflib."""
+    if type(ns) is PlainNamespace:
+        return True
+    namespace_module = sys.modules.get("rdflib.namespace")
+    return namespace_module is not None and type(ns) is namespace_module.Namespace
+
+
+class TermSet:
+    """The term classes, and the RDF and RDFS terms, that the converter builds triples from."""
+
+    def __init__(self, uriref, literal, namespace):
+        self.URIRef = uriref
+        self.Literal = literal
+        self.Namespace = namespace
+        self.rdf_type = uriref(rdf_type)
+        self.rdf_property = uriref(rdf_ns + "Property")
+        self.rdfs_class = uriref(rdfs_ns + "Class")
+        self.rdfs_literal = uriref(rdfs_ns + "Literal")
+        self.rdfs_is_defined_by = uriref(rdfs_ns + "isDefinedBy")
+        self.rdfs_label = uriref(rdfs_ns + "label")
+        self.rdfs_comment = uriref(rdfs_ns + "comment")
+        self.rdfs_domain = uriref(rdfs_ns + "domain")
+        self.rdfs_range = uriref(rdfs_ns + "range")
+        self.sdo_domain_includes = uriref(sdo_ns + "domainIncludes")
+        self.sdo_range_includes = uriref(sdo_ns + "rangeIncludes")
+
+
+# terms for output written without rdflib, such as streamed N-Triples
+plain_terms = TermSet(IRI, PlainLiteral, PlainNamespace)
+
+
+@lru_cache(maxsize=None)
+def rdflibTerms():
+    """Return the TermSet of rdflib terms, importing rdflib the first time it is asked for."""
+    from rdflib import Literal, URIRef
+    from rdflib.namespace import Namespace
+
+    return TermSet(URIRef, Literal, Namespace)
@@ -1,8 +1,10 @@
 import pytest
 from rdflib import Graph, Literal, URIRef
-from rdflib import RDF, RDFS, DCTERMS
+from rdflib.compare import isomorphic
+from rdflib import RDF, RDFS, DCTERMS, XSD
 from rdflib.namespace import Namespace, NamespaceManager
-from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS import Diag2RDFSConverter, ColumnMap, DiagRow
+from Diag2RDFS.diag2RDFSConverter import propertySpecs
 from RDFUtils import curieUtils, NamespaceDict
 
 test_file = "./Tests/TestData/DESM_Model2.csv"
@@ -29,6 +31,8 @@ def test_init(converter):
     assert c.diagMetaData == []
     assert c.diagClassData == []
     assert c.diagLinkData == []
+    assert c.classIndex == {}
+    assert c.classURIIndex == {}
 
 
 def test_loadDiagData(converter):
@@ -37,12 +41,13 @@ def test_loadDiagData(converter):
     assert len(c.diagMetaData) == 5
     assert len(c.diagClassData) == 2
     assert len(c.diagLinkData) == 2
-    assert type(c.diagMetaData[0]) is dict
-    assert c.diagMetaData[0]["Id"] == "1"
-    assert c.diagMetaData[0]["Name"] == "Document"
-    assert c.diagMetaData[0]["Shape Library"] == ""
-    assert c.diagClassData[0]["Name"] == "Class"
-    assert c.diagLinkData[0]["Name"] == "Line"
+    assert type(c.diagMetaData[0]) is DiagRow
+    assert c.diagMetaData[0]["id"] == "1"
+    assert c.diagMetaData[0]["name"] == "Document"
+    assert "shape_library" not in c.diagMetaData[0]
+    assert c.diagClassData[0]["name"] == "Class"
+    assert c.diagLinkData[0]["name"] == "Line"
+    assert c.classIndex["7"] is c.diagClassData[1]
     with pytest.raises(TypeError) as e:
         c.loadDiagData(["sdo"])
     assert str(e.value) == "Filename must be a string."
@@ -56,6 +61,24 @@ def test_convertMetadata(converter):
     assert c.metadata["defines"] == "desm"
 
 
+def test_ColumnMap():
+    columns = ColumnMap({"label": "Label", "extra": "Extra"})
+    assert columns.columns["id"] == "Id"
+    assert columns.columns["label"] == "Label"
+    project = columns.compile(["Name", "Extra", "Id", "Unused"])
+    row = columns.makeRow(project(["Class", "x", "6", "y"]))
+    assert row["id"] == "6"
+    assert row["name"] == "Class"
+    assert row["extra"] == "x"
+    assert row["label"] == ""
+    assert "Unused" not in row
+    short_row = columns.makeRow(project(["Line"]))
+    assert short_row["id"] == ""
+    with pytest.raises(TypeError) as e:
+        ColumnMap(["Id"])
+    assert str(e.value) == "Columns must be a dict of field names and column headings."
+
+
 def test_convertNamespaces(converter):
     c = converter
     c.convertNamespaces()
@@ -92,6 +115,28 @@ def test_findClassByID(converter):
     assert str(e.value) == "Could not find class with id 42."
 
 
+def test_findClassURIByID(converter):
+    c = converter
+    assert c.findClassURIByID("7") == DESM.AbstractClassMapping
+    assert c.classURIIndex["7"] == DESM.AbstractClassMapping
+    with pytest.raises(ValueError) as e:
+        c.findClassURIByID("42")
+    assert str(e.value) == "Could not find class with id 42."
+
+
+def test_checkLinkIDs():
+    c = Diag2RDFSConverter()
+    c.loadDiagData(test_file)
+    assert c.findDanglingLinkIDs() == {}
+    c.checkLinkIDs()
+    del c.classIndex["6"]
+    del c.classIndex["7"]
+    assert c.findDanglingLinkIDs() == {"8": ["6", "7"], "9": ["6", "7"]}
+    with pytest.raises(ValueError) as e:
+        c.checkLinkIDs()
+    assert str(e.value) == "Could not find classes for links: 8 -> 6, 7; 9 -> 6, 7."
+
+
 def test_getLinkSource(converter):
     c = converter
     link_data = c.diagLinkData[0]
@@ -117,6 +162,100 @@ def test_convertClassProperty(converter):
     prop_def = "dct:creator (xsd:string)"
     class_uriref = DESM.AbstractClassSet
     c.convertClassProperty(prop_def, class_uriref)
-    tr = (DCTERMS.creator, SDO.rangeIncludes, RDFS.Literal)
+    tr = (DCTERMS.creator, SDO.rangeIncludes, XSD.string)
     assert tr in c.schema.triples((None, None, None))
     assert tr in c.schema.triples((None, None, None))
+    for prop_def in ["", " \n"]:
+        with pytest.raises(ValueError) as e:
+            c.convertClassProperty(prop_def, class_uriref)
+        assert str(e.value) == "Could not read property definition: " + repr(prop_def)
+
+
+def test_reuse(tmp_path):
+    with open(test_file) as csv_file:
+        text = csv_file.read()
+    text = text.replace(str(DESM), "http://example.org/other/")
+    text = text.replace("desm", "other").replace("DESM Model", "Other Model")
+    other_file = str(tmp_path / "other.csv")
+    with open(other_file, "w") as csv_file:
+        csv_file.write(text)
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(test_file)
+    first = c.schema
+    first_size = len(first)
+    c.convertDiag2RDFS(other_file)
+    fresh = Diag2RDFSConverter()
+    fresh.convertDiag2RDFS(other_file)
+    assert first is not c.schema
+    assert len(first) == first_size
+    assert isomorphic(c.schema, fresh.schema)
+    assert c.metadata == fresh.metadata
+    assert c.metadata["title"] == "Other Model"
+    assert dict(c.namespaces) == dict(fresh.namespaces)
+    assert "desm" not in c.namespaces
+    assert dict(c.schema.namespaces()) == dict(fresh.schema.namespaces())
+    assert c.classURIIndex == fresh.classURIIndex
+    assert c.datatypeURIIndex == fresh.datatypeURIIndex
+
+
+def test_propertySpecs():
+    text = "dct:title\ndct:created (xsd:date)\r\n\n  desm:count( xsd:integer ) \ndct:bad (a) (b)\n"
+    specs, unread = propertySpecs(text)
+    assert specs == (
+        ("dct:title", ""),
+        ("dct:created", "xsd:date"),
+        ("desm:count", "xsd:integer"),
+    )
+    assert unread == ("dct:bad (a) (b)",)
+    c = Diag2RDFSConverter()
+    with pytest.raises(ValueError) as e:
+        c.classPropertySpecs(text)
+    assert str(e.value) == "Could not read property definition: 'dct:bad (a) (b)'"
+    assert propertySpecs("dct:title\n \t\n") == ((("dct:title", ""),), ())
+    text = "dct:title trailing text"
+    assert propertySpecs(text) == ((), (text,))
+
+
+def test_classPropertyRanges(converter):
+    c = converter
+    triples = list(c.classPropertyTriples("desm:size (xsd:integer)", DESM.A))
+    assert (DESM["size"], RDFS.range, XSD.integer) in triples
+    assert (DESM["size"], RDFS.domain, DESM.A) in triples
+    triples = list(c.classPropertyTriples("desm:name", DESM.A))
+    assert (DESM.name, RDFS.range, RDFS.Literal) in triples
+    triples = list(c.classPropertyTriples("dct:issued (dct:W3CDTF)", DESM.A))
+    assert (DCTERMS.issued, SDO.rangeIncludes, DCTERMS.W3CDTF) in triples
+
+
+def test_datatypeNotCurie(converter, capsys):
+    c = converter
+    triples = list(c.classPropertyTriples("desm:label (Text)", DESM.A))
+    assert (DESM.label, RDFS.range, RDFS.Literal) in triples
+    triples = list(c.classPropertyTriples("desm:code (foo:code)", DESM.A))
+    assert (DESM.code, RDFS.range, RDFS.Literal) in triples
+    assert capsys.readouterr().err.splitlines() == [
+        "Warning: rdfs:Literal used for datatype Text. CURIe should have one colon ':' in it.",
+        "Warning: rdfs:Literal used for datatype foo:code. No namespace for CURIe prefix.",
+    ]
+
+
+def test_sharedPropertyTriples():
+    c = Diag2RDFSConverter()
+    c.loadDiagData(test_file)
+    c.convertMetadata()
+    c.convertNamespaces()
+    triples = list(c.iterTriples())
+    assert len(triples) == len(set(triples))
+    title_triples = [tr for tr in triples if tr[0] == DCTERMS.title]
+    assert len(title_triples) == 5  # shared by two classes
+    assert (DCTERMS.title, SDO.domainIncludes, DESM.AbstractClassMapping) in triples
+    row = c.diagClassData[1]
+    assert (DCTERMS.title, RDF.type, RDF.Property) in set(c.classTriples(row))
+
+
+def test_addTriples():
+    c = Diag2RDFSConverter()
+    tr = (DESM.AbstractClassSet, RDF.type, RDFS.Class)
+    c.addTriples(iter([tr, tr, (DESM.AbstractClassSet, RDFS.label, Literal("A"))]))
+    assert len(c.schema) == 2
+    assert tr in c.schema
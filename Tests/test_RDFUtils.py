@@ -1,7 +1,9 @@
 import pytest
-from rdflib import Graph, Literal, URIRef
+from rdflib import Graph, Literal, URIRef, RDF
 from rdflib.namespace import Namespace
 from RDFUtils import NamespaceDict, uri2Namespace, str2uriref, curie2uriref
+from RDFUtils import CurieResolver, IRI, PlainNamespace, plain_terms
+from RDFUtils.terms import PlainLiteral
 
 
 @pytest.fixture(scope="module")
@@ -57,3 +59,63 @@ def test_curie2uriref(namespaces):
     curie = "sdo:name"
     uri_ref = curie2uriref(curie, n)
     assert uri_ref == URIRef("http://schema.org/name")
+
+
+def test_CurieResolver():
+    n = NamespaceDict()
+    n.addNamespace("sdo", uri2Namespace("http://schema.org/"))
+    r = CurieResolver(n, maxsize=2)
+    uriref, ns_id, ns_uri = r.splitCurie("sdo:name")
+    assert uriref == URIRef("http://schema.org/name")
+    assert ns_id == "sdo"
+    assert ns_uri == URIRef("http://schema.org/")
+    assert r.splitCurie("sdo:name")[0] is uriref
+    assert r.uriref("sdo:name") is uriref
+    assert r.uriref("http://schema.org/name") is uriref
+    assert r.cacheInfo() == {"hits": 1, "misses": 3, "size": 3}
+    n.addNamespace("sdo", uri2Namespace("https://schema.org/"))
+    assert r.splitCurie("sdo:name")[0] == URIRef("https://schema.org/name")
+    assert r.cacheInfo() == {"hits": 0, "misses": 1, "size": 1}
+    with pytest.raises(ValueError) as e:
+        r.splitCurie("name")
+    assert str(e.value) == "CURIe should have one colon ':' in it."
+    with pytest.raises(TypeError) as e:
+        CurieResolver(dict())
+    assert str(e.value) == "Namespaces must be a RDFUtils NamespaceDict."
+
+
+def test_CurieResolverBounds():
+    n = NamespaceDict()
+    n.addNamespace("sdo", uri2Namespace("http://schema.org/"))
+    r = CurieResolver(n, maxsize=2)
+    for name in ["a", "b", "c", "d", "e", "f"]:
+        r.uriref("sdo:" + name)
+    assert len(r._interned) <= 4
+    for change in [
+        lambda: n.update(ex=uri2Namespace("http://example.org/")),
+        lambda: n.setdefault("dct", uri2Namespace("http://purl.org/dc/terms/")),
+        lambda: n.pop("ex"),
+        lambda: n.clear(),
+    ]:
+        generation = n.generation
+        change()
+        assert n.generation > generation
+    generation = n.generation
+    n.setdefault("dct", uri2Namespace("http://purl.org/dc/terms/"))
+    n.setdefault("dct", uri2Namespace("http://example.org/"))
+    assert n.generation == generation + 1
+    assert r.splitCurie("dct:title")[0] == URIRef("http://purl.org/dc/terms/title")
+
+
+def test_plainTerms():
+    n = NamespaceDict()
+    n.addNamespace("sdo", uri2Namespace("http://schema.org/", PlainNamespace))
+    r = CurieResolver(n, uriref=IRI)
+    uriref, ns_id, ns_uri = r.splitCurie("sdo:name")
+    assert type(uriref) is IRI and uriref == IRI("http://schema.org/name")
+    assert type(ns_uri) is IRI and ns_uri == IRI("http://schema.org/")
+    assert plain_terms.rdf_type == IRI(str(RDF.type))
+    # like rdflib terms, an IRI and a literal with the same text are different terms
+    assert IRI("x") != PlainLiteral("x") and IRI("x") != "x"
+    assert len({IRI("x"), PlainLiteral("x"), IRI("x"), PlainLiteral("x")}) == 2
+    assert plain_terms.Literal("x").datatype is None
@@ -0,0 +1,59 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from rdflib import Graph, URIRef, SDO
+from Diag2RDFS import convert, ConversionOptions, ConversionResult
+from Benchmarks.lucidGenerator import writeLucidCSV
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+def canonical(result):
+    return sorted(result.schema.serialize(format="nt").splitlines())
+
+
+def test_convert():
+    result = convert(test_file)
+    assert type(result) is ConversionResult
+    assert len(result.schema) == 37
+    assert result.metadata["title"] == "DESM Model"
+    assert result.namespaces["dct"] == "http://purl.org/dc/terms/"
+    assert result.text is None
+    with pytest.raises(TypeError):
+        result.metadata["title"] = "changed"
+    with open(test_file, "rb") as diag_file:
+        from_bytes = convert(diag_file.read(), ConversionOptions(output_format="nt"))
+    assert canonical(from_bytes) == canonical(result)
+    assert set(Graph().parse(data=from_bytes.text, format="nt")) == set(result.schema)
+    with pytest.raises(TypeError) as e:
+        convert(42)
+    assert str(e.value) == "Source must be a file name, an open file or csv bytes."
+    with pytest.raises(TypeError) as e:
+        convert(test_file, {"output_format": "nt"})
+    assert str(e.value) == "Options must be ConversionOptions."
+
+
+def test_ConversionOptions():
+    columns = {"label": "Label"}
+    options = ConversionOptions(columns=columns)
+    columns["label"] = "changed"
+    assert options.columns["label"] == "Label"
+    with pytest.raises(Exception):
+        options.output_format = "nt"
+
+
+def test_convert_threads(tmp_path):
+    fnames = list()
+    for n in range(4):
+        fname = str(tmp_path / ("diagram%d.csv" % n))
+        writeLucidCSV(fname, classes=40, properties=5, links=40, seed=n)
+        fnames.append(fname)
+    jobs = fnames * 8
+    options = ConversionOptions(output_format="turtle")
+    serial = [canonical(convert(fname, options)) for fname in jobs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        threaded = list(
+            pool.map(lambda fname: canonical(convert(fname, options)), jobs)
+        )
+    assert threaded == serial
+    # rdflib's shared schema.org namespace is left alone
+    assert SDO.rangeIncludes == URIRef("https://schema.org/rangeIncludes")
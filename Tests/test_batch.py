@@ -0,0 +1,88 @@
+import pytest
+import subprocess
+import sys
+from os import path
+from Diag2RDFS.batch import expandInputs, outputName, convertBatch, summariseBatch
+from Diag2RDFS.batch import checkOutputNames
+
+test_dir = "./Tests/TestData"
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+def test_expandInputs():
+    assert expandInputs([test_dir]) == [path.join(test_dir, "DESM_Model2.csv")]
+    assert expandInputs(["./Tests/TestData/*.csv", test_file]) == [test_file]
+    assert expandInputs(["missing.csv"]) == ["missing.csv"]
+    with pytest.raises(TypeError) as e:
+        expandInputs(test_file)
+    assert str(e.value) == "Inputs must be a list of strings."
+
+
+def test_outputName():
+    assert outputName(test_file) == "./Tests/TestData/DESM_Model2.ttl"
+    assert outputName(test_file, "out") == "out/DESM_Model2.ttl"
+
+
+def test_convertBatch(tmp_path):
+    out_dir = str(tmp_path)
+    results = convertBatch([test_file, "missing.csv"], out_dir, jobs=2)
+    assert [r["input"] for r in results] == [test_file, "missing.csv"]
+    assert results[0]["error"] is None
+    assert path.exists(results[0]["output"])
+    with open(results[0]["output"]) as schema_file:
+        assert schema_file.readline() == "# Title:  DESM Model\n"
+    assert results[1]["output"] is None
+    assert not path.exists(path.join(out_dir, "missing.ttl"))
+    assert results[1]["error"].startswith("FileNotFoundError")
+    summary = summariseBatch(results, 1.0)
+    assert summary.splitlines()[-1].startswith("1 converted (0 from cache), 1 failed")
+    with pytest.raises(ValueError) as e:
+        convertBatch([test_file], out_dir, jobs=0)
+    assert str(e.value) == "Number of jobs must be a positive integer."
+
+
+def test_convertFileKeepsOld(tmp_path):
+    """A failed reconversion should leave the schema written before."""
+    bad_file = str(tmp_path / "DESM_Model2.csv")
+    with open(bad_file, "w") as csv_file:
+        csv_file.write("Id,Name\n1,Class\n")  # a class without a CURIE
+    out_dir = str(tmp_path / "out")
+    assert convertBatch([test_file], out_dir)[0]["error"] is None
+    output = path.join(out_dir, "DESM_Model2.ttl")
+    with open(output) as schema_file:
+        before = schema_file.read()
+    result = convertBatch([bad_file], out_dir)[0]
+    assert result["error"] is not None
+    with open(output) as schema_file:
+        assert schema_file.read() == before
+    assert not path.exists(output + ".tmp")
+
+
+def test_streamWithoutRDFLib():
+    """Streaming N-Triples from the command line should not import rdflib."""
+    script = (
+        "import atexit, runpy, sys; "
+        "atexit.register(lambda: print('rdflib' in sys.modules, file=sys.stderr)); "
+        "sys.argv = ['diag2rdfs.py', '--no-cache', '--stream', 'nt', %r]; "
+        "runpy.run_path('diag2rdfs.py', run_name='__main__')"
+    ) % test_file
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.startswith("# Title:  DESM Model\n")
+    assert result.stderr.strip() == "False"
+
+
+def test_checkOutputNames(tmp_path):
+    same_name = [test_file, "other/DESM_Model2.csv"]
+    checkOutputNames(same_name)
+    with pytest.raises(ValueError) as e:
+        convertBatch(same_name, str(tmp_path))
+    assert str(e.value) == (
+        "%s and other/DESM_Model2.csv would both be written to %s."
+        % (test_file, path.join(str(tmp_path), "DESM_Model2.ttl"))
+    )
+    assert not path.exists(path.join(str(tmp_path), "DESM_Model2.ttl"))
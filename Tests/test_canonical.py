@@ -0,0 +1,73 @@
+import json
+from os import path, stat
+from random import Random
+from rdflib import Graph
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.canonical import canonicalText, canonicalSchema, convertCanonical
+from Diag2RDFS.canonical import Manifest, convertCanonicalBatch, manifest_name
+from Diag2RDFS.batch import summariseBatch
+from RDFUtils import IRI, PlainLiteral
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+def test_canonicalText():
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(test_file)
+    text = canonicalSchema(c)
+    triples = list(c.schema)
+    Random(0).shuffle(triples)
+    assert canonicalText(triples + triples[:5], c.metadata, c.namespaces) == text
+    assert convertCanonical(test_file) == text
+    assert set(Graph().parse(data=text, format="turtle")) == set(c.schema)
+    nt_text = convertCanonical(test_file, "nt")
+    lines = nt_text.splitlines()[2:]
+    assert lines == sorted(lines)
+    assert set(Graph().parse(data=nt_text, format="nt")) == set(c.schema)
+
+
+def test_plainTermsKeptApart():
+    s, p = IRI("http://example.org/s"), IRI("http://example.org/p")
+    triples = [(s, p, IRI("x")), (s, p, PlainLiteral("x"))]
+    metadata = {"title": "t", "date": "d"}
+    assert canonicalText(triples, metadata, dict(), "nt").splitlines()[2:] == [
+        '<http://example.org/s> <http://example.org/p> "x" .',
+        "<http://example.org/s> <http://example.org/p> <x> .",
+    ]
+
+
+def test_convertCanonicalBatch(tmp_path):
+    out_dir = str(tmp_path)
+    manifest_file = path.join(out_dir, manifest_name)
+    results = convertCanonicalBatch(
+        [test_file], out_dir, manifest=Manifest(manifest_file)
+    )
+    output = results[0]["output"]
+    assert results[0]["unchanged"] is False
+    with open(output) as schema_file:
+        assert schema_file.read() == convertCanonical(test_file)
+    with open(manifest_file) as f:
+        entry = json.load(f)["outputs"]["DESM_Model2.ttl"]
+    assert entry == {"sha256": results[0]["sha256"], "bytes": stat(output).st_size}
+    assert results[0]["etag"] == '"' + entry["sha256"] + '"'
+    written = stat(output).st_mtime_ns
+    manifest_written = stat(manifest_file).st_mtime_ns
+    again = convertCanonicalBatch(
+        [test_file], out_dir, manifest=Manifest(manifest_file)
+    )
+    assert again[0]["unchanged"] is True
+    assert again[0]["etag"] == results[0]["etag"]
+    assert stat(output).st_mtime_ns == written
+    assert stat(manifest_file).st_mtime_ns == manifest_written
+    assert "same" in summariseBatch(again).splitlines()[0]
+    with open(output, "a") as schema_file:
+        schema_file.write("# edited\n")
+    again = convertCanonicalBatch(
+        [test_file], out_dir, manifest=Manifest(manifest_file)
+    )
+    assert again[0]["unchanged"] is False
+    assert stat(output).st_size == entry["bytes"]
+    failed = convertCanonicalBatch(
+        ["missing.csv"], out_dir, manifest=Manifest(manifest_file)
+    )
+    assert failed[0]["error"].startswith("FileNotFoundError")
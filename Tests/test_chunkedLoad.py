@@ -0,0 +1,64 @@
+import pytest
+from csv import writer
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.chunkedLoad import recordEnd, chunkBoundaries, loadDiagChunks
+from Benchmarks.lucidGenerator import generateRows, header
+
+comment_column = header.index("rdfs:comment")
+comments = ["", 'a "quoted"\r\nline, with\rbreaks\n', '""', "plain", "form\x0cfeed"]
+
+
+@pytest.fixture(scope="module")
+def awkward_csv(tmp_path_factory):
+    """A diagram export with CRLF line ends and multi-line quoted comments."""
+    fname = str(tmp_path_factory.mktemp("chunks") / "awkward.csv")
+    with open(fname, "w", newline="") as csv_file:
+        csv_writer = writer(csv_file)
+        for n, record in enumerate(generateRows(pages=2, classes=40, links=40)):
+            if n > 0:
+                record[comment_column] = comments[n % len(comments)]
+            csv_writer.writerow(record)
+        csv_file.write("\r\n")  # a blank line at the end
+    return fname
+
+
+def loadedRows(c):
+    return [row.asDict() for row in c.diagMetaData + c.diagClassData + c.diagLinkData]
+
+
+def rowNumbers(c):
+    return [row.rowNumber for row in c.diagMetaData + c.diagClassData + c.diagLinkData]
+
+
+def test_recordEnd():
+    data = b'a,b\n"x\ny",z\nc,d\n'
+    assert recordEnd(data, 0) == 4
+    assert recordEnd(data, 4) == 12
+    assert recordEnd(data, 7, 1) == 12
+    assert recordEnd(data, 16) is None
+    assert chunkBoundaries(data, 4, 1) == [4, 12, 16]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 50, 1000, None])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_loadDiagChunks(awkward_csv, chunk_size, jobs):
+    expected = Diag2RDFSConverter()
+    expected.loadDiagData(awkward_csv)
+    c = Diag2RDFSConverter()
+    loadDiagChunks(c, awkward_csv, jobs, chunk_size)
+    assert loadedRows(c) == loadedRows(expected)
+    assert rowNumbers(c) == rowNumbers(expected)
+    assert len(c.diagClassData) == 40
+    assert c.classIndex.keys() == expected.classIndex.keys()
+
+
+def test_loadJobs(awkward_csv, tmp_path):
+    c = Diag2RDFSConverter(load_jobs=2)
+    c.loadDiagData(awkward_csv)
+    expected = Diag2RDFSConverter()
+    expected.loadDiagData(awkward_csv)
+    assert loadedRows(c) == loadedRows(expected)
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    c.loadDiagData(str(empty))
+    assert loadedRows(c) == []
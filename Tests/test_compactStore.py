@@ -0,0 +1,119 @@
+import pytest
+import random
+import subprocess
+import sys
+from array import array
+from rdflib import Graph, Literal, Namespace, URIRef, RDF, RDFS
+from Diag2RDFS import Diag2RDFSConverter, CompactStore
+from Diag2RDFS.compactStore import sortRows
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+EX = Namespace("http://example.org/")
+
+
+@pytest.fixture(scope="module")
+def schemas():
+    default = Diag2RDFSConverter()
+    default.convertDiag2RDFS(test_file)
+    compact = Diag2RDFSConverter(store="Compact")
+    compact.convertDiag2RDFS(test_file)
+    return default, compact
+
+
+def test_compactSchema(schemas):
+    default, compact = schemas
+    assert type(compact.schema.store) is CompactStore
+    assert len(compact.schema) == len(default.schema) == 37
+    assert set(compact.schema) == set(default.schema)
+    assert compact.serializeSchema() == default.serializeSchema()
+
+
+def test_compactPatterns(schemas):
+    default, compact = schemas
+    patterns = [(None, None, None), (None, None, EX.missing)]
+    for s, p, o in default.schema:
+        patterns.extend(
+            [
+                (s, None, None),
+                (None, p, None),
+                (None, None, o),
+                (s, p, None),
+                (s, None, o),
+                (None, p, o),
+                (s, p, o),
+            ]
+        )
+    for pattern in patterns:
+        assert set(compact.schema.triples(pattern)) == set(
+            default.schema.triples(pattern)
+        )
+
+
+def test_compactAddRemove():
+    g = Graph(store=CompactStore())
+    g.add((EX.a, RDF.type, RDFS.Class))
+    g.add((EX.a, RDF.type, RDFS.Class))
+    g.addN([(EX.a, RDFS.label, Literal("A"), g), (EX.b, RDF.type, RDFS.Class, g)])
+    assert len(g) == 3
+    assert (EX.a, RDFS.label, Literal("A")) in g
+    g.remove((EX.a, None, None))
+    assert set(g) == {(EX.b, RDF.type, RDFS.Class)}
+    g.add((EX.a, RDFS.label, Literal("A")))
+    g.remove((EX.a, RDFS.label, Literal("B")))
+    assert len(g) == 2
+    assert set(g.subjects(RDF.type, RDFS.Class)) == {EX.b}
+
+
+def test_sortRows():
+    column = array("I", [2, 0, 1, 0, 2])
+    assert list(sortRows(array("I", range(5)), column, 3)) == [1, 3, 2, 0, 4]
+    assert list(sortRows(array("I", [4, 3, 0]), column, 3)) == [3, 4, 0]
+
+
+def test_compactIndexes():
+    rng = random.Random(1)
+    triples = [
+        (
+            EX["s%d" % rng.randrange(20)],
+            EX["p%d" % rng.randrange(5)],
+            EX["o%d" % rng.randrange(20)],
+        )
+        for i in range(500)
+    ]
+    compact = Graph(store="Compact")
+    default = Graph()
+    for triple in triples:
+        compact.add(triple)
+        default.add(triple)
+    assert len(compact) == len(default)
+    assert set(compact) == set(default)
+    for s, p, o in triples[:20]:
+        for pattern in [(None, p, None), (None, p, o), (None, None, o), (s, None, o)]:
+            assert set(compact.triples(pattern)) == set(default.triples(pattern))
+
+
+def test_storeImports():
+    """Only the store plugin a converter uses should be imported."""
+    script = (
+        "import sys; from Diag2RDFS import Diag2RDFSConverter; "
+        "c = Diag2RDFSConverter(store=sys.argv[1]); c.convertDiag2RDFS(%r); "
+        "print([m for m in ['compactStore', 'sqliteStore'] if 'Diag2RDFS.' + m in sys.modules])"
+    ) % test_file
+    for store, imported in [("default", "[]"), ("Compact", "['compactStore']")]:
+        result = subprocess.run(
+            [sys.executable, "-c", script, store],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == imported
+
+
+def test_compactBind():
+    g = Graph(store="Compact")
+    g.bind("ex", EX)
+    assert g.store.namespace("ex") == URIRef(EX)
+    assert g.store.prefix(URIRef(EX)) == "ex"
+    g.bind("other", EX)
+    assert g.store.namespace("ex") is None
+    assert ("other", URIRef(EX)) in list(g.namespaces())
@@ -0,0 +1,100 @@
+import pytest
+import subprocess
+import sys
+import Diag2RDFS
+from io import StringIO
+from os import path, utime
+from Diag2RDFS import Diag2RDFSConverter, ColumnMap, conversionCache
+from Diag2RDFS.batch import convertDiagram, convertBatch
+from Diag2RDFS.conversionCache import ConversionCache
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+def test_key(tmp_path):
+    cache = ConversionCache(str(tmp_path))
+    key = cache.key(b"Id,Name\n", ColumnMap(), "ttl")
+    assert key == cache.key(b"Id,Name\n", ColumnMap(), "ttl")
+    assert key != cache.key(b"Id,Name\n1,Page\n", ColumnMap(), "ttl")
+    assert key != cache.key(b"Id,Name\n", ColumnMap(), "nt")
+    assert key != cache.key(b"Id,Name\n", ColumnMap({"label": "Label"}), "ttl")
+
+
+def test_keyCodeChange(tmp_path, monkeypatch):
+    cache = ConversionCache(str(tmp_path))
+    c = Diag2RDFSConverter()
+    out = StringIO()
+    convertDiagram(test_file, out, cache=cache, converter=c)
+    assert convertDiagram(test_file, StringIO(), cache=cache) is True
+    monkeypatch.setattr(conversionCache, "sourceHash", lambda: "changed code")
+    assert convertDiagram(test_file, StringIO(), cache=cache) is False
+    monkeypatch.undo()
+    monkeypatch.setattr(Diag2RDFS, "__version__", "99.0")
+    assert convertDiagram(test_file, StringIO(), cache=cache) is False
+    with pytest.raises(TypeError) as e:
+        ConversionCache(42)
+    assert str(e.value) == "Cache directory must be a string."
+
+
+def test_get_put(tmp_path):
+    cache = ConversionCache(str(tmp_path))
+    assert cache.get("missing") is None
+    cache.put("a", "schema text")
+    assert cache.get("a") == "schema text"
+
+
+def test_unusable(tmp_path, capsys):
+    not_dir = tmp_path / "file"
+    not_dir.write_text("not a directory")
+    cache = ConversionCache(str(not_dir / "cache"))
+    out = StringIO()
+    assert not convertDiagram(test_file, out, cache=cache)
+    assert out.getvalue().startswith("# Title:  DESM Model\n")
+    assert not cache.usable
+    assert capsys.readouterr().err.startswith("Warning: not using the cache in ")
+    env = {"XDG_CACHE_HOME": str(not_dir), "PATH": ""}
+    result = subprocess.run(
+        [sys.executable, "diag2rdfs.py", test_file],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert result.returncode == 0
+    assert result.stdout.startswith("# Title:  DESM Model\n")
+    assert "Warning: not using the cache" in result.stderr
+    result = subprocess.run(
+        [sys.executable, "diag2rdfs.py", "--cache-size", "0", test_file],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 2
+    assert "--cache-size: invalid value: '0'" in result.stderr
+
+
+def test_evict(tmp_path):
+    cache = ConversionCache(str(tmp_path), max_bytes=10**6)
+    for n, key in enumerate(["old", "middle", "new"]):
+        cache.put(key, str(n) * 1000)
+        utime(cache.entryName(key), (n, n))
+    cache.get("old")  # using an entry makes it the most recent
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert cache.get("middle") is None
+    assert cache.get("old") == "0" * 1000
+    assert cache.get("new") == "2" * 1000
+
+
+def test_convertDiagram(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    first = StringIO()
+    assert not convertDiagram(test_file, first, cache=cache)
+    second = StringIO()
+    assert convertDiagram(test_file, second, cache=cache)
+    assert first.getvalue() == second.getvalue()
+    streamed = StringIO()
+    assert not convertDiagram(test_file, streamed, stream="nt", cache=cache)
+    assert streamed.getvalue() != first.getvalue()
+    results = convertBatch([test_file], str(tmp_path / "out"), cache=cache)
+    assert results[0]["cached"]
+    with open(results[0]["output"]) as schema_file:
+        assert schema_file.read() == first.getvalue()
@@ -0,0 +1,80 @@
+import json
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.conversionCache import ConversionCache
+from Diag2RDFS.formats import convertFormatsBatch, serializeFormat, writeFormats
+from Diag2RDFS.formats import xmlComment
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+parsers = {"ttl": "turtle", "nt": "nt", "xml": "xml", "json-ld": "json-ld"}
+
+
+@pytest.fixture(scope="module")
+def converter():
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(test_file)
+    return c
+
+
+def test_xmlComment():
+    assert xmlComment("a--b---c") == "<!-- a- -b- - -c -->\n"
+
+
+def test_serializeFormat(converter):
+    c = converter
+    assert serializeFormat(c.schema, c.metadata, "ttl") == c.serializeSchema()
+    assert serializeFormat(c.schema, c.metadata, "nt").startswith(
+        "# Title:  DESM Model\n# Date:  2021-12-17\n<"
+    )
+    xml = serializeFormat(c.schema, c.metadata, "xml")
+    assert xml.split("\n")[1:3] == [
+        "<!-- Title:  DESM Model -->",
+        "<!-- Date:  2021-12-17 -->",
+    ]
+    document = json.loads(serializeFormat(c.schema, c.metadata, "json-ld"))
+    assert document["title"] == "DESM Model"
+    assert document["date"] == "2021-12-17"
+    with pytest.raises(ValueError) as e:
+        serializeFormat(c.schema, c.metadata, "csv")
+    assert str(e.value) == "Unknown output format: csv"
+
+
+@pytest.mark.parametrize("jobs", [1, None])
+def test_writeFormats(converter, tmp_path, jobs):
+    formats = ["ttl", "nt", "xml", "json-ld"]
+    written = writeFormats(converter, formats, test_file, str(tmp_path), jobs)
+    assert sorted(name.split("/")[-1] for name in written.values()) == [
+        "DESM_Model2.jsonld",
+        "DESM_Model2.nt",
+        "DESM_Model2.rdf",
+        "DESM_Model2.ttl",
+    ]
+    for output_format, fname in written.items():
+        g = Graph()
+        g.parse(fname, format=parsers[output_format])
+        assert isomorphic(g, converter.schema)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convertFormatsBatch(tmp_path, jobs):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    fnames = [test_file, str(tmp_path / "missing.csv")]
+    output_dir = str(tmp_path / "out")
+    results = convertFormatsBatch(fnames, ["ttl", "nt"], output_dir, jobs, cache)
+    assert [result["cached"] for result in results] == [False, False]
+    assert results[0]["error"] is None
+    assert results[1]["error"].startswith("FileNotFoundError")
+    assert results[0]["output"].split(", ") == [
+        output_dir + "/DESM_Model2.ttl",
+        output_dir + "/DESM_Model2.nt",
+    ]
+    first = open(output_dir + "/DESM_Model2.nt").read()
+    results = convertFormatsBatch(fnames, ["nt", "xml"], output_dir, jobs, cache)
+    assert results[0]["cached"] is False  # xml was not cached
+    results = convertFormatsBatch(fnames[:1], ["xml", "nt"], output_dir, jobs, cache)
+    assert results[0]["cached"] is True
+    assert open(output_dir + "/DESM_Model2.nt").read() == first
+    with pytest.raises(ValueError):
+        convertFormatsBatch(fnames, ["csv"], output_dir, jobs)
@@ -0,0 +1,93 @@
+import pytest
+import sys
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.incremental import IncrementalConverter, watch
+from Benchmarks.lucidGenerator import writeLucidCSV
+from parseArguments import parse_arguments
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+def fullConversion(fname):
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(fname)
+    return set(c.schema)
+
+
+def edit(fname, old, new):
+    with open(fname) as diag_file:
+        text = diag_file.read()
+    assert old in text
+    with open(fname, "w") as diag_file:
+        diag_file.write(text.replace(old, new))
+
+
+def test_update(tmp_path):
+    fname = str(tmp_path / "diagram.csv")
+    writeLucidCSV(fname, classes=30, properties=4, links=30, namespaces=2)
+    incremental = IncrementalConverter()
+    stats = incremental.update(fname)
+    assert stats["full"]
+    assert set(incremental.schema) == fullConversion(fname)
+    stats = incremental.update(fname)
+    assert stats == dict(stats, full=False, rows=0, added=0, removed=0)
+    edit(fname, "Class 7,", "Class seven,")
+    stats = incremental.update(fname)
+    assert not stats["full"]
+    assert 1 <= stats["rows"] < 10
+    assert set(incremental.schema) == fullConversion(fname)
+    edit(fname, "ns0:Class4,", "ns0:RenamedClass,")
+    incremental.update(fname)
+    assert set(incremental.schema) == fullConversion(fname)
+    edit(fname, "Synthetic page 0", "Renamed page")  # dct:title is not read
+    assert incremental.update(fname)["rows"] == 0
+    edit(fname, "Page 0", "First page")
+    assert incremental.update(fname)["full"]
+    assert set(incremental.schema) == fullConversion(fname)
+
+
+def test_update_error(tmp_path):
+    fname = str(tmp_path / "diagram.csv")
+    with open(test_file) as diag_file:
+        text = diag_file.read()
+    with open(fname, "w") as diag_file:
+        diag_file.write(text)
+    incremental = IncrementalConverter()
+    incremental.update(fname)
+    before = set(incremental.schema)
+    bindings = dict(incremental.schema.namespaces())
+    edit(fname, "8,Line,,2,,,6,7", "8,Line,,2,,,6,42")
+    edit(fname, "dct: http://purl.org/dc/terms/", "dct: http://example.org/terms/")
+    with pytest.raises(ValueError):
+        incremental.update(fname)
+    assert set(incremental.schema) == before
+    assert dict(incremental.schema.namespaces()) == bindings
+
+
+def test_watch(tmp_path):
+    output = str(tmp_path / "schema.ttl")
+    incremental = watch(test_file, output, interval=0, updates=1)
+    with open(output) as schema_file:
+        assert schema_file.readline() == "# Title:  DESM Model\n"
+    assert set(incremental.schema) == fullConversion(test_file)
+
+
+def test_watch_write_error(tmp_path, capsys):
+    output = str(tmp_path / "missing" / "schema.ttl")
+    incremental = watch(test_file, output, interval=0, updates=1)
+    assert set(incremental.schema) == fullConversion(test_file)
+    assert capsys.readouterr().err.startswith("Not written: FileNotFoundError:")
+
+
+def test_watch_arguments(monkeypatch, capsys):
+    monkeypatch.setattr(
+        sys, "argv", ["diag2rdfs.py", "--watch", "-o", "out", test_file]
+    )
+    assert parse_arguments().watch
+    for option in [["--stream", "nt"], ["--canonical"], ["--serve"]]:
+        monkeypatch.setattr(
+            sys, "argv", ["diag2rdfs.py", "--watch", test_file] + option
+        )
+        with pytest.raises(SystemExit):
+            parse_arguments()
+        assert "--watch cannot be used with --stream, " in capsys.readouterr().err
@@ -0,0 +1,25 @@
+import pytest
+from Diag2RDFS import Diag2RDFSConverter
+from Benchmarks.lucidGenerator import header, generateRows, writeLucidCSV
+
+
+def test_generateRows():
+    rows = list(generateRows(pages=2, classes=4, properties=3, links=5))
+    assert rows[0] == header
+    names = [row[1] for row in rows[1:]]
+    assert names == ["Document"] + ["Page"] * 2 + ["Class"] * 4 + ["Line"] * 5
+    assert rows == list(generateRows(pages=2, classes=4, properties=3, links=5))
+    with pytest.raises(ValueError) as e:
+        list(generateRows(pages=0))
+    assert str(e.value) == "A diagram needs at least one page and one namespace."
+
+
+def test_writeLucidCSV(tmp_path):
+    fname = str(tmp_path / "diagram.csv")
+    writeLucidCSV(fname, classes=20, properties=4, links=10, namespaces=3)
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(fname)
+    assert len(c.diagClassData) == 20
+    assert len(c.diagLinkData) == 10
+    assert c.metadata["defines"] == "ns0"
+    assert len(c.schema) > 20 * 2 + 10 * 2
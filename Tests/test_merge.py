@@ -0,0 +1,79 @@
+import pytest
+import sys
+from rdflib import Graph
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.merge import mergeDiagrams, unifyNamespaces, summariseMerge
+from Benchmarks.lucidGenerator import writeLucidCSV
+from parseArguments import parse_arguments
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+DESM = "https://github.com/t3-innovation-network/desm/tree/main/schemas/desmSchema/"
+
+
+def converted(fname):
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(fname)
+    return set(c.schema)
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory):
+    tmp_dir = tmp_path_factory.mktemp("merge")
+    relabelled = str(tmp_dir / "relabelled.csv")
+    with open(test_file) as diag_file:
+        text = diag_file.read()
+    with open(relabelled, "w") as diag_file:
+        diag_file.write(text.replace(",Abstract Class Set,", ",Class Set,"))
+    generated = str(tmp_dir / "generated.csv")
+    writeLucidCSV(generated, classes=20, links=20)
+    return [test_file, relabelled, generated, str(tmp_dir / "missing.csv")]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_mergeDiagrams(inputs, tmp_path, jobs):
+    output = str(tmp_path / "merged.nt")
+    report = mergeDiagrams(inputs, output, jobs)
+    expected = converted(inputs[0]) | converted(inputs[1]) | converted(inputs[2])
+    with open(output) as merged:
+        lines = merged.readlines()
+    assert lines == sorted(set(lines))
+    assert set(Graph().parse(output, format="nt")) == expected
+    assert report["results"][3]["error"].startswith("FileNotFoundError")
+    assert len(report["conflicts"]) == 1
+    conflict = report["conflicts"][0]
+    assert conflict["subject"] == DESM + "AbstractClassSet"
+    assert conflict["property"] == "label"
+    assert conflict["values"]['"Class Set"'] == [inputs[1]]
+    assert conflict["values"]['"Abstract Class Set"'] == [inputs[0]]
+    summary = summariseMerge(report)
+    assert "Conflicting label for " + DESM + "AbstractClassSet:" in summary
+    assert summary.splitlines()[-1] == "3 diagrams merged, 1 failed, 1 conflicts"
+
+
+def test_mergeDiagrams_turtle(inputs, tmp_path):
+    output = str(tmp_path / "merged.ttl")
+    mergeDiagrams(inputs[:2], output, output_format="turtle")
+    merged = Graph().parse(output, format="turtle")
+    assert set(merged) == converted(inputs[0]) | converted(inputs[1])
+    assert ("desm", DESM) in [(pre, str(ns)) for pre, ns in merged.namespaces()]
+
+
+def test_unifyNamespaces():
+    results = [
+        {"input": "a.csv", "namespaces": {"ex": "http://a/", "b": "http://b/"}},
+        {"input": "b.csv", "namespaces": {"ex": "http://c/", "bee": "http://b/"}},
+    ]
+    prefixes, clashes = unifyNamespaces(results)
+    assert prefixes == {"ex": "http://a/", "b": "http://b/", "ex2": "http://c/"}
+    assert clashes == [
+        {"prefix": "ex", "namespaces": ["http://a/", "http://c/"], "input": "b.csv"}
+    ]
+
+
+def test_merge_arguments(monkeypatch, capsys):
+    for option in [["--format", "nt"], ["--output-dir", "out"], ["--watch"]]:
+        argv = ["diag2rdfs.py", "--merge", "merged.ttl", test_file] + option
+        monkeypatch.setattr(sys, "argv", argv)
+        with pytest.raises(SystemExit):
+            parse_arguments()
+        assert "--merge" in capsys.readouterr().err
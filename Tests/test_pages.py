@@ -0,0 +1,72 @@
+import pytest
+from csv import writer
+from rdflib import URIRef, RDFS
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.pages import partitionPages, convertPages, convertByPage
+from Benchmarks.lucidGenerator import header, shapeRow, writeLucidCSV
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+A = "http://example.org/a/"
+B = "http://example.org/b/"
+
+
+@pytest.fixture(scope="module")
+def two_pages(tmp_path_factory):
+    """A diagram whose pages use the same prefix for different namespaces, with a link between pages."""
+    fname = str(tmp_path_factory.mktemp("pages") / "two_pages.csv")
+    rows = [
+        header,
+        shapeRow(Id="1", Name="Document", Text_Area_1="Two pages"),
+        shapeRow(Id="2", Name="Page", defines="ex", prefixes="ex: " + A),
+        shapeRow(Id="3", Name="Page", defines="ex", prefixes="ex: " + B),
+        shapeRow(Id="4", Name="Class", Page_ID="2", Text_Area_1="ex:Thing"),
+        shapeRow(Id="5", Name="Class", Page_ID="3", Text_Area_1="ex:Thing"),
+        shapeRow(
+            Id="6",
+            Name="Line",
+            Page_ID="3",
+            Line_Source="5",
+            Line_Destination="4",
+            Source_Arrow="None",
+            Destination_Arrow="Arrow",
+            Text_Area_1="ex:uses",
+        ),
+    ]
+    with open(fname, "w", newline="") as csv_file:
+        writer(csv_file).writerows(rows)
+    return fname
+
+
+def test_partitionPages(two_pages):
+    c = Diag2RDFSConverter()
+    c.loadDiagData(two_pages)
+    c.convertMetadata()
+    pages = partitionPages(c)
+    assert [page["page"]["id"] for page in pages] == ["2", "3"]
+    assert [line["id"] for line in pages[0]["classes"]] == ["4"]
+    assert [line["id"] for line in pages[1]["links"]] == ["6"]
+    assert pages[0]["prefixes"][-1] == ("ex", A)
+    assert pages[1]["prefixes"][-1] == ("ex", B)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convertByPage(two_pages, jobs):
+    c = convertByPage(two_pages, jobs)
+    assert (URIRef(A + "Thing"), RDFS.isDefinedBy, URIRef(A)) in c.schema
+    assert (URIRef(B + "Thing"), RDFS.isDefinedBy, URIRef(B)) in c.schema
+    assert (URIRef(B + "uses"), RDFS.domain, URIRef(B + "Thing")) in c.schema
+    assert (URIRef(B + "uses"), RDFS.range, URIRef(A + "Thing")) in c.schema
+
+
+def test_convertPages_matches_whole_diagram(tmp_path):
+    fname = str(tmp_path / "diagram.csv")
+    writeLucidCSV(fname, pages=3, classes=30, links=30)
+    whole = Diag2RDFSConverter()
+    whole.convertDiag2RDFS(fname)
+    assert set(convertByPage(fname, 2).schema) == set(whole.schema)
+    whole = Diag2RDFSConverter()
+    whole.convertDiag2RDFS(test_file)
+    assert set(convertByPage(test_file).schema) == set(whole.schema)
+    with pytest.raises(ValueError) as e:
+        convertPages(whole, 0)
+    assert str(e.value) == "Number of jobs must be a positive integer."
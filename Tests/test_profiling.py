@@ -0,0 +1,60 @@
+import json
+from io import StringIO
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.profiling import StageHook, StageProfiler
+from Diag2RDFS.tripleSink import NTriplesSink
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+class RecordingHook(StageHook):
+    def __init__(self):
+        self.calls = list()
+
+    def stageStarted(self, converter, stage):
+        self.calls.append(("started", stage))
+
+    def stageFinished(self, converter, stage, stats):
+        self.calls.append(("finished", stage, stats["rows"], stats["triples"]))
+
+
+def test_hooks():
+    c = Diag2RDFSConverter()
+    hook = RecordingHook()
+    c.addHook(hook)
+    c.convertDiag2RDFS(test_file)
+    assert hook.calls[0] == ("started", "loadDiagData")
+    assert hook.calls[1] == ("finished", "loadDiagData", 9, 0)
+    assert ("finished", "convertClasses", 2, 29) in hook.calls
+    assert hook.calls[-1] == ("finished", "convertLinkProperties", 2, 8)
+    assert len(c.schema) == 37
+
+
+def test_StageProfiler():
+    c = Diag2RDFSConverter()
+    profiler = StageProfiler()
+    c.addHook(profiler)
+    c.convertDiag2RDFS(test_file)
+    c.runStage("serializeSchema", c.serializeSchema)
+    profiler.stop()
+    stages = [record["stage"] for record in profiler.stages]
+    assert stages[0] == "loadDiagData"
+    assert stages[-1] == "serializeSchema"
+    totals = profiler.totals()
+    assert totals["triples"] == 37
+    assert totals["cache_hits"] > 0
+    assert totals["peak_memory"] > 0
+    report = json.loads(profiler.report("json"))
+    assert report["total"]["triples"] == 37
+    assert profiler.report().splitlines()[-1].startswith("total")
+
+
+def test_StageProfiler_stream():
+    c = Diag2RDFSConverter()
+    profiler = StageProfiler(memory=False)
+    c.addHook(profiler)
+    c.streamDiag2RDFS(test_file, NTriplesSink(StringIO()))
+    assert profiler.stages[-1]["stage"] == "streamTriples"
+    assert profiler.stages[-1]["triples"] == 37
+    assert "peak_memory" not in profiler.totals()
+    assert c._schema is None  # counting triples should not make the schema graph
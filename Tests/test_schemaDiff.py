@@ -0,0 +1,74 @@
+import pytest
+import re
+import sys
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.schemaDiff import diffSchemas, sparqlUpdate, rdfPatch
+from parseArguments import parse_arguments
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+@pytest.fixture(scope="module")
+def versions(tmp_path_factory):
+    """The test diagram's schema file, and a new export with a label changed and a class renamed."""
+    tmp_dir = tmp_path_factory.mktemp("diff")
+    old_schema = str(tmp_dir / "old.ttl")
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(test_file)
+    c.writeSchema(old_schema)
+    with open(test_file) as csv_file:
+        text = csv_file.read()
+    text = text.replace("Abstract Class Mapping", "Abstract class mapping")
+    text = text.replace("desm:AbstractClassSet", "desm:ClassSet")
+    new_csv = str(tmp_dir / "new.csv")
+    with open(new_csv, "w") as csv_file:
+        csv_file.write(text)
+    return old_schema, new_csv
+
+
+def test_diffUnchanged(versions):
+    old_schema, new_csv = versions
+    diff = diffSchemas(old_schema, test_file)
+    assert diff["added"] == diff["removed"] == []
+    assert diff["old_hash"] == diff["new_hash"]
+
+
+def test_sparqlUpdate(versions):
+    old_schema, new_csv = versions
+    diff = diffSchemas(old_schema, new_csv)
+    assert diff["old_hash"] != diff["new_hash"]
+    assert '"Abstract class mapping" .\n' in "".join(diff["added"])
+    assert '"Abstract Class Mapping" .\n' in "".join(diff["removed"])
+    schema = Graph()
+    schema.parse(old_schema)
+    schema.update(sparqlUpdate(diff))
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(new_csv)
+    assert isomorphic(schema, c.schema)
+
+
+def test_rdfPatch(versions):
+    old_schema, new_csv = versions
+    diff = diffSchemas(test_file, new_csv)
+    lines = rdfPatch(diff).splitlines()
+    assert lines[0] == "# Changes from schema %s" % diff["old_hash"]
+    assert lines[1] == "# to schema %s" % diff["new_hash"]
+    assert re.fullmatch(r"H id <urn:uuid:[0-9a-f-]{36}> \.", lines[2])
+    assert lines[2] != rdfPatch(diff).splitlines()[2]
+    assert lines[3] == "TX ."
+    assert lines[-1] == "TC ."
+    rows = lines[4:-1]
+    assert [row[:2] for row in rows] == ["D "] * len(diff["removed"]) + ["A "] * len(
+        diff["added"]
+    )
+
+
+def test_diff_arguments(monkeypatch, capsys):
+    for option in [["--stream", "nt"], ["--check"], ["--merge", "merged.ttl"]]:
+        argv = ["diag2rdfs.py", "--diff", "old.ttl", test_file] + option
+        monkeypatch.setattr(sys, "argv", argv)
+        with pytest.raises(SystemExit):
+            parse_arguments()
+        assert "--diff" in capsys.readouterr().err
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from rdflib import Graph
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.server import ConversionServer, convertText, percentiles
+from Diag2RDFS.client import ConversionClient
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+def test_percentiles():
+    p = percentiles([0.5, 0.1, 0.2, 0.3, 0.4])
+    assert p == {"count": 5, "p50": 0.3, "p90": 0.5, "p99": 0.5, "max": 0.5}
+    assert percentiles([])["p50"] is None
+
+
+def test_convertText():
+    with open(test_file) as diag_file:
+        csv_text = diag_file.read()
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(test_file)
+    assert convertText(csv_text, "turtle") == c.serializeSchema()
+    g = Graph().parse(data=convertText(csv_text), format="turtle")
+    assert set(g) == set(c.schema)
+    g = Graph().parse(data=convertText(csv_text, "nt"), format="nt")
+    assert set(g) == set(c.schema)
+    with pytest.raises(ValueError) as e:
+        convertText(csv_text, "csv")
+    assert str(e.value) == "Unknown output format: csv"
+
+
+def test_ConversionServer():
+    async def run():
+        server = ConversionServer(port=0, workers=2)
+        await server.start()
+        loop = asyncio.get_running_loop()
+
+        def requests():
+            client = ConversionClient(port=server.port)
+            schemas = [client.convertFile(test_file, "nt") for i in range(3)]
+            with pytest.raises(ValueError) as e:
+                client.convert("Id,Name\n1,Line\n")
+            stats = client.serverStats()
+            client.close()
+            return schemas, str(e.value), stats
+
+        try:
+            return await loop.run_in_executor(None, requests)
+        finally:
+            await server.close()
+
+    schemas, error, stats = asyncio.run(run())
+    assert schemas[0] == schemas[1] == schemas[2]
+    assert schemas[0].startswith("# Title:  DESM Model\n")
+    assert error.startswith("ValueError: Could not find classes for links")
+    assert stats["count"] == 3
+    assert stats["errors"] == 1
+    assert stats["p50"] <= stats["max"]
+
+
+def test_badRequests():
+    async def request(port, head, body=b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head + b"\r\n" + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response.split(b"\r\n")[0], response.split(b"\r\n\r\n", 1)[1]
+
+    async def run():
+        server = ConversionServer(port=0, workers=1, max_body=100)
+        await server.start()
+        try:
+            not_utf8 = await request(
+                server.port,
+                b"POST /convert HTTP/1.1\r\nContent-Length: 2\r\nConnection: close\r\n",
+                b"\xff\xfe",
+            )
+            too_large = await request(
+                server.port, b"POST /convert HTTP/1.1\r\nContent-Length: 101\r\n"
+            )
+            malformed = [
+                await request(server.port, head)
+                for head in [
+                    b"POST /convert\r\n",
+                    b"POST /convert HTTP/1.1\r\nNo colon\r\n",
+                    b"POST /convert HTTP/1.1\r\nContent-Length: ten\r\n",
+                ]
+            ]
+            chunked = await request(
+                server.port,
+                b"POST /convert HTTP/1.1\r\nTransfer-Encoding: chunked\r\n",
+                b"2\r\nId\r\n0\r\n\r\n",
+            )
+            return not_utf8, too_large, malformed, chunked, server.stats()
+        finally:
+            await server.close()
+
+    not_utf8, too_large, malformed, chunked, stats = asyncio.run(run())
+    assert not_utf8[0] == b"HTTP/1.1 400 Bad Request"
+    assert not_utf8[1].startswith(b"UnicodeDecodeError: ")
+    assert too_large == (
+        b"HTTP/1.1 413 Content Too Large",
+        b"Body larger than 100 bytes.",
+    )
+    assert malformed == [
+        (b"HTTP/1.1 400 Bad Request", b"Malformed request line."),
+        (b"HTTP/1.1 400 Bad Request", b"Malformed header."),
+        (b"HTTP/1.1 400 Bad Request", b"Malformed Content-Length."),
+    ]
+    assert chunked[0] == b"HTTP/1.1 411 Length Required"
+    assert stats["errors"] == 1
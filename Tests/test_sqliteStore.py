@@ -0,0 +1,135 @@
+import pytest
+import sqlite3
+import sys
+from rdflib import Graph, Literal, Namespace, URIRef, BNode, RDF, RDFS, XSD
+from Diag2RDFS import Diag2RDFSConverter, SQLiteStore
+from Diag2RDFS.sqliteStore import storeDiagram, openSchema
+from parseArguments import parse_arguments
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+EX = Namespace("http://example.org/")
+
+
+@pytest.fixture(scope="module")
+def schemas(tmp_path_factory):
+    store_file = str(tmp_path_factory.mktemp("store") / "schema.sqlite")
+    default = Diag2RDFSConverter()
+    default.convertDiag2RDFS(test_file)
+    stored = storeDiagram(test_file, store_file)
+    stored.schema.close()
+    return default, store_file
+
+
+def test_storeDiagram(schemas):
+    default, store_file = schemas
+    c = openSchema(store_file)
+    assert type(c.schema.store) is SQLiteStore
+    assert len(c.schema) == len(default.schema) == 37
+    assert set(c.schema) == set(default.schema)
+    assert c.metadata == default.metadata
+    assert c.serializeSchema() == default.serializeSchema()
+    query = "SELECT ?p WHERE { ?p a rdf:Property }"
+    assert set(c.schema.query(query)) == set(default.schema.query(query))
+    c.schema.close()
+    stored = storeDiagram(
+        test_file, store_file
+    )  # replaces, rather than adds to, the schema
+    assert len(stored.schema) == 37
+    stored.schema.close()
+    with pytest.raises(FileNotFoundError):
+        openSchema(store_file + ".missing")
+
+
+def test_storedNamespaces(tmp_path):
+    store_file = str(tmp_path / "schema.sqlite")
+
+    def storedBindings():
+        connection = sqlite3.connect(store_file)
+        bindings = dict(connection.execute("SELECT prefix, uri FROM namespaces"))
+        connection.close()
+        return bindings
+
+    storeDiagram(test_file, store_file).schema.close()
+    stored = storedBindings()
+    assert "desm" in stored
+    c = openSchema(store_file)
+    c.schema.bind("extra", EX)
+    assert c.schema.store.namespace("extra") == URIRef(EX)
+    assert c.schema.store.prefix(stored["desm"]) == "desm"
+    assert c.serializeSchema().startswith("# Title:  DESM Model\n")
+    c.schema.close()
+    assert storedBindings() == stored
+    store = SQLiteStore(store_file)
+    store.bind("stale", EX)
+    store.close()
+    assert storedBindings()["stale"] == str(EX)
+    storeDiagram(test_file, store_file).schema.close()
+    assert storedBindings() == stored
+
+
+def test_sqlitePatterns(schemas):
+    default, store_file = schemas
+    c = openSchema(store_file)
+    patterns = [(None, None, None), (None, None, EX.missing)]
+    for s, p, o in default.schema:
+        patterns.extend([(s, None, None), (None, p, o), (s, None, o), (s, p, o)])
+    for pattern in patterns:
+        assert set(c.schema.triples(pattern)) == set(default.schema.triples(pattern))
+    c.schema.close()
+
+
+def test_sqliteAddRemove(tmp_path):
+    store = SQLiteStore(str(tmp_path / "g.sqlite"), batch_size=2)
+    g = Graph(store=store)
+    g.add((EX.a, RDF.type, RDFS.Class))
+    g.add((EX.a, RDF.type, RDFS.Class))
+    node = BNode()
+    g.addN(
+        [
+            (EX.a, RDFS.label, Literal("A", lang="en"), g),
+            (EX.a, RDFS.comment, Literal("1", datatype=XSD.integer), g),
+            (EX.a, RDFS.comment, Literal("1"), g),
+            (EX.b, RDF.type, RDFS.Class, g),
+            (node, RDFS.label, Literal("node"), g),
+        ]
+    )
+    assert len(g) == 6
+    assert (EX.a, RDFS.label, Literal("A", lang="en")) in g
+    assert (EX.a, RDFS.label, Literal("A")) not in g
+    assert set(g.objects(EX.a, RDFS.comment)) == {
+        Literal("1", datatype=XSD.integer),
+        Literal("1"),
+    }
+    assert set(g.subjects(RDFS.label, Literal("node"))) == {node}
+    g.remove((EX.a, None, None))
+    assert set(g.subjects(RDF.type, RDFS.Class)) == {EX.b}
+    store.commit()
+    g.add((EX.c, RDF.type, RDFS.Class))
+    store.rollback()
+    assert (EX.c, RDF.type, RDFS.Class) not in g
+    g.add((EX.c, RDF.type, RDFS.Class))
+    g.close()  # without committing the last triple
+    reopened = SQLiteStore()
+    reopened.open(str(tmp_path / "g.sqlite"))
+    assert len(Graph(store=reopened)) == 2
+
+
+def test_sqliteBind(tmp_path):
+    g = Graph(store=SQLiteStore(str(tmp_path / "g.sqlite")))
+    g.bind("ex", EX)
+    assert g.store.namespace("ex") == URIRef(EX)
+    assert g.store.prefix(URIRef(EX)) == "ex"
+    g.bind("other", EX)
+    assert g.store.namespace("ex") is None
+    assert ("other", URIRef(EX)) in list(g.namespaces())
+    with pytest.raises(TypeError):
+        g.store.add((EX.a, RDFS.label, None), g)
+
+
+def test_store_arguments(monkeypatch, capsys):
+    for option in [["--format", "nt"], ["--output-dir", "out"], ["--watch"]]:
+        argv = ["diag2rdfs.py", "--store", "schema.db", test_file] + option
+        monkeypatch.setattr(sys, "argv", argv)
+        with pytest.raises(SystemExit):
+            parse_arguments()
+        assert "--store" in capsys.readouterr().err
@@ -0,0 +1,46 @@
+import pytest
+from io import StringIO
+from rdflib import Graph, Literal, URIRef, RDF, RDFS
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.tripleSink import ntTerm, ntTriple, NTriplesSink, TurtleSink
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+
+
+@pytest.fixture(scope="module")
+def schema():
+    c = Diag2RDFSConverter()
+    c.convertDiag2RDFS(test_file)
+    return c.schema
+
+
+def test_ntTerm():
+    assert ntTerm(URIRef("http://schema.org/name")) == "<http://schema.org/name>"
+    assert ntTerm(Literal('a "b"\nc')) == '"a \\"b\\"\\nc"'
+    assert ntTerm(Literal("chat", lang="fr")) == '"chat"@fr'
+    tr = (URIRef("http://example.org/a"), RDF.type, RDFS.Class)
+    assert ntTriple(tr) == (
+        "<http://example.org/a> "
+        "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type> "
+        "<http://www.w3.org/2000/01/rdf-schema#Class> .\n"
+    )
+
+
+def test_NTriplesSink(schema):
+    out = StringIO()
+    sink = NTriplesSink(out)
+    Diag2RDFSConverter().streamDiag2RDFS(test_file, sink)
+    assert out.getvalue().startswith("# Title:  DESM Model\n# Date:  2021-12-17\n")
+    assert sink.count == len(schema)
+    assert not sink.add(next(iter(schema)))
+    g = Graph().parse(data=out.getvalue(), format="nt")
+    assert set(g) == set(schema)
+
+
+def test_TurtleSink(schema):
+    out = StringIO()
+    Diag2RDFSConverter().streamDiag2RDFS(test_file, TurtleSink(out))
+    assert "@prefix desm: " in out.getvalue()
+    assert "desm:AbstractClassSet a rdfs:Class ;\n" in out.getvalue()
+    g = Graph().parse(data=out.getvalue(), format="turtle")
+    assert set(g) == set(schema)
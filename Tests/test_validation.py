@@ -0,0 +1,131 @@
+import pytest
+import subprocess
+import sys
+from csv import reader, writer
+from rdflib import URIRef
+from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.validation import validateDiagram, convertValidRows, formatProblems
+from Diag2RDFS.validation import checkDiagram, dropInvalidRows
+
+test_file = "./Tests/TestData/DESM_Model2.csv"
+desm = "https://github.com/t3-innovation-network/desm/tree/main/schemas/desmSchema/"
+
+
+@pytest.fixture(scope="module")
+def broken_csv(tmp_path_factory):
+    """The test diagram with a bad prefix definition, an unknown class prefix, a bad arrow value and a dangling link end."""
+    with open(test_file, newline="") as csv_file:
+        records = list(reader(csv_file))
+    records[2][20] += "\nbad: ftp://example.org/"
+    records[7][11] = "ex:AbstractClassMapping"
+    records[8][8] = "Open"
+    records[9][7] = "99"
+    records.append(records[9][:])
+    records[-1][0] = "11"
+    records[-1][7] = "6"
+    records[-1][11] = "desm:related"
+    fname = str(tmp_path_factory.mktemp("validation") / "broken.csv")
+    with open(fname, "w", newline="") as csv_file:
+        writer(csv_file).writerows(records)
+    return fname
+
+
+def test_validateDiagram(broken_csv):
+    c = Diag2RDFSConverter()
+    c.loadDiagData(test_file)
+    assert validateDiagram(c) == []
+    c.loadDiagData(broken_csv)
+    problems = validateDiagram(c)
+    assert [(p["row"], p["column"], p["id"]) for p in problems] == [
+        (3, "prefixes", "2"),
+        (8, "Text Area 1", "7"),
+        (9, "Source Arrow", "8"),
+        (9, "Line Destination", "8"),
+        (10, "Line Destination", "9"),
+    ]
+    assert problems[0]["message"] == (
+        "Namespace uri should start with http. bad: ftp://example.org/"
+    )
+    assert problems[1]["message"] == (
+        "No namespace for CURIe prefix. ex:AbstractClassMapping"
+    )
+    assert problems[2]["message"] == "Unknown value for source_arrow: Open"
+    assert problems[3]["message"] == "Class with id 7, in row 8, has problems."
+    assert problems[4]["message"] == "Could not find class with id 99."
+    assert formatProblems("broken.csv", problems[-1:]) == (
+        "broken.csv:10: Line Destination (id 9): Could not find class with id 99."
+    )
+
+
+def test_datatypeWarning(tmp_path):
+    with open(test_file, newline="") as csv_file:
+        records = list(reader(csv_file))
+    records[7][12] = "desm:label (Text)"
+    fname = str(tmp_path / "text.csv")
+    with open(fname, "w", newline="") as csv_file:
+        writer(csv_file).writerows(records)
+    c = Diag2RDFSConverter()
+    problems = convertValidRows(c, fname)
+    assert [(p["row"], p["column"], p["warning"]) for p in problems] == [
+        (8, "Text Area 2", True)
+    ]
+    assert formatProblems("text.csv", problems) == (
+        "text.csv:8: Text Area 2 (id 7): warning: CURIe should have one colon ':' in"
+        " it. Text (rdfs:Literal is used)"
+    )
+    assert [row["id"] for row in c.diagClassData] == ["6", "7"]
+
+
+def test_convertValidRows(broken_csv):
+    c = Diag2RDFSConverter()
+    with pytest.raises(ValueError):
+        c.convertDiag2RDFS(broken_csv)
+    c = Diag2RDFSConverter()
+    problems = convertValidRows(c, broken_csv)
+    assert len(problems) == 5
+    assert "bad" not in c.namespaces
+    class_set = URIRef(desm + "AbstractClassSet")
+    related = URIRef(desm + "related")
+    assert (
+        related,
+        URIRef("http://www.w3.org/2000/01/rdf-schema#domain"),
+        class_set,
+    ) in c.schema
+    assert not any("AbstractClassMapping" in str(s) for s in c.schema.subjects())
+    assert [row["id"] for row in c.diagLinkData] == ["11"]
+
+
+def test_dropInvalidRows():
+    c = Diag2RDFSConverter()
+    c.loadDiagData(test_file)
+    for row in c.diagMetaData + c.diagClassData + c.diagLinkData:
+        row.rowNumber = None
+    values = dict(c.diagLinkData[0].asDict(), id="11", line_destination="99")
+    c.addDiagRow(c.columns.makeRow(tuple(values.values())))
+    problems, bad_rows = checkDiagram(c)
+    assert [(p["row"], p["column"]) for p in problems] == [(None, "Line Destination")]
+    assert bad_rows == [c.diagLinkData[-1]]
+    dropInvalidRows(c, bad_rows)
+    assert len(c.diagClassData) == 2
+    assert len(c.diagLinkData) == 2
+
+
+def test_check(broken_csv):
+    result = subprocess.run(
+        [sys.executable, "diag2rdfs.py", "--check", "--no-cache", broken_csv],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 1
+    assert result.stdout == ""
+    lines = result.stderr.splitlines()
+    assert len(lines) == 6
+    assert lines[-1] == "5 problems in 1 files"
+    result = subprocess.run(
+        [sys.executable, "diag2rdfs.py", "--skip-invalid", "--no-cache", broken_csv],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert "desm:related" in result.stdout
+    assert result.stderr.splitlines()[-1] == "5 problems left out"
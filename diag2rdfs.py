@@ -1,11 +1,168 @@
 #!/usr/bin/env python
+import sys
+from os import makedirs, path
+from time import perf_counter
 from Diag2RDFS import Diag2RDFSConverter
+from Diag2RDFS.batch import expandInputs, outputName, convertDiagram, convertBatch
+from Diag2RDFS.batch import summariseBatch, checkOutputNames
+from RDFUtils import plain_terms
 from parseArguments import parse_arguments
-from pprint import PrettyPrinter
+
+# modules for the other modes are imported only when used, to keep startup fast
 
 if __name__ == "__main__":
     args = parse_arguments()
-    c = Diag2RDFSConverter()
-    pp = PrettyPrinter()
-    c.convertDiag2RDFS(args.diagFileName)
-    c.writeSchema()
+    if args.serve:
+        from Diag2RDFS.server import serve
+
+        serve(args.host, args.port, args.jobs, args.maxBody * 2**20)
+        sys.exit()
+    if args.store is not None:
+        from Diag2RDFS.sqliteStore import storeDiagram, openSchema
+
+        fnames = expandInputs(args.diagFileNames)
+        if len(fnames) > 1:
+            sys.exit("--store needs one CSV file, or none to write the stored schema.")
+        if fnames:
+            c = storeDiagram(fnames[0], args.store, load_jobs=args.loadJobs)
+            print(
+                "%d triples stored in %s" % (len(c.schema), args.store), file=sys.stderr
+            )
+        else:
+            c = openSchema(args.store)
+            c.writeSchema()
+        c.schema.close()
+        sys.exit()
+    fnames = expandInputs(args.diagFileNames)
+    if (args.pages or args.profile) and fnames != args.diagFileNames:
+        sys.exit(
+            "--pages and --profile need exactly one CSV file, not a directory or pattern."
+        )
+    cache = None
+    if args.useCache:
+        from Diag2RDFS.conversionCache import ConversionCache
+
+        cache = ConversionCache(args.cacheDir, args.cacheSize * 2**20)
+    if args.merge is not None:
+        from Diag2RDFS.merge import mergeDiagrams, summariseMerge
+
+        output_format = "nt" if args.merge.endswith(".nt") else "turtle"
+        report = mergeDiagrams(fnames, args.merge, args.jobs, output_format)
+        print(summariseMerge(report), file=sys.stderr)
+        if any(result["error"] is not None for result in report["results"]):
+            sys.exit(1)
+        sys.exit()
+    if args.diff is not None:
+        from Diag2RDFS.schemaDiff import diffSchemas, patch_formats
+
+        if len(fnames) != 1:
+            sys.exit("--diff needs exactly one CSV file.")
+        diff = diffSchemas(args.diff, fnames[0])
+        print(patch_formats[args.patchFormat](diff), end="")
+        print(
+            "%d triples added, %d removed" % (len(diff["added"]), len(diff["removed"])),
+            file=sys.stderr,
+        )
+        sys.exit()
+    if args.check:
+        from Diag2RDFS.validation import validateDiagram, formatProblems
+
+        count = 0
+        for fname in fnames:
+            c = Diag2RDFSConverter(terms=plain_terms, load_jobs=args.loadJobs)
+            c.loadDiagData(fname)
+            problems = validateDiagram(c)
+            if problems:
+                print(formatProblems(fname, problems), file=sys.stderr)
+            count += len([p for p in problems if not p["warning"]])
+        print("%d problems in %d files" % (count, len(fnames)), file=sys.stderr)
+        if count > 0:
+            sys.exit(1)
+        sys.exit()
+    if args.skipInvalid:
+        from Diag2RDFS.validation import convertValidRows, formatProblems
+
+        if len(fnames) != 1:
+            sys.exit("--skip-invalid needs exactly one CSV file.")
+        c = Diag2RDFSConverter(load_jobs=args.loadJobs)
+        problems = convertValidRows(c, fnames[0])
+        if problems:
+            print(formatProblems(fnames[0], problems), file=sys.stderr)
+        if args.outputDir is None:
+            c.writeSchema()
+        else:
+            makedirs(args.outputDir, exist_ok=True)
+            c.writeSchema(outputName(fnames[0], args.outputDir))
+        left_out = [p for p in problems if not p["warning"]]
+        print("%d problems left out" % len(left_out), file=sys.stderr)
+        sys.exit()
+    if args.watch:
+        from Diag2RDFS.incremental import watch
+
+        if len(fnames) != 1:
+            sys.exit("--watch needs exactly one CSV file.")
+        if args.outputDir is not None:
+            makedirs(args.outputDir, exist_ok=True)
+        try:
+            watch(fnames[0], outputName(fnames[0], args.outputDir))
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
+    single = len(args.diagFileNames) == 1 and fnames == args.diagFileNames
+    if not single:
+        try:
+            checkOutputNames(fnames, args.outputDir)
+        except ValueError as e:
+            sys.exit(str(e))
+    if args.formats is not None:
+        from Diag2RDFS.formats import convertFormatsBatch
+
+        start = perf_counter()
+        results = convertFormatsBatch(
+            fnames, args.formats, args.outputDir, args.jobs, cache, args.loadJobs
+        )
+        print(summariseBatch(results, perf_counter() - start), file=sys.stderr)
+        if any(result["error"] is not None for result in results):
+            sys.exit(1)
+        sys.exit()
+    if args.canonical:
+        from Diag2RDFS.canonical import convertCanonical, convertCanonicalBatch
+        from Diag2RDFS.canonical import Manifest, manifest_name
+
+        output_format = args.stream or "ttl"
+        if single and args.outputDir is None:
+            print(convertCanonical(fnames[0], output_format), end="")
+            sys.exit()
+        manifest = Manifest(
+            args.manifest or path.join(args.outputDir or ".", manifest_name)
+        )
+        start = perf_counter()
+        results = convertCanonicalBatch(
+            fnames, args.outputDir, args.jobs, output_format, manifest
+        )
+        print(summariseBatch(results, perf_counter() - start), file=sys.stderr)
+        if any(result["error"] is not None for result in results):
+            sys.exit(1)
+        sys.exit()
+    if single and args.outputDir is None:
+        if args.stream is None or args.pages:
+            c = Diag2RDFSConverter(load_jobs=args.loadJobs)
+        else:  # streamed output does not need rdflib
+            c = Diag2RDFSConverter(terms=plain_terms, load_jobs=args.loadJobs)
+        if args.profile:
+            from Diag2RDFS.profiling import StageProfiler
+
+            profiler = StageProfiler()
+            c.addHook(profiler)
+            cache = None  # profile a conversion, not a cache hit
+        page_jobs = args.jobs if args.pages else None
+        convertDiagram(fnames[0], sys.stdout, args.stream, cache, c, page_jobs)
+        if args.profile:
+            profiler.stop()
+            print(profiler.report(args.profileFormat), file=sys.stderr)
+        sys.exit()
+    start = perf_counter()
+    results = convertBatch(fnames, args.outputDir, args.jobs, args.stream, cache)
+    print(summariseBatch(results, perf_counter() - start), file=sys.stderr)
+    if any(result["error"] is not None for result in results):
+        sys.exit(1)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+import json
+import sys
+from argparse import ArgumentParser
+from Diag2RDFS.client import ConversionClient
+from Diag2RDFS.server import default_host, default_port, percentiles
+
+
+def parse_arguments():
+    parser = ArgumentParser(
+        prog="diag2rdfsClient.py",
+        description="Convert Lucid class diagram csv files using a running diag2rdfs.py --serve server.",
+    )
+    parser.add_argument(
+        "diagFileNames",
+        type=str,
+        nargs="+",
+        metavar="<fileName.csv>",
+        help="CSV files of diagram data exported from Lucid; the schemas are printed in turn.",
+    )
+    parser.add_argument("--host", type=str, default=default_host)
+    parser.add_argument("--port", type=int, default=default_port)
+    parser.add_argument(
+        "--format",
+        type=str,
+        default="ttl",
+        choices=["ttl", "nt", "turtle", "xml", "json-ld"],
+    )
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        help="Report latency percentiles for these requests, and the server's, on stderr.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    client = ConversionClient(args.host, args.port)
+    failed = False
+    for fname in args.diagFileNames:
+        try:
+            print(client.convertFile(fname, args.format), end="")
+        except ValueError as e:
+            print(fname + ":", e, file=sys.stderr)
+            failed = True
+    if args.latency:
+        print("client:", json.dumps(percentiles(client.latencies)), file=sys.stderr)
+        print("server:", json.dumps(client.serverStats()), file=sys.stderr)
+    client.close()
+    if failed:
+        sys.exit(1)
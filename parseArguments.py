@@ -1,7 +1,57 @@
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 
 # defaults
-diagFileName = ""
+diagFileNames = []
+jobs = 1
+outputDir = None
+stream = None
+profile = False
+profileFormat = "text"
+cacheDir = None
+cacheSize = 256
+watch = False
+pages = False
+merge = None
+serve = False
+host = "127.0.0.1"
+port = 8642
+maxBody = 64
+formats = None
+loadJobs = 1
+diff = None
+patchFormat = "sparql"
+check = False
+skipInvalid = False
+canonical = False
+manifest = None
+store = None
+
+format_choices = ["ttl", "nt", "xml", "json-ld"]
+
+
+def positiveInt(value):
+    """Return a command line value as an int, checking it is at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        msg = "invalid value: %r (must be a positive integer)" % value
+        raise ArgumentTypeError(msg)
+    return number
+
+
+def formatList(value):
+    """Return the output formats in a comma-separated list, checking each is one of the choices."""
+    formats = value.split(",")
+    for output_format in formats:
+        if output_format not in format_choices:
+            msg = "invalid format: %r (choose from %s)" % (
+                output_format,
+                ", ".join(format_choices),
+            )
+            raise ArgumentTypeError(msg)
+    return formats
 
 
 def parse_arguments():
@@ -10,9 +60,229 @@ def parse_arguments():
         description="Convert csv data exported for Lucid class diagram to an RDFSchema.",
     )
     parser.add_argument(
-        "diagFileName",
+        "diagFileNames",
         type=str,
+        nargs="*",
         metavar="<fileName.csv>",
-        help="Name CSV file of diagram data exported from Lucid.",
+        help="Name CSV file of diagram data exported from Lucid. Several files, glob patterns or directories of CSV files may be given; each is converted to its own schema file.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positiveInt,
+        default=jobs,
+        metavar="N",
+        help="Number of processes used to convert several files in parallel.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        dest="outputDir",
+        type=str,
+        default=outputDir,
+        metavar="<dir>",
+        help="Directory for schema files. Defaults to the directory of each CSV file when converting several files, or stdout for one file.",
+    )
+    parser.add_argument(
+        "--stream",
+        type=str,
+        choices=["nt", "ttl"],
+        default=stream,
+        help="Write N-Triples or Turtle as the triples are converted, without building the whole schema in memory. Use - as the file name to read CSV from stdin. With --canonical, sets the format of the canonical output.",
+    )
+    parser.add_argument(
+        "--load-jobs",
+        dest="loadJobs",
+        type=positiveInt,
+        default=loadJobs,
+        metavar="N",
+        help="Read a large CSV file by memory-mapping it and parsing chunks of it in N processes.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        type=formatList,
+        default=formats,
+        metavar="FORMAT[,FORMAT...]",
+        help="Convert each CSV file once and write its schema in each of these comma-separated formats (ttl, nt, xml, json-ld) to files in --output-dir or beside the CSV file. Several files are converted in up to --jobs processes; the formats of one file are serialized in up to --jobs processes.",
+    )
+    parser.add_argument(
+        "--canonical",
+        action="store_true",
+        default=canonical,
+        help="Write the schema with its triples sorted, so the same schema is always written the same way. The output is Turtle, or N-Triples with --stream nt. Files whose content has not changed since the last run are not rewritten.",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=manifest,
+        metavar="<file>",
+        help="Manifest recording the hash of each --canonical output, used to skip unchanged files. Defaults to diag2rdfs-manifest.json in --output-dir or the current directory.",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=store,
+        metavar="<file>",
+        help="Convert one CSV file into a SQLite database, replacing the schema stored there, instead of writing it out. With no CSV file, write the schema stored in the database to stdout.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=profile,
+        help="Report the time, rows, triples, CURIE cache hit rate and peak memory of each stage to stderr while converting one CSV file to stdout.",
+    )
+    parser.add_argument(
+        "--profile-format",
+        dest="profileFormat",
+        type=str,
+        choices=["text", "json"],
+        default=profileFormat,
+        help="Write the --profile report as a table or as JSON.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cacheDir",
+        type=str,
+        default=cacheDir,
+        metavar="<dir>",
+        help="Directory for cached schemas, so that unchanged CSV files are not converted again. Defaults to diag2rdfs in the user's cache directory.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        dest="cacheSize",
+        type=positiveInt,
+        default=cacheSize,
+        metavar="MB",
+        help="Size in MB above which the least recently used cached schemas are removed.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="useCache",
+        action="store_false",
+        help="Always convert, without reading or writing the cache.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        default=watch,
+        help="Keep running and update the schema file each time the CSV file changes, reconverting only the rows that changed.",
+    )
+    parser.add_argument(
+        "--pages",
+        action="store_true",
+        default=pages,
+        help="Convert each page of a multi-page diagram in its own context, in up to --jobs processes, and merge the results.",
+    )
+    parser.add_argument(
+        "--merge",
+        type=str,
+        default=merge,
+        metavar="<output>",
+        help="Merge all the CSV files into one schema file, converting them in up to --jobs processes, and report definitions that conflict. Output ending in .nt is streamed as N-Triples, otherwise Turtle is written.",
+    )
+    parser.add_argument(
+        "--diff",
+        type=str,
+        default=diff,
+        metavar="<old>",
+        help="Write the triples added and removed since <old>, an earlier CSV export or a schema file, to stdout instead of the whole schema.",
+    )
+    parser.add_argument(
+        "--patch-format",
+        dest="patchFormat",
+        type=str,
+        choices=["sparql", "rdfpatch"],
+        default=patchFormat,
+        help="Write --diff output as a SPARQL Update request or as an RDF Patch.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        default=check,
+        help="Check the CSV files in one pass and report every bad CURIE, prefix definition, arrow value and link end to stderr, with its row and column, instead of converting them.",
+    )
+    parser.add_argument(
+        "--skip-invalid",
+        dest="skipInvalid",
+        action="store_true",
+        default=skipInvalid,
+        help="Convert one CSV file leaving out the rows that --check would report, reporting them to stderr.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        default=serve,
+        help="Run a local conversion server instead of converting files; use diag2rdfsClient.py to send it CSV. --jobs sets the number of concurrent conversions.",
+    )
+    parser.add_argument(
+        "--host", type=str, default=host, help="Address for the server to listen on."
+    )
+    parser.add_argument(
+        "--port", type=int, default=port, help="Port for the server to listen on."
+    )
+    parser.add_argument(
+        "--max-body",
+        dest="maxBody",
+        type=int,
+        default=maxBody,
+        metavar="MB",
+        help="Size in MB of the largest CSV the server accepts; larger requests are refused with 413.",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.serve and args.store is None and not args.diagFileNames:
+        parser.error(
+            "at least one CSV file is needed unless --serve or --store is given"
+        )
+    if args.formats is not None and args.stream is not None:
+        parser.error("--format and --stream cannot be used together")
+    if args.canonical and args.formats is not None:
+        parser.error("--canonical cannot be used with --format")
+    for option, used in [("--check", args.check), ("--skip-invalid", args.skipInvalid)]:
+        if used and (args.pages or args.stream is not None or args.formats is not None):
+            parser.error(option + " cannot be used with --pages, --stream or --format")
+    single_conflicts = {
+        "--output-dir": args.outputDir is not None,
+        "--merge": args.merge is not None,
+        "--diff": args.diff is not None,
+        "--watch": args.watch,
+        "--format": args.formats is not None,
+        "--store": args.store is not None,
+        "--canonical": args.canonical,
+        "--check": args.check,
+        "--skip-invalid": args.skipInvalid,
+        "--serve": args.serve,
+    }
+    # modes that replace the usual conversion, and the options they would ignore
+    mode_conflicts = {
+        "--stream": args.stream is not None,
+        "--format": args.formats is not None,
+        "--canonical": args.canonical,
+        "--check": args.check,
+        "--skip-invalid": args.skipInvalid,
+        "--output-dir": args.outputDir is not None,
+        "--serve": args.serve,
+    }
+    modes = [
+        ("--merge", args.merge is not None),
+        ("--diff", args.diff is not None),
+        ("--store", args.store is not None),
+        ("--watch", args.watch),
+    ]
+    used_modes = [option for option, used in modes if used]
+    if len(used_modes) > 1:
+        parser.error(" and ".join(used_modes) + " cannot be used together")
+    for option, used in modes:
+        ignored = dict(mode_conflicts)
+        if option == "--watch":
+            del ignored["--output-dir"]  # the schema file is written there
+        if used and any(ignored.values()):
+            parser.error(option + " cannot be used with " + ", ".join(ignored))
+    for option, used in [("--pages", args.pages), ("--profile", args.profile)]:
+        if used and (len(args.diagFileNames) != 1 or any(single_conflicts.values())):
+            parser.error(
+                option
+                + " converts exactly one CSV file to stdout, so cannot be used with "
+                + ", ".join(single_conflicts)
+            )
+    return args
@@ -4,7 +4,7 @@ from distutils.core import setup
 
 setup(
     name="Diag2RDFS",
-    version="0.0.1a",
+    version="0.0.2a",
     description="Convert csv data exported for Lucid class diagram to an RDFSchema.",
     author="Phil Barker",
     packages["Diag2RDFS"],